@@ -0,0 +1,70 @@
+# Checks that the CLI starts fast: importing the CLI module (which is all '--help' and the argument errors need)
+# must stay within the time budget and must not import the request stack or the command modules.
+#
+#   PYTHONPATH=src python benchmarks/check_import_time.py --budget-ms 150
+
+import os
+import re
+import subprocess
+import sys
+
+import click
+
+CLI_MODULE = "akamai_shared_cloudlets.__main__"
+
+# modules the CLI must not import before a command is invoked
+FORBIDDEN_MODULES = ("requests", "urllib3", "akamai.edgegrid", "akamai_shared_cloudlets.commands",
+                     "akamai_shared_cloudlets.http_requests", "akamai_shared_cloudlets.akamai_api_requests_abstractions")
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def get_import_times(module: str, repeat: int) -> list:
+    """
+    Imports the module in fresh interpreters with '-X importtime'
+    @return: list (one item per run) of dicts of the imported modules and their cumulative microseconds
+    """
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                capture_output=True, text=True, env=os.environ.copy(), check=True)
+        imports = {}
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if match is not None:
+                imports[match.group(4)] = int(match.group(2))
+        runs.append(imports)
+    return runs
+
+
+def get_forbidden_imports(imports: dict) -> list:
+    return sorted(name for name in imports
+                  if any(name == forbidden or name.startswith(f"{forbidden}.") for forbidden in FORBIDDEN_MODULES))
+
+
+@click.command()
+@click.option("--budget-ms", type=click.FloatRange(min=0), default=150,
+              help="Maximal cumulative import time of the CLI module in milliseconds (median of the runs).")
+@click.option("--repeat", type=click.IntRange(min=1), default=5, help="Number of fresh interpreters to measure.")
+def main(budget_ms, repeat):
+    """Checks the import time of the CLI and that it imports no heavy dependencies before a command runs"""
+    runs = get_import_times(CLI_MODULE, repeat)
+    durations = sorted(run.get(CLI_MODULE, 0) / 1000 for run in runs)
+    median = durations[len(durations) // 2]
+    print(f"{CLI_MODULE}: {median:.1f} ms (median of {repeat}, budget {budget_ms:.1f} ms)")
+
+    failed = False
+    if median > budget_ms:
+        print(f"Import of {CLI_MODULE} takes longer than the budget", file=sys.stderr)
+        failed = True
+    forbidden_imports = get_forbidden_imports(runs[0])
+    if len(forbidden_imports) > 0:
+        print(f"{CLI_MODULE} imports modules that should be loaded lazily: {', '.join(forbidden_imports)}",
+              file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# Benchmarks of the request pipeline and the library abstractions, run offline against the fake Cloudlets server.
+#
+#   PYTHONPATH=src python benchmarks/run_benchmarks.py --output results.json
+#   PYTHONPATH=src python benchmarks/run_benchmarks.py --compare results.json --threshold 0.2
+
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import click
+import requests
+from requests import Request
+
+from akamai_shared_cloudlets import akamai_api_requests_abstractions as api
+from akamai_shared_cloudlets import credentials
+from akamai_shared_cloudlets import http_requests
+from akamai_shared_cloudlets import json_codec
+from akamai_shared_cloudlets.fake_server import FakeCloudletsServer, FakeDataset
+
+SAMPLE_EDGERC = """[default]
+client_secret = benchmarkbenchmarkbenchmarkbenchmarkbenchmar=
+host = benchmark.luna.akamaiapis.net
+access_token = akab-benchmarkbenchmark-benchmarkbenchmark
+client_token = akab-benchmarkbenchmark-benchmarkbenchmark
+"""
+
+# (name of the send_* function, http method, path & body of the request)
+REQUESTS = [
+    ("send_get_request", "GET", "/cloudlets/v3/policies/1001", None),
+    ("send_post_request", "POST", "/cloudlets/v3/policies/1001/versions", {"description": "bench", "matchRules": []}),
+    ("send_put_request", "PUT", "/cloudlets/v3/policies/1001/versions/1", {"description": "bench", "matchRules": []}),
+    ("send_delete_request", "DELETE", "/cloudlets/v3/policies/999999", None),
+]
+
+
+def measure_request_phases(server: FakeCloudletsServer, edgerc_file: str, iterations: int) -> dict:
+    """
+    Measures every send_* function and splits the cost of a request into its phases: edgerc parsing, session
+    creation, EdgeGrid signing, the round trip and json decoding. The 'cold' path parses the credentials and creates
+    a session for every request (as every request did before the pooled client), the 'pooled' path is what the
+    send_* functions do now.
+    @return: dict of the function names and the median milliseconds of the phases of both paths
+    """
+    results = {}
+    for function_name, method, path, body in REQUESTS:
+        cold = measure_phases(lambda: cold_request(server, edgerc_file, method, path, body), iterations)
+        pooled = measure_phases(lambda: pooled_request(server, edgerc_file, method, path, body), iterations)
+        client = http_requests.AkamaiClient(edgerc_file, base_url=server.url)
+        send = getattr(http_requests, function_name)
+        arguments = {
+            "send_get_request": lambda: send(path, {}, edgerc_file, client),
+            "send_post_request": lambda: send(path, body, edgerc_file, client),
+            "send_put_request": lambda: send(path, body, edgerc_file, client),
+            "send_delete_request": lambda: send(path, edgerc_file, client),
+        }[function_name]
+        totals = [get_duration(arguments) for _ in range(iterations)]
+        client.close()
+        results[function_name] = {
+            "cold": cold,
+            "pooled": pooled,
+            "total_ms": to_milliseconds(statistics.median(totals))
+        }
+    return results
+
+
+def cold_request(server: FakeCloudletsServer, edgerc_file: str, method: str, path: str, body) -> dict:
+    timings = {}
+    started_at = time.perf_counter()
+    edgerc_credentials = credentials.parse_credentials(edgerc_file)
+    timings["edgerc_ms"] = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    session = requests.session()
+    timings["session_ms"] = time.perf_counter() - started_at
+
+    timings.update(send(session, edgerc_credentials.auth, server.url, method, path, body))
+    session.close()
+    return timings
+
+
+def pooled_request(server: FakeCloudletsServer, edgerc_file: str, method: str, path: str, body) -> dict:
+    timings = {}
+    started_at = time.perf_counter()
+    edgerc_credentials = credentials.get_credentials(edgerc_file)
+    timings["edgerc_ms"] = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    client = get_pooled_client(edgerc_file, server)
+    timings["session_ms"] = time.perf_counter() - started_at
+
+    timings.update(send(client.session, edgerc_credentials.auth, server.url, method, path, body))
+    return timings
+
+
+_pooled_clients = {}
+
+
+def get_pooled_client(edgerc_file: str, server: FakeCloudletsServer) -> http_requests.AkamaiClient:
+    key = (edgerc_file, server.url)
+    if key not in _pooled_clients:
+        _pooled_clients[key] = http_requests.AkamaiClient(edgerc_file, base_url=server.url)
+    return _pooled_clients[key]
+
+
+def send(session: requests.Session, auth, base_url: str, method: str, path: str, body) -> dict:
+    timings = {}
+    headers = http_requests.JSON_REQUEST_HEADERS if body is not None else None
+    data = json.dumps(body) if body is not None else None
+    prepared_request = Request(method, f"{base_url}{path}", data=data, headers=headers).prepare()
+
+    started_at = time.perf_counter()
+    prepared_request = auth(prepared_request)
+    timings["sign_ms"] = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    response = session.send(prepared_request)
+    content = response.content
+    timings["round_trip_ms"] = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    if content:
+        response.json()
+    timings["json_decode_ms"] = time.perf_counter() - started_at
+    return timings
+
+
+def measure_phases(request, iterations: int) -> dict:
+    samples = [request() for _ in range(iterations)]
+    return {phase: to_milliseconds(statistics.median(sample[phase] for sample in samples)) for phase in samples[0]}
+
+
+def measure_throughput(edgerc_file: str, sizes: list, concurrencies: list, operations: int, seed: int) -> dict:
+    """
+    Measures how many calls of list_shared_policies, get_shared_policy_by_name and get_latest_policy per second
+    the library manages at the provided dataset sizes and numbers of concurrent threads
+    @return: dict of the function names and their results (ops per second and latency percentiles) per size and
+    concurrency
+    """
+    results = {}
+    for size in sizes:
+        with FakeCloudletsServer(FakeDataset(policy_count=size, seed=seed)) as server:
+            policy_ids = list(server.dataset.policies)
+            policy_names = [policy["name"] for policy in server.dataset.policies.values()]
+            randomizer = random.Random(seed)
+            workloads = {
+                "list_shared_policies": lambda client: api.list_shared_policies(client=client),
+                "get_shared_policy_by_name":
+                    lambda client: api.get_shared_policy_by_name(randomizer.choice(policy_names), client=client),
+                "get_latest_policy": lambda client: api.get_latest_policy(randomizer.choice(policy_ids),
+                                                                          client=client),
+            }
+            for name, workload in workloads.items():
+                for concurrency in concurrencies:
+                    client = http_requests.AkamaiClient(edgerc_file, pool_maxsize=concurrency, base_url=server.url)
+                    result = run_concurrently(lambda: workload(client), operations, concurrency)
+                    client.close()
+                    results.setdefault(name, {})[f"size={size},concurrency={concurrency}"] = result
+    return results
+
+
+def run_concurrently(operation, operations: int, concurrency: int) -> dict:
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        durations = list(executor.map(lambda _: get_duration(operation), range(operations)))
+    elapsed = time.perf_counter() - started_at
+    percentiles = statistics.quantiles(durations, n=100) if len(durations) > 1 else durations * 99
+    return {
+        "ops_per_second": round(operations / elapsed, 2),
+        "p50_ms": to_milliseconds(percentiles[49]),
+        "p95_ms": to_milliseconds(percentiles[94]),
+        "p99_ms": to_milliseconds(percentiles[98]),
+    }
+
+
+def measure_json_decoding(version_count: int, rules_per_version: int, iterations: int) -> dict:
+    """
+    Measures decoding of a large listing of policy versions (with their match rules): the standard library, the
+    selected json codec (orjson, if installed) and the incremental parsing of the items out of 64 KiB chunks
+    @return: dict of the decoders and their median milliseconds and peak memory (in KiB, traced on a single run)
+    """
+    listing = {
+        "page": {"number": 0, "size": version_count, "totalElements": version_count, "totalPages": 1},
+        "content": [
+            {"version": version, "description": f"version {version}", "matchRules": [
+                {"type": "erMatchRule", "name": f"rule {rule}", "matchURL": f"/path/{version}/{rule}",
+                 "redirectURL": f"https://www.example.com/target/{rule}", "statusCode": 301,
+                 "useIncomingQueryString": True, "matches": [{"matchType": "hostname", "matchValue": "example.com"}]}
+                for rule in range(rules_per_version)
+            ]} for version in range(version_count)
+        ],
+        "links": []
+    }
+    data = json.dumps(listing).encode("utf-8")
+    chunk_size = json_codec.INCREMENTAL_CHUNK_SIZE
+    decoders = {
+        "stdlib": lambda: json.loads(data),
+        f"codec_{json_codec.get_codec().name}": lambda: json_codec.loads(data),
+        "incremental": lambda: sum(1 for _ in json_codec.iter_content_items(
+            data[i:i + chunk_size] for i in range(0, len(data), chunk_size))),
+    }
+    results = {"document_kib": round(len(data) / 1024, 1)}
+    for name, decode in decoders.items():
+        duration = statistics.median(get_duration(decode) for _ in range(iterations))
+        tracemalloc.start()
+        decode()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {"decode_ms": to_milliseconds(duration), "peak_memory_kib": round(peak / 1024, 1)}
+    return results
+
+
+def get_duration(operation) -> float:
+    started_at = time.perf_counter()
+    operation()
+    return time.perf_counter() - started_at
+
+
+def to_milliseconds(seconds: float) -> float:
+    return round(seconds * 1000, 4)
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """
+    @return: dict of dot-separated metric names and their values
+    """
+    metrics = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name))
+        else:
+            metrics[name] = value
+    return metrics
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Compares the metrics with the baseline; the '_ms' metrics should not grow, the 'ops_per_second' ones should not
+    drop, by more than the threshold
+    @return: list of tuples of the metric name, baseline value, current value, relative change & regression flag
+    """
+    baseline_metrics = flatten(baseline["results"])
+    comparison = []
+    for name, value in flatten(current["results"]).items():
+        previous = baseline_metrics.get(name)
+        if not previous:
+            continue
+        change = (value - previous) / previous
+        if name.endswith("ops_per_second"):
+            regression = change < -threshold
+        else:
+            regression = change > threshold
+        comparison.append((name, previous, value, change, regression))
+    return comparison
+
+
+@click.command()
+@click.option("--output", "output_file", type=click.Path(dir_okay=False, writable=True), default=None,
+              help="Writes the results into this json file (they are printed otherwise).")
+@click.option("--compare", "baseline_file", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Compares the results with this baseline, exits with 1 if any metric regressed.")
+@click.option("--threshold", type=click.FloatRange(min=0), default=0.2,
+              help="Relative change of a metric that is considered a regression.")
+@click.option("--sizes", default="100,1000", help="Comma-separated numbers of policies of the fake account.")
+@click.option("--concurrency", "concurrencies", default="1,8", help="Comma-separated numbers of threads.")
+@click.option("--iterations", type=click.IntRange(min=1), default=200, help="Requests per send_* function.")
+@click.option("--operations", type=click.IntRange(min=2), default=200, help="Calls per throughput measurement.")
+@click.option("--seed", type=click.INT, default=0, help="Seed of the fake account.")
+def main(output_file, baseline_file, threshold, sizes, concurrencies, iterations, operations, seed):
+    """Benchmarks the request pipeline and the library abstractions against the fake Cloudlets server"""
+    with tempfile.TemporaryDirectory() as directory:
+        edgerc_file = os.path.join(directory, "edgerc")
+        with open(edgerc_file, mode="w") as edgerc:
+            edgerc.write(SAMPLE_EDGERC)
+        with contextlib.redirect_stdout(io.StringIO()):
+            with FakeCloudletsServer(FakeDataset(policy_count=100, seed=seed)) as server:
+                request_phases = measure_request_phases(server, edgerc_file, iterations)
+            for client in _pooled_clients.values():
+                client.close()
+            throughput = measure_throughput(edgerc_file, [int(size) for size in sizes.split(",")],
+                                            [int(concurrency) for concurrency in concurrencies.split(",")],
+                                            operations, seed)
+    json_decoding = measure_json_decoding(500, 50, 5)
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "operations": operations
+        },
+        "results": {"request_phases": request_phases, "throughput": throughput, "json_decoding": json_decoding}
+    }
+    if output_file is not None:
+        with open(output_file, mode="w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if baseline_file is not None:
+        with open(baseline_file, mode="r") as baseline:
+            comparison = compare(json.load(baseline), results, threshold)
+        regressions = [row for row in comparison if row[4]]
+        for name, previous, value, change, regression in comparison:
+            print(f"{'REGRESSION ' if regression else ''}{name}: {previous} -> {value} ({change:+.1%})",
+                  file=sys.stderr)
+        if len(regressions) > 0:
+            print(f"{len(regressions)} of {len(comparison)} metrics regressed by more than {threshold:.0%}",
+                  file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,132 +1,104 @@
-import os
+import importlib
+
 import click
-import akamai_shared_cloudlets.akamai_api_requests_abstractions as api
-import akamai_shared_cloudlets.shared as common
 
+# command name: module of the 'commands' package, the command function and its help. The modules (and the
+# libraries they need, such as requests and edgegrid) are imported only when one of their commands is invoked,
+# so '--help' and the argument errors do not pay for them.
+COMMANDS = {
+    "activate-policies": (
+        "activations", "activate_policies",
+        "Submits all (de)activations listed in the file (csv of policy_id,policy_version,network,operation or json)"
+    ),
+    "archive": (
+        "exports", "archive_versions",
+        "Stores all policy versions in a deduplicated archive, every distinct match rule is stored just once"
+    ),
+    "delete-policies": (
+        "policies", "delete_policies",
+        "Deletes all shared policies listed in the file ('-' for stdin, one id or name per line), prints NDJSON"
+    ),
+    "diff-versions": (
+        "versions", "diff_versions",
+        "Compares the match rules of two policy versions (or a version and a local file); exits with 1 if they differ"
+    ),
+    "find-policy-by-id": (
+        "policies", "find_policy_by_id",
+        "Provides the shared policy (including its details) identified by an ID. Returned data is in json format"
+    ),
+    "find-policy-by-name": (
+        "policies", "find_policy_by_name",
+        "Returns the id of the policy identified by the provided name. Returns nothing, if policy not found in Akamai"
+    ),
+    "list-cloudlets": (
+        "policies", "list_cloudlets",
+        "Returns the json with available cloudlet types"
+    ),
+    "list-policies": (
+        "policies", "list_policies",
+        "Returns all available policies"
+    ),
+    "migrate-policies": (
+        "migrations", "migrate_policies",
+        "Clones the non-shared (v2) policies listed in the file into shared ones, resuming an interrupted migration"
+    ),
+    "snapshot": (
+        "exports", "export_snapshot",
+        "Exports all shared policies, their versions and match rules into a JSONL file"
+    ),
+    "sync": (
+        "exports", "sync_policies",
+        "Exports only the policies and versions that changed since the last sync (recorded in the state file)"
+    ),
+}
 
-@click.group()
-def main():
+
+class LazyGroup(click.Group):
     """
-    App to provide abstraction of Akamai shared cloudlets
+    Click group that imports the module of a command only when the command is invoked
     """
-    pass
-
-
-@click.command()
-@click.argument(
-    "policy_id",
-    type=click.STRING,
-)
-@click.option(
-    "--edgerc-location",
-    "edgerc_location",
-    type=click.Path(exists=False),
-    default="~/.edgerc",
-    help="Gives an option to provide your own location of the 'edgerc' file."
-)
-def find_policy_by_id(policy_id, edgerc_location):
-    """Provides the shared policy (including its details) identified by an ID. Returned data is in json format"""
-    edgerc_location = common.get_home_folder(edgerc_location)
-    policy = api.get_policy_by_id(policy_id, edgerc_location)
-    if policy is not None:
-        print(policy)
-    else:
-        print(f"Could not find any policy with ID {policy_id}")
 
+    def __init__(self, *args, lazy_commands: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
 
-@click.command()
-@click.argument(
-    "policy_name",
-    type=click.STRING,
-)
-@click.option(
-    "--edgerc-location",
-    "edgerc_location",
-    type=click.Path(exists=False),
-    default="~/.edgerc",
-    help="Gives an option to provide your own location of the 'edgerc' file."
-)
-def find_policy_by_name(policy_name, edgerc_location):
-    """ Returns the id of the policy identified by the provided name. Returns nothing, if policy not found in Akamai """
-    edgerc = common.get_home_folder(edgerc_location)
-    policy = api.get_shared_policy_by_name(policy_name, edgerc)
-    if len(policy) == 0:
-        print(f"We found no policy matching the name {policy_name}. Please check the input for"
-              f" any typing errors and try again")
-    if len(policy) == 1:
-        final_policy_name = list(policy)[0]
-        policy_id = policy.get(final_policy_name)
-        print(f"We found the following policy matching the name {final_policy_name}: {policy_id} ")
-    else:
-        number_of_policies = len(policy)
-        print(f"We could not find policy matching exactly {policy_name}. Instead we found {number_of_policies} "
-              f"policies that contain the provided policy name '{policy_name}'")
-        for policy, policy_identifier in policy.items():
-            print(f"{policy}: {policy_identifier}")
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
 
+    def get_command(self, ctx, command_name):
+        if command_name in self.lazy_commands and command_name not in self.commands:
+            module_name, function_name, _ = self.lazy_commands[command_name]
+            module = importlib.import_module(f".commands.{module_name}", __package__ or "akamai_shared_cloudlets")
+            self.add_command(getattr(module, function_name), command_name)
+        return super().get_command(ctx, command_name)
 
-@click.command()
-@click.option(
-    "--edgerc-location",
-    "edgerc_location",
-    type=click.Path(exists=False),
-    default="~/.edgerc",
-    help="Gives an option to provide your own location of the 'edgerc' file."
-)
-@click.option(
-    "--response-format",
-    help="Controls how to print the response. If 'text' is chosen, response contains "
-         "just policy names with their respective id"
-         "response_format",
-    type=click.Choice([
-        'json',
-        'text'
-    ],
-        case_sensitive=False
-    )
-)
-def list_policies(edgerc_location, response_format):
-    """ Returns all available policies"""
-    edgerc = common.get_home_folder(edgerc_location)
-    policies = api.list_shared_policies(edgerc)
+    def format_commands(self, ctx, formatter):
+        command_names = self.list_commands(ctx)
+        if len(command_names) == 0:
+            return
+        limit = formatter.width - 6 - max(len(command_name) for command_name in command_names)
+        rows = []
+        for command_name in command_names:
+            if command_name in self.lazy_commands and command_name not in self.commands:
+                short_help = click.Command(command_name, help=self.lazy_commands[command_name][2]) \
+                    .get_short_help_str(limit)
+            else:
+                short_help = self.commands[command_name].get_short_help_str(limit)
+            rows.append((command_name, short_help))
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
 
-    if policies is not None:
-        if response_format == "text":
-            parsed_response = common.get_shared_policies_text(policies)
-            for name, policy_id in sorted(parsed_response.items()):
-                print(name, ':', policy_id)
-        else:
-            print(policies)
-    else:
-        print("No policies found...perhaps your credentials do not grant you permissions to view any policies?")
-
-
-@click.command()
-@click.option(
-    "--edgerc-location",
-    "edgerc_location",
-    type=click.Path(exists=False),
-    default="~/.edgerc",
-    help="Gives an option to provide your own location of the 'edgerc' file."
-)
-def list_cloudlets(edgerc_location):
-    """Returns the json with available cloudlet types"""
-    edgerc_location = common.get_home_folder(edgerc_location)
-    cloudlets = api.list_cloudlets(edgerc_location)
-    if cloudlets is not None:
-        print(cloudlets)
-    else:
-        print(f"Could not find any cloudlet types. Perhaps your credentials file ({edgerc_location})"
-              f" does not grant you enough permissions?")
 
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
+def main():
+    """
+    App to provide abstraction of Akamai shared cloudlets
+    """
+    pass
 
-main.add_command(find_policy_by_name)
-main.add_command(find_policy_by_id)
-main.add_command(list_cloudlets)
-main.add_command(list_policies)
 
 if __name__ == "__main__":
     """
-    Main function 
+    Main function
     """
     main()
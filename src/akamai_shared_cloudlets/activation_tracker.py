@@ -0,0 +1,251 @@
+import heapq
+import queue
+import random
+import threading
+import time
+from collections import namedtuple
+
+from . import akamai_api_requests_abstractions as api
+from . import akamai_project_constants
+from . import http_requests
+
+FINAL_STATUSES = ("SUCCESS", "FAILED")
+
+# error: why the state of the activation could not be found out (its status is then FAILED), None otherwise
+ActivationEvent = namedtuple("ActivationEvent", ["policy_id", "activation_id", "status", "activation", "elapsed",
+                                                 "error"], defaults=[None])
+
+
+class TrackedActivation:
+    """
+    State of an activation that did not finish yet
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.unknown_polls = 0
+        self.error = None
+
+
+class ActivationTracker:
+    """
+    Waits for many in-flight (de)activations at once from a single scheduler thread. Every policy is polled on its
+    own schedule, with the interval growing exponentially (plus some jitter, so the polls do not come in bursts).
+    All the activations of one policy are checked with a single request - the activation itself if there is just one,
+    the activation listing of the policy if there are more of them.
+    """
+
+    def __init__(self,
+                 edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                 client: http_requests.AkamaiClient = None,
+                 initial_interval: float = akamai_project_constants.DEFAULT_POLL_INITIAL_INTERVAL,
+                 max_interval: float = akamai_project_constants.DEFAULT_POLL_MAX_INTERVAL,
+                 backoff_factor: float = 1.5,
+                 jitter: float = 0.2,
+                 max_unknown_polls: int = akamai_project_constants.DEFAULT_POLL_MAX_UNKNOWN):
+        """
+        @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials
+        for your API user
+        @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+        is used
+        @param initial_interval: number of seconds before the first poll of a policy
+        @param max_interval: the interval between the polls never grows over this number of seconds
+        @param backoff_factor: the interval is multiplied by this factor after every poll
+        @param jitter: the interval is randomly shortened or extended by up to this fraction of itself
+        @param max_unknown_polls: an activation whose state could not be found out by this many polls in a row
+        (it is not found or the polls fail) is reported as FAILED
+        """
+        self.client = http_requests.get_client(edgerc_location, client)
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.max_unknown_polls = max_unknown_polls
+        self.completed = []
+        self._pending = {}
+        self._intervals = {}
+        self._schedule = []
+        self._events = queue.Queue()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def track(self, policy_id, activation_id):
+        """
+        Starts tracking the activation; tracking the same activation again has no effect
+        @param policy_id: is the policy identifier
+        @param activation_id: is the identifier of the activation
+        """
+        policy_id = str(policy_id)
+        activation_id = str(activation_id)
+        with self._condition:
+            activations = self._pending.setdefault(policy_id, {})
+            if activation_id in activations:
+                return
+            activations[activation_id] = TrackedActivation()
+            if policy_id not in self._intervals:
+                self._intervals[policy_id] = self.initial_interval
+                heapq.heappush(self._schedule, (time.monotonic() + self._get_delay(policy_id), policy_id))
+            self._start()
+            self._condition.notify_all()
+
+    def track_activation(self, activation: dict):
+        """
+        Starts tracking the activation described by the json returned from request_policy_activation. An activation
+        that already finished is reported right away, without any poll.
+        @param activation: json representing the activation (with 'policyId', 'id' and 'status' keys)
+        """
+        if activation.get("status") in FINAL_STATUSES:
+            with self._condition:
+                self._complete(str(activation["policyId"]), str(activation["id"]), activation, TrackedActivation())
+                self._condition.notify_all()
+        else:
+            self.track(activation["policyId"], activation["id"])
+
+    def pending_count(self) -> int:
+        """
+        @return: number of the tracked activations that did not finish yet
+        """
+        with self._condition:
+            return sum(len(activations) for activations in self._pending.values())
+
+    def wait(self, timeout: float = None) -> list:
+        """
+        Blocks until all the tracked activations finish, the timeout expires or the tracker is closed
+        @param timeout: maximum number of seconds to wait, None means no limit
+        @return: list of ActivationEvent of all the activations that finished so far
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while len(self._pending) > 0 and not self._closed:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return list(self.completed)
+
+    def events(self, timeout: float = None):
+        """
+        Yields the ActivationEvent of every tracked activation as soon as it finishes
+        @param timeout: maximum number of seconds to wait for all of them, None means no limit
+        @return: generator of ActivationEvent; it ends when nothing is tracked anymore, the timeout expires or the
+        tracker is closed
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            try:
+                yield self._events.get_nowait()
+                continue
+            except queue.Empty:
+                pass
+            if (self.pending_count() == 0 or self._closed) and self._events.empty():
+                return
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return
+            try:
+                yield self._events.get(timeout=min(remaining, 1.0) if remaining is not None else 1.0)
+            except queue.Empty:
+                pass
+
+    def close(self):
+        """
+        Stops the scheduler thread; the activations that did not finish are not tracked anymore
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="akamai-activation-tracker", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while len(self._schedule) == 0 and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                due_at, policy_id = self._schedule[0]
+                delay = due_at - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._schedule)
+                activation_ids = list(self._pending.get(policy_id, {}))
+
+            activations = self._poll(policy_id, activation_ids)
+
+            with self._condition:
+                now = time.monotonic()
+                pending = self._pending.get(policy_id, {})
+                for activation_id, (activation, error) in activations.items():
+                    tracked = pending.get(activation_id, None)
+                    if tracked is None:
+                        continue
+                    if activation is not None:
+                        tracked.unknown_polls = 0
+                        if activation.get("status") in FINAL_STATUSES:
+                            pending.pop(activation_id)
+                            self._complete(policy_id, activation_id, activation, tracked)
+                        continue
+                    tracked.unknown_polls += 1
+                    tracked.error = error
+                    if tracked.unknown_polls >= self.max_unknown_polls:
+                        pending.pop(activation_id)
+                        self._complete(policy_id, activation_id, None, tracked,
+                                       f"State unknown after {tracked.unknown_polls} polls: {error}")
+                if len(self._pending.get(policy_id, {})) > 0:
+                    self._intervals[policy_id] = min(self._intervals[policy_id] * self.backoff_factor,
+                                                     self.max_interval)
+                    heapq.heappush(self._schedule, (now + self._get_delay(policy_id), policy_id))
+                else:
+                    self._pending.pop(policy_id, None)
+                    self._intervals.pop(policy_id, None)
+                self._condition.notify_all()
+
+    def _poll(self, policy_id: str, activation_ids: list) -> dict:
+        """
+        Never prints nor raises, the errors are kept with the tracked activations
+        @return: dict of the activation ids and tuples of their json (None if the state could not be found out) and
+        the error message (None if the state is known)
+        """
+        activations = dict.fromkeys(activation_ids)
+        error = "Akamai did not provide the activation"
+        try:
+            if len(activation_ids) > 1:
+                listing = api.list_policy_activations(policy_id, client=self.client)
+                for activation in (listing or {}).get("content", []):
+                    if str(activation.get("id")) in activations:
+                        activations[str(activation["id"])] = activation
+            for activation_id in [key for key, value in activations.items() if value is None]:
+                activations[activation_id] = api.get_policy_activation(policy_id, activation_id, client=self.client)
+        except Exception as exception:
+            error = f"Unable to check the activations of policy {policy_id}: {exception}"
+        return {activation_id: (activation, error if activation is None else None)
+                for activation_id, activation in activations.items()}
+
+    def _complete(self, policy_id: str, activation_id: str, activation: dict, tracked: TrackedActivation,
+                  error: str = None):
+        event = ActivationEvent(
+            policy_id=policy_id,
+            activation_id=activation_id,
+            status=activation.get("status") if activation is not None else "FAILED",
+            activation=activation,
+            elapsed=time.monotonic() - tracked.started_at,
+            error=error
+        )
+        self.completed.append(event)
+        self._events.put(event)
+
+    def _get_delay(self, policy_id: str) -> float:
+        interval = self._intervals[policy_id]
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
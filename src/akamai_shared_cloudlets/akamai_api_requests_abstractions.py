@@ -3,39 +3,108 @@
 from . import akamai_enums
 from . import akamai_project_constants
 from . import exceptions
+from . import group_index
 from . import http_requests
+from . import pagination
+from . import policy_index
+from . import tracing
 
 
-def list_shared_policies(edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+@tracing.traced
+def list_shared_policies(
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None):
     """
     listSharedPolicies is a method that abstracts the Akamai API call to get all shared policies available
      to the provided credentials. What policies are available to the credentials depends on the permissions
      assigned to the API user that created the credentials.
 
-    There are no parameters to be provided.
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @return: json response from the API call (if http status code was 200) or None in case it was
     anything else.
     """
     api_path = "/cloudlets/v3/policies"
-    response = http_requests.send_get_request(api_path, {}, edgerc_location)
+    response = http_requests.send_get_request(api_path, {}, edgerc_location, client)
     if response.status_code == 200:
         return response.json()
     return None
 
 
+def iter_shared_policies(
+        page_size: int = akamai_project_constants.DEFAULT_PAGE_SIZE,
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None,
+        prefetch: bool = True,
+        incremental: bool = False):
+    """
+    Yields all shared policies available to the provided credentials one by one. Contrary to list_shared_policies,
+    it walks all the pages of the listing (downloading the next page while the current one is being consumed),
+    so even accounts with thousands of policies are processed in constant memory.
+    @param page_size: how many policies should be requested in one 'page'
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @param prefetch: whether to download the next page in the background
+    @param incremental: whether to parse every page while it is being downloaded (without prefetching), so
+    not even a whole page is held in memory
+    @return: generator of the policies (dicts as provided by Akamai)
+    @raise ApiRequestFailed: if any of the pages could not be downloaded
+    """
+    api_path = "/cloudlets/v3/policies"
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    yield from pagination.iter_items(akamai_client, api_path, page_size, prefetch=prefetch,
+                                     incremental=incremental)
+
+
+def build_policy_name_index(
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None,
+        ttl: float = None) -> policy_index.PolicyNameIndex:
+    """
+    Creates the index of all shared policies by their name. The policies are downloaded on the first lookup
+    (and again whenever the index is older than ttl or 'refresh' is called on it).
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @param ttl: number of seconds after which the index downloads the policies again, None means never
+    @return: PolicyNameIndex that can be passed to get_shared_policy_by_name & co.
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    return policy_index.PolicyNameIndex(lambda: iter_shared_policies(client=akamai_client), ttl)
+
+
+@tracing.traced
 def get_shared_policy_by_name(
         policy_name: str,
-        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION) -> dict:
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None,
+        index: policy_index.PolicyNameIndex = None) -> dict:
     """
     Returns Shared cloudlet policyId based on the policy name. If not found, returns None... If no match is found using
     exact comparison, we return all items matching partially
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @param index: a PolicyNameIndex to look the name up in, instead of downloading the policies for every call
     @param policy_name: is the name of the policy we'll be looking for in all policies
-    @return: dict that contains the policy (or policies) matching the name
-    """
+    @return: dict that contains the policy (or policies) matching the name, empty if the policies could not be listed
+    """
+    if index is not None:
+        try:
+            policy_id = index.get(policy_name)
+            if policy_id is not None:
+                return {policy_name: policy_id}
+            return index.find_by_substring(policy_name)
+        except exceptions.ApiRequestFailed:
+            return {}
     response_dict = {}
-    response_json = list_shared_policies(edgerc_location)
+    response_json = list_shared_policies(edgerc_location, client)
     if response_json is not None:
         policies = response_json["content"]
         for policy_object in policies:
@@ -58,52 +127,71 @@ def get_policies_by_approximate_name(response_json, policy_name: str) -> dict:
     if response_json is not None:
         all_policies = response_json["content"]
         for policy_object in all_policies:
-            if policy_name.lower() in policy_object["name"]:
+            if policy_name.lower() in policy_object["name"].lower():
                 policy = policy_object["name"]
                 policy_id = policy_object["id"]
                 result_list.update({policy: policy_id})
     return result_list
 
 
+@tracing.traced
 def get_shared_policies_by_approximate_name(
         policy_name: str,
-        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None,
+        index: policy_index.PolicyNameIndex = None):
     """
     Provides a dictionary of policy name (as key) and their IDs (as value) where policy name contains the provided
-    search string. If request failed (http status code != 200), or nothing was found, returns empty dictionary.
+    search string (case-insensitive). If request failed (http status code != 200), or nothing was found, returns empty
+    dictionary.
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @param index: a PolicyNameIndex to look the name up in, instead of downloading the policies for every call
     @param policy_name: is a string we want to find in the shared policies (needle)
     @return: dictionary of policy names & ids, if nothing was found, returns empty dict
     """
-    response_json = list_shared_policies(edgerc_location)
+    if index is not None:
+        return index.find_by_substring(policy_name)
+    response_json = list_shared_policies(edgerc_location, client)
     return get_policies_by_approximate_name(response_json, policy_name)
 
 
-def get_policy_by_id(policy_id: str, edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION) -> object:
+@tracing.traced
+def get_policy_by_id(
+        policy_id: str,
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None) -> object:
     """
     Returns the json string representing the shared policy identified by the provided 'policyId'
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @param policy_id: is the policy_id we're looking for
     @return: json representing the Akamai response or None if nothing was found (or request to API failed)
     """
     api_path = f"/cloudlets/v3/policies/{policy_id}"
-    response = http_requests.send_get_request(api_path, {}, edgerc_location)
+    response = http_requests.send_get_request(api_path, {}, edgerc_location, client)
     if response.status_code == 200:
         return response.json()
     return None
 
 
+@tracing.traced
 def list_policy_versions(
         policy_id: str,
         page_number: int,
         page_size: int,
-        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None):
     """
     Fetches the policy versions (including their metadata, but not their contents)
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @param policy_id: is the id we need to identify the policy
     @param page_number: in case there are more policy versions than page_size param, this can be leveraged
     to build pagination
@@ -115,114 +203,194 @@ def list_policy_versions(
         "page": str(page_number),
         "size": str(page_size)
     }
-    response = http_requests.send_get_request(api_path, query_params, edgerc_location)
+    response = http_requests.send_get_request(api_path, query_params, edgerc_location, client)
     if response.status_code == 200:
         return response.json()
     return None
 
 
-def get_latest_policy_version(policy_id: str, edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+def iter_policy_versions(
+        policy_id: str,
+        page_size: int = akamai_project_constants.DEFAULT_PAGE_SIZE,
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None,
+        prefetch: bool = True,
+        incremental: bool = False):
+    """
+    Yields all versions (their metadata, not contents) of the policy one by one, walking all the pages
+    of the listing
+    @param policy_id: is the id we need to identify the policy
+    @param page_size: how many versions should be requested in one 'page'
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @param prefetch: whether to download the next page in the background
+    @param incremental: whether to parse every page while it is being downloaded (without prefetching), so
+    not even a whole page is held in memory
+    @return: generator of the policy versions
+    @raise ApiRequestFailed: if any of the pages could not be downloaded
+    """
+    api_path = f"/cloudlets/v3/policies/{policy_id}/versions"
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    yield from pagination.iter_items(akamai_client, api_path, page_size, prefetch=prefetch,
+                                     incremental=incremental)
+
+
+@tracing.traced
+def get_latest_policy_version(
+        policy_id: str,
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None):
     """
     Returns the latest version number of the policy identified by its ID
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @param policy_id: is the identifier we need to find the policy
     @return: version number or None if nothing was found or an error occurred
     """
-    latest_policy = get_latest_policy(policy_id, edgerc_location)
+    latest_policy = get_latest_policy(policy_id, edgerc_location, client)
     if latest_policy is not None:
         return latest_policy["version"]
     return None
 
 
-def get_latest_policy(policy_id: str, edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+@tracing.traced
+def get_latest_policy(
+        policy_id: str,
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None):
     """
-    Returns the latest policy version (we assume there are less than 1000 versions of the policy,
-    if there are more, this may not be reliable). This relies on current Akamai API behaviour that listing
-    all policies arranges the response in a way that the latest policy is in fact the 'first' (on the top).
+    Returns the latest policy version. Akamai lists the versions from the newest one, so only the smallest page
+    of the listing is requested, no matter how many versions the policy has. The client keeps the latest version
+    of every policy (see LatestVersionCache), so the repeated lookups are free: it is dropped as soon as the client
+    creates or updates a version of the policy, versions created by other clients show up once it expires.
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @param policy_id: is the identifier we need to find the policy
     @return: the latest policy contents or None if nothing was found or an error has occurred
     """
-    all_policies = list_policy_versions(policy_id, 0, 1000, edgerc_location)
-    if all_policies is not None:
-        all_policies_content = all_policies.get("content", None)
-        return all_policies_content[0]
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    latest_policy = akamai_client.latest_versions.get(policy_id)
+    if latest_policy is not None:
+        return latest_policy
+    generation = akamai_client.latest_versions.get_generation(policy_id)
+    latest_policies = list_policy_versions(policy_id, 0, akamai_project_constants.MIN_PAGE_SIZE, edgerc_location,
+                                           akamai_client)
+    if latest_policies is not None:
+        latest_policies_content = latest_policies.get("content", None)
+        if latest_policies_content:
+            akamai_client.latest_versions.set(policy_id, latest_policies_content[0], generation)
+            return latest_policies_content[0]
     return None
 
 
-def list_cloudlets(edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+@tracing.traced
+def list_cloudlets(
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None):
     """
     Returns all available cloudlet types that we can access, as json-encoded value
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @return: all available cloudlet types, or None, if an error has occurred (http status was not 200)
     """
     api_path = "/cloudlets/v3/cloudlet-info"
-    response = http_requests.send_get_request(api_path, {}, edgerc_location)
+    response = http_requests.send_get_request(api_path, {}, edgerc_location, client)
     if response.status_code == 200:
         return response.json()
     return None
 
 
-def list_groups(edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+@tracing.traced
+def list_groups(
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None):
     """
     Provides all groups with a request targeting the APIv2 to get the list of groups (including their member
     properties)
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @return: json representing the Akamai response or None, if an error has occurred (http status was not 200)
     """
     api_path = "/cloudlets/api/v2/group-info"
-    response = http_requests.send_get_request(api_path, {}, edgerc_location)
+    response = http_requests.send_get_request(api_path, {}, edgerc_location, client)
     if response.status_code == 200:
         return response.json()
     return None
 
 
-def get_group_id(edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+def get_group_index(
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None) -> group_index.GroupIndex:
+    """
+    Provides the index of the groups of the client, so the groups are listed once per client and then looked up
+    by id or name without asking Akamai (see group_index.configure_group_indexes for its TTL and disk cache)
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @return: GroupIndex that can be passed to get_group_id & get_group_id_by_name
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    return group_index.get_index(akamai_client, lambda: list_groups(client=akamai_client))
+
+
+@tracing.traced
+def get_group_id(
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None,
+        index: group_index.GroupIndex = None):
     """
     Returns dict of groupIDs and their associated names
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @param index: GroupIndex to use, if not provided, the index of the client is used
     @return: dict where groupId is the key and group name the value, or None, if nothing was found or
     an error has occurred
     """
-    all_groups = list_groups(edgerc_location)
-    if all_groups is not None:
-        groups = {}
-        for element in all_groups:
-            groups.update({element["groupId"]: element["groupName"]})
-        return groups
-    return None
+    groups = index if index is not None else get_group_index(edgerc_location, client)
+    return groups.to_dict()
 
 
+@tracing.traced
 def get_group_id_by_name(
         group_name: str,
-        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION) -> object:
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None,
+        index: group_index.GroupIndex = None) -> object:
     """
-    Provides the id of the group identified by its name. Caution: returns the first entry found.
+    Provides the id of the group identified by its name (case does not matter). If no group has such name, the
+    first group whose name contains it is returned.
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @param group_name: is the string we're looking for
+    @param index: GroupIndex to use, if not provided, the index of the client is used
     @return: string representing the group_id or None in case nothing was found, or an error has occurred
     """
-    all_groups = list_groups(edgerc_location)
-    if all_groups is not None:
-        for element in all_groups:
-            if element["groupName"].lower() == group_name.lower():
-                return element["groupId"]
-            if group_name.lower() in element["groupName"].lower():
-                return element["groupId"]
-    return None
+    groups = index if index is not None else get_group_index(edgerc_location, client)
+    return groups.find_id(group_name)
 
 
+@tracing.traced
 def create_shared_policy(group_id: str,
                          policy_name: str,
                          description: str,
                          cloudlet_type: str,
-                         edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION) -> object:
+                         edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                         client: http_requests.AkamaiClient = None) -> object:
     """
     Creates new shared policy and returns the Akamai response
     @param group_id: is the group_id where we want to create the new shared policy
@@ -232,6 +400,8 @@ def create_shared_policy(group_id: str,
     @param cloudlet_type: is an 'enum' of the cloudlet policy types; permitted values are (for example): 'ER'
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @return: a dict of policy_id & policy_name or string representing the error message returned by Akamai
     """
     post_body = {
@@ -242,7 +412,7 @@ def create_shared_policy(group_id: str,
         "name": policy_name
     }
     api_path = "/cloudlets/v3/policies"
-    response = http_requests.send_post_request(api_path, post_body, edgerc_location)
+    response = http_requests.send_post_request(api_path, post_body, edgerc_location, client)
     response_json = response.json()
     if response.status_code == 201:
         return {
@@ -253,53 +423,67 @@ def create_shared_policy(group_id: str,
     return response_json["errors"]
 
 
-def delete_shared_policy(policy_id: str, edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+@tracing.traced
+def delete_shared_policy(
+        policy_id: str,
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None):
     """
     Deletes shared policy identified by its id
     @param policy_id: is the policy id we want to remove
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @return: a string informing about the operation result
     """
     api_path = f"/cloudlets/v3/policies/{policy_id}"
-    response = http_requests.send_delete_request(api_path, edgerc_location)
+    response = http_requests.send_delete_request(api_path, edgerc_location, client)
     if response.status_code == 403:
         return f"No permissions to delete policy with id '{policy_id}'"
     if response.status_code == 404:
         return f"We could not find policy to delete - are you sure {policy_id} is correct?"
     if response.status_code == 204:
-        return "Policy was deleted successfully"
+        return akamai_project_constants.POLICY_DELETED_MESSAGE
     return f"Received status code we did not expect: {response.status_code}. Policy was NOT deleted."
 
 
+@tracing.traced
 def delete_shared_policy_by_name(
         policy_name: str,
-        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
-    """
-    Deletes shared policy based on the provided name. This request first downloads all available policies from
-    Akamai and then looks through the returned data to determine the policy (therefore, if 'user' knows the
-    policy he/she wants to delete, it would be more effective to call the 'delete_shared_policy' and providing
-    the policy directly).
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None,
+        index: policy_index.PolicyNameIndex = None):
+    """
+    Deletes shared policy based on the provided name. Unless the index is provided, this request first downloads all
+    available policies from Akamai and then looks through the returned data to determine the policy (therefore, if
+    'user' knows the policy he/she wants to delete, it would be more effective to call the 'delete_shared_policy' and
+    providing the policy directly).
     @param policy_name: is the name of the policy you wish to delete, needs to be exact
     match for the lookup to work
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @param index: a PolicyNameIndex to look the name up in; the policy is dropped from it only on its next refresh
     @return: string response indicating success / error message
     """
-    policy = get_shared_policy_by_name(policy_name, edgerc_location)
+    policy = get_shared_policy_by_name(policy_name, edgerc_location, client, index)
     if len(policy) == 0:
         print(f"Unable to find policy with name {policy_name}. No policy was deleted")
     elif len(policy) == 1:
         policy_id = next(iter(policy.values()))
-        return delete_shared_policy(str(policy_id), edgerc_location)
+        return delete_shared_policy(str(policy_id), edgerc_location, client)
     else:
         print(f"More than one policies returned based on name '{policy_name}'. Not deleting anything...")
 
 
+@tracing.traced
 def get_active_properties(policy_id: str,
                           page_number: str = "1",
                           page_size: str = "100",
-                          edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+                          edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                          client: http_requests.AkamaiClient = None):
     """
     Returns all active properties that are assigned to the policy.
     @param policy_id: is the unique policy identifier
@@ -307,6 +491,8 @@ def get_active_properties(policy_id: str,
     @param page_size: in case you wish to paginate the results, you can control the page size
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @return: json response representing the akamai response or None if we encountered an error (such as
     provided policy_id does not exist etc...)
     """
@@ -315,15 +501,44 @@ def get_active_properties(policy_id: str,
         "page": page_number,
         "size": page_size
     }
-    response = http_requests.send_get_request(api_path, query_params, edgerc_location)
+    response = http_requests.send_get_request(api_path, query_params, edgerc_location, client)
     if response.status_code == 200:
         return response.json()
     return None
 
 
+def iter_active_properties(
+        policy_id: str,
+        page_size: int = akamai_project_constants.DEFAULT_PAGE_SIZE,
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: http_requests.AkamaiClient = None,
+        prefetch: bool = True,
+        incremental: bool = False):
+    """
+    Yields all active properties that are assigned to the policy one by one, walking all the pages of the listing
+    @param policy_id: is the unique policy identifier
+    @param page_size: how many properties should be requested in one 'page'
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @param prefetch: whether to download the next page in the background
+    @param incremental: whether to parse every page while it is being downloaded (without prefetching), so
+    not even a whole page is held in memory
+    @return: generator of the properties
+    @raise ApiRequestFailed: if any of the pages could not be downloaded
+    """
+    api_path = f"/cloudlets/v3/policies/{policy_id}/properties"
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    yield from pagination.iter_items(akamai_client, api_path, page_size, prefetch=prefetch,
+                                     incremental=incremental)
+
+
+@tracing.traced
 def get_policy_version(policy_id: str,
                        policy_version: str,
-                       edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+                       edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                       client: http_requests.AkamaiClient = None):
     """
     Returns information about a shared policy version, including match rules for a
     Cloudlet that you're using and whether its locked for changes.
@@ -331,21 +546,25 @@ def get_policy_version(policy_id: str,
     @param policy_version: is the policy version we're interested in
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @return: json response representing the information you're looking for or None in case
     nothing was found (for example policy_id was incorrect or version does not exist)
     """
     api_path = f"/cloudlets/v3/policies/{policy_id}/versions/{policy_version}"
-    response = http_requests.send_get_request(api_path, {}, edgerc_location)
+    response = http_requests.send_get_request(api_path, {}, edgerc_location, client)
     if response.status_code == 200:
         return response.json()
     return None
 
 
+@tracing.traced
 def clone_non_shared_policy(policy_id: str,
                             additional_version: list,
                             shared_policy_name: str,
                             group_id: str,
-                            edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+                            edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                            client: http_requests.AkamaiClient = None):
     """
     Clones the staging, production, and last modified versions of a non-shared (API v2) or shared policy
     into a new shared policy.
@@ -356,6 +575,8 @@ def clone_non_shared_policy(policy_id: str,
     API v2 policy)
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @return: policy_id of the new (API v3) policy or None in case something went wrong
     """
     api_path = f"/cloudlets/v3/policies/{policy_id}/clone"
@@ -365,18 +586,20 @@ def clone_non_shared_policy(policy_id: str,
         "newName": shared_policy_name
     }
 
-    response = http_requests.send_post_request(api_path, post_body, edgerc_location)
+    response = http_requests.send_post_request(api_path, post_body, edgerc_location, client)
     if response.status_code == 200:
         json_response = response.json()
         return json_response["id"]
     return None
 
 
+@tracing.traced
 def activate_policy(policy_id: str,
                     network: str,
                     operation: str,
                     policy_version: str,
-                    edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION) -> bool:
+                    edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                    client: http_requests.AkamaiClient = None) -> bool:
     """
     Activates or deactivates the selected Cloudlet policy version on the staging or production networks
     @param policy_version: is the policy version that is to be (de)activated
@@ -387,9 +610,38 @@ def activate_policy(policy_id: str,
     @param policy_id: is the policy identifier - that tells us which policy is to be activated
     @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
      your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
     @return bool indicating whether the (de)activation request was accepted by Akamai or not (true if yes,
     false if no)
     """
+    activation = request_policy_activation(policy_id, network, operation, policy_version, edgerc_location, client)
+    if activation is not None:
+        if activation["status"] == "SUCCESS":
+            return True
+    return False
+
+
+@tracing.traced
+def request_policy_activation(policy_id: str,
+                              network: str,
+                              operation: str,
+                              policy_version: str,
+                              edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                              client: http_requests.AkamaiClient = None):
+    """
+    Asks Akamai to activate or deactivate the policy version, the same way as activate_policy does, but provides
+    the details of the activation (such as its id and status) rather than just a bool
+    @param policy_id: is the policy identifier - that tells us which policy is to be activated
+    @param network: either 'PRODUCTION' or 'STAGING'
+    @param operation: either 'ACTIVATION' or 'DEACTIVATION'
+    @param policy_version: is the policy version that is to be (de)activated
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @return: json representing the activation or None if Akamai did not accept the request (http status was not 202)
+    """
     if is_akamai_network(network.lower()) is not True:
         raise exceptions.IncorrectInputParameter(f"Network parameter (akamai_network) must be either 'production' "
                                                  f"or 'stage. Instead, it was {network}")
@@ -405,13 +657,61 @@ def activate_policy(policy_id: str,
         "policyVersion": policy_version
     }
 
-    response = http_requests.send_post_request(api_path, post_body, edgerc_location)
+    response = http_requests.send_post_request(api_path, post_body, edgerc_location, client)
     if response.status_code == 202:
-        json_response = response.json()
-        result = json_response["status"]
-        if result == "SUCCESS":
-            return True
-    return False
+        return response.json()
+    return None
+
+
+@tracing.traced
+def get_policy_activation(policy_id: str,
+                          activation_id: str,
+                          edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                          client: http_requests.AkamaiClient = None):
+    """
+    Returns the current state of the policy (de)activation
+    @param policy_id: is the policy identifier
+    @param activation_id: is the identifier of the activation (provided by request_policy_activation)
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @return: json representing the activation (including its 'status') or None if nothing was found or an error
+    has occurred
+    """
+    api_path = f"/cloudlets/v3/policies/{policy_id}/activations/{activation_id}"
+    response = http_requests.send_get_request(api_path, {}, edgerc_location, client)
+    if response.status_code == 200:
+        return response.json()
+    return None
+
+
+@tracing.traced
+def list_policy_activations(policy_id: str,
+                            page_number: int = 0,
+                            page_size: int = akamai_project_constants.DEFAULT_PAGE_SIZE,
+                            edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                            client: http_requests.AkamaiClient = None):
+    """
+    Returns the (de)activations of the policy, the most recent ones first
+    @param policy_id: is the policy identifier
+    @param page_number: number of the page we want to get
+    @param page_size: how many records should be returned in one 'page'
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse (and keep the connections alive), if not provided, the default
+    client of the credentials file is used
+    @return: json-encoded contents of the response or None, if an error occurred
+    """
+    api_path = f"/cloudlets/v3/policies/{policy_id}/activations"
+    query_params = {
+        "page": str(page_number),
+        "size": str(page_size)
+    }
+    response = http_requests.send_get_request(api_path, query_params, edgerc_location, client)
+    if response.status_code == 200:
+        return response.json()
+    return None
 
 
 def is_akamai_network(obj):
@@ -2,3 +2,17 @@ from enum import Enum
 
 DEFAULT_EDGERC_LOCATION = "~/.edgerc"
 JSON_CONTENT_TYPE = "application/json"
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_POLL_INITIAL_INTERVAL = 5
+DEFAULT_POLL_MAX_INTERVAL = 60
+# polls in a row that may not find out the state of an activation before it is reported as failed
+DEFAULT_POLL_MAX_UNKNOWN = 10
+MIN_PAGE_SIZE = 10
+# seconds after which the group index lists the groups again
+DEFAULT_GROUP_INDEX_TTL = 3600
+# seconds the client reuses the latest version of a policy it looked up (versions created elsewhere show up later)
+DEFAULT_LATEST_VERSION_TTL = 60
+POLICY_DELETED_MESSAGE = "Policy was deleted successfully"
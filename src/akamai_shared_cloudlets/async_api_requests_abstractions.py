@@ -0,0 +1,184 @@
+# asyncio counterparts of the library functions
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from . import akamai_api_requests_abstractions as api
+from . import akamai_project_constants
+from . import http_requests
+
+
+class AsyncAkamaiClient:
+    """
+    Asyncio client for the shared cloudlets API. Requests are EdgeGrid-signed and sent through one pooled
+    AkamaiClient; a semaphore bounds how many of them are in flight at once, so it is safe to fan out hundreds
+    of coroutines with 'asyncio.gather'.
+    """
+
+    def __init__(self,
+                 edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                 max_concurrency: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY,
+                 client: http_requests.AkamaiClient = None):
+        """
+        @param edgerc_location: location of the edgerc file, defaults to ~/.edgerc if not provided
+        @param max_concurrency: maximum number of requests sent to Akamai at the same time
+        @param client: an existing AkamaiClient to send the requests with, if not provided, a new one with a pool
+        large enough for max_concurrency connections is created (and closed together with this client)
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, it was {max_concurrency}")
+        self._owns_client = client is None
+        if client is None:
+            client = http_requests.AkamaiClient(edgerc_location, pool_maxsize=max_concurrency)
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="akamai-async")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the worker threads and closes the underlying client, unless it was provided by the caller
+        """
+        self._executor.shutdown(wait=False)
+        if self._owns_client:
+            self.client.close()
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Runs one of the blocking library functions with the pooled client, respecting the concurrency limit
+        @param function: function from 'akamai_api_requests_abstractions' that accepts the 'client' parameter
+        @return: whatever the function returns
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            # the context (such as the current tracing span) is carried over to the worker thread
+            context = contextvars.copy_context()
+            call = functools.partial(context.run, function, *args, client=self.client, **kwargs)
+            return await loop.run_in_executor(self._executor, call)
+
+
+async def list_shared_policies(client: AsyncAkamaiClient):
+    """
+    Provides all shared policies available to the credentials, see api.list_shared_policies
+    @param client: AsyncAkamaiClient to send the request with
+    @return: json response from the API call or None in case the http status code was not 200
+    """
+    return await client.run(api.list_shared_policies)
+
+
+async def get_policy_by_id(policy_id: str, client: AsyncAkamaiClient):
+    """
+    Provides the shared policy identified by its id, see api.get_policy_by_id
+    @param policy_id: is the policy_id we're looking for
+    @param client: AsyncAkamaiClient to send the request with
+    @return: json representing the Akamai response or None if nothing was found (or request to API failed)
+    """
+    return await client.run(api.get_policy_by_id, policy_id)
+
+
+async def list_policy_versions(policy_id: str, page_number: int, page_size: int, client: AsyncAkamaiClient):
+    """
+    Fetches the policy versions (including their metadata, but not their contents), see api.list_policy_versions
+    @param policy_id: is the id we need to identify the policy
+    @param page_number: number of the page we want to get
+    @param page_size: how many records should be returned in one 'page'
+    @param client: AsyncAkamaiClient to send the request with
+    @return: json-encoded contents of the response or None, if an error occurred or nothing was found
+    """
+    return await client.run(api.list_policy_versions, policy_id, page_number, page_size)
+
+
+async def get_policy_version(policy_id: str, policy_version: str, client: AsyncAkamaiClient):
+    """
+    Returns information about a shared policy version, including its match rules, see api.get_policy_version
+    @param policy_id: is the policy's unique identifier
+    @param policy_version: is the policy version we're interested in
+    @param client: AsyncAkamaiClient to send the request with
+    @return: json response or None in case nothing was found
+    """
+    return await client.run(api.get_policy_version, policy_id, policy_version)
+
+
+async def get_active_properties(policy_id: str,
+                                client: AsyncAkamaiClient,
+                                page_number: str = "1",
+                                page_size: str = "100"):
+    """
+    Returns all active properties that are assigned to the policy, see api.get_active_properties
+    @param policy_id: is the unique policy identifier
+    @param client: AsyncAkamaiClient to send the request with
+    @param page_number: in case you wish to paginate the results, you can request the records on specific page
+    @param page_size: in case you wish to paginate the results, you can control the page size
+    @return: json response or None if we encountered an error
+    """
+    return await client.run(api.get_active_properties, policy_id, page_number, page_size)
+
+
+async def activate_policy(policy_id: str,
+                          network: str,
+                          operation: str,
+                          policy_version: str,
+                          client: AsyncAkamaiClient) -> bool:
+    """
+    Activates or deactivates the selected policy version on the staging or production network,
+    see api.activate_policy
+    @param policy_id: is the policy identifier
+    @param network: either 'production' or 'staging'
+    @param operation: either 'activation' or 'deactivation'
+    @param policy_version: is the policy version that is to be (de)activated
+    @param client: AsyncAkamaiClient to send the request with
+    @return: bool indicating whether the (de)activation request was accepted by Akamai or not
+    """
+    return await client.run(api.activate_policy, policy_id, network, operation, policy_version)
+
+
+async def clone_non_shared_policy(policy_id: str,
+                                  additional_version: list,
+                                  shared_policy_name: str,
+                                  group_id: str,
+                                  client: AsyncAkamaiClient):
+    """
+    Clones the non-shared (API v2) policy into a new shared policy, see api.clone_non_shared_policy
+    @param policy_id: is the unique identifier of non-shared (api v2) policy
+    @param additional_version: additional version numbers you wish to 'copy' from the old API v2 policy
+    @param shared_policy_name: new name of the policy
+    @param group_id: is the id of the group where you wish to store the new policy
+    @param client: AsyncAkamaiClient to send the request with
+    @return: policy_id of the new (API v3) policy or None in case something went wrong
+    """
+    return await client.run(api.clone_non_shared_policy, policy_id, additional_version, shared_policy_name, group_id)
+
+
+async def create_shared_policy(group_id: str,
+                               policy_name: str,
+                               description: str,
+                               cloudlet_type: str,
+                               client: AsyncAkamaiClient):
+    """
+    Creates new shared policy, see api.create_shared_policy
+    @param group_id: is the group_id where we want to create the new shared policy
+    @param policy_name: is the name of the policy
+    @param description: is a short textual description of the policy
+    @param cloudlet_type: is an 'enum' of the cloudlet policy types, such as 'ER'
+    @param client: AsyncAkamaiClient to send the request with
+    @return: a dict of policy_id & policy_name or the errors returned by Akamai
+    """
+    return await client.run(api.create_shared_policy, group_id, policy_name, description, cloudlet_type)
+
+
+async def delete_shared_policy(policy_id: str, client: AsyncAkamaiClient):
+    """
+    Deletes shared policy identified by its id, see api.delete_shared_policy
+    @param policy_id: is the policy id we want to remove
+    @param client: AsyncAkamaiClient to send the request with
+    @return: a string informing about the operation result
+    """
+    return await client.run(api.delete_shared_policy, policy_id)
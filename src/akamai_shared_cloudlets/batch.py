@@ -0,0 +1,184 @@
+import json
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+from . import akamai_api_requests_abstractions as api
+from . import akamai_project_constants
+from . import http_requests
+from . import policy_index
+
+BatchResult = namedtuple("BatchResult", ["input", "ok", "result", "error", "duration"])
+
+
+def read_batch_input(lines):
+    """
+    @param lines: iterable of lines, such as an open file or sys.stdin
+    @return: generator of the stripped lines, skipping the empty ones and the comments (starting with '#')
+    """
+    for line in lines:
+        line = line.strip()
+        if len(line) > 0 and not line.startswith("#"):
+            yield line
+
+
+def iter_batch(operation, items, max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY):
+    """
+    Runs the operation for every item through a bounded pool of workers and yields the results as soon as they
+    complete (so not necessarily in the order of the items). At most twice as many items as there are workers are
+    taken from the iterable ahead, so the items may be streamed (from stdin for example). Failure of one item does
+    not stop the others.
+    @param operation: callable accepting the item and returning a tuple of the result and the error message (None
+    if the operation succeeded)
+    @param items: iterable of the inputs of the operation
+    @param max_workers: how many operations run at the same time
+    @return: generator of BatchResult
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="akamai-batch") as executor:
+        pending = set()
+        for item in items:
+            pending.add(executor.submit(run_operation, operation, item))
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
+
+
+def run_operation(operation, item) -> BatchResult:
+    """
+    Runs the operation for a single item, never raises - any error is part of the result
+    @return: BatchResult
+    """
+    started_at = time.monotonic()
+    try:
+        result, error = operation(item)
+    except Exception as exception:
+        result, error = None, str(exception)
+    return BatchResult(input=item, ok=error is None, result=result, error=error,
+                       duration=time.monotonic() - started_at)
+
+
+def find_policies_by_id(policy_ids,
+                        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                        client: http_requests.AkamaiClient = None,
+                        max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY):
+    """
+    Fetches many shared policies over one client
+    @param policy_ids: iterable of the policy ids
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param max_workers: how many policies are fetched at the same time
+    @return: generator of BatchResult (in the completion order) with the policy json as the result
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+
+    def find_policy(policy_id: str):
+        policy = api.get_policy_by_id(policy_id, client=akamai_client)
+        if policy is None:
+            return None, f"Could not find any policy with ID {policy_id}"
+        return policy, None
+
+    return iter_batch(find_policy, policy_ids, max_workers)
+
+
+def find_policies_by_name(policy_names,
+                          edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                          client: http_requests.AkamaiClient = None,
+                          index: policy_index.PolicyNameIndex = None,
+                          max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY):
+    """
+    Looks many policy names up in one name index, so the policies are listed only once for the whole batch
+    @param policy_names: iterable of the policy names
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param index: PolicyNameIndex to use, if not provided, a new one is built
+    @param max_workers: how many names are looked up at the same time
+    @return: generator of BatchResult (in the completion order); the result is the dict of the matching policy names
+    and ids, which is an error unless exactly one policy matches
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    name_index = index if index is not None else api.build_policy_name_index(client=akamai_client)
+
+    def find_policy(policy_name: str):
+        policies = api.get_shared_policy_by_name(policy_name, client=akamai_client, index=name_index)
+        if len(policies) == 0:
+            return policies, f"We found no policy matching the name {policy_name}"
+        if len(policies) > 1:
+            return policies, f"{len(policies)} policies contain the provided policy name '{policy_name}'"
+        return policies, None
+
+    return iter_batch(find_policy, policy_names, max_workers)
+
+
+def delete_policies(policy_ids,
+                    edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                    client: http_requests.AkamaiClient = None,
+                    max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY):
+    """
+    Deletes many shared policies over one client
+    @param policy_ids: iterable of the ids of the policies to delete
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param max_workers: how many policies are deleted at the same time
+    @return: generator of BatchResult (in the completion order)
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    return iter_batch(lambda policy_id: delete_policy(policy_id, akamai_client), policy_ids, max_workers)
+
+
+def delete_policies_by_name(policy_names,
+                            edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                            client: http_requests.AkamaiClient = None,
+                            index: policy_index.PolicyNameIndex = None,
+                            max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY):
+    """
+    Deletes many shared policies identified by their exact names, which are resolved through one name index
+    @param policy_names: iterable of the names of the policies to delete
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param index: PolicyNameIndex to use, if not provided, a new one is built
+    @param max_workers: how many policies are deleted at the same time
+    @return: generator of BatchResult (in the completion order)
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    name_index = index if index is not None else api.build_policy_name_index(client=akamai_client)
+
+    def delete_policy_by_name(policy_name: str):
+        policy_id = name_index.get(policy_name)
+        if policy_id is None:
+            return None, f"Unable to find policy with name {policy_name}. No policy was deleted"
+        return delete_policy(str(policy_id), akamai_client)
+
+    return iter_batch(delete_policy_by_name, policy_names, max_workers)
+
+
+def delete_policy(policy_id: str, client: http_requests.AkamaiClient):
+    message = api.delete_shared_policy(policy_id, client=client)
+    result = {"policy_id": policy_id, "message": message}
+    if message != akamai_project_constants.POLICY_DELETED_MESSAGE:
+        return result, message
+    return result, None
+
+
+def to_json_line(result: BatchResult) -> str:
+    """
+    @return: the result as a single line of json (NDJSON record) with 'input', 'ok', 'result', 'error' and
+    'duration_ms' keys
+    """
+    return json.dumps({
+        "input": result.input,
+        "ok": result.ok,
+        "result": result.result,
+        "error": result.error,
+        "duration_ms": round(result.duration * 1000, 2)
+    })
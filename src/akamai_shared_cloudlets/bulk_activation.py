@@ -0,0 +1,199 @@
+import csv
+import json
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+from . import akamai_api_requests_abstractions as api
+from . import akamai_enums
+from . import akamai_project_constants
+from . import exceptions
+from . import http_requests
+from . import policy_diff
+from .throttling import TokenBucket
+
+ActivationRequest = namedtuple("ActivationRequest", ["policy_id", "policy_version", "network", "operation"])
+
+ActivationResult = namedtuple("ActivationResult", ["request", "accepted", "activation", "error", "duration", "skipped"],
+                              defaults=(False,))
+
+
+class BulkActivationReport:
+    """
+    Aggregated outcome of the bulk activation
+    """
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+        self.skipped = []
+        self.duration = 0.0
+
+    def add(self, result: ActivationResult):
+        if result.skipped:
+            self.skipped.append(result)
+        elif result.accepted:
+            self.succeeded.append(result)
+        else:
+            self.failed.append(result)
+
+    def summary(self) -> dict:
+        """
+        @return: dict with the counts of the accepted, failed & skipped requests and the timings
+        """
+        durations = [result.duration for result in self.succeeded + self.failed + self.skipped]
+        return {
+            "total": len(durations),
+            "succeeded": len(self.succeeded),
+            "failed": len(self.failed),
+            "skipped": len(self.skipped),
+            "duration": round(self.duration, 3),
+            "slowest_request": round(max(durations), 3) if durations else None
+        }
+
+
+def load_activation_requests(file_name: str) -> list:
+    """
+    Reads the activations to perform from a file. Json files (.json) contain a list of objects with 'policy_id',
+    'policy_version', 'network' and 'operation' keys, any other file is read as csv with the same columns (in this
+    order, header line is optional). The operation may be omitted, it defaults to 'activation'.
+    @param file_name: location of the file, '-' reads the csv from the standard input
+    @return: list of ActivationRequest
+    """
+    if file_name == "-":
+        return read_activation_requests(sys.stdin, json_format=False)
+    with open(file_name, mode="r", newline="") as requests_file:
+        return read_activation_requests(requests_file, json_format=file_name.endswith(".json"))
+
+
+def read_activation_requests(requests_file, json_format: bool) -> list:
+    """
+    @param requests_file: open file with the activations (see load_activation_requests)
+    @param json_format: whether the file is json (or csv)
+    @return: list of ActivationRequest
+    """
+    if json_format:
+        rows = [
+            [item.get("policy_id"), item.get("policy_version"), item.get("network"), item.get("operation")]
+            for item in json.load(requests_file)
+        ]
+    else:
+        rows = [row for row in csv.reader(requests_file) if len(row) > 0 and not row[0].startswith("#")]
+        if len(rows) > 0 and rows[0][0].strip() == "policy_id":
+            rows = rows[1:]
+    return [to_activation_request(row) for row in rows]
+
+
+def to_activation_request(row) -> ActivationRequest:
+    """
+    @param row: sequence of policy id, version, network and (optionally) the operation
+    @return: ActivationRequest
+    """
+    if len(row) < 3:
+        raise exceptions.IncorrectInputParameter(f"Activation needs policy id, version and network, got {row}")
+    operation = row[3] if len(row) > 3 and row[3] else akamai_enums.ActivationOperations.ACTIVATION.value
+    return ActivationRequest(str(row[0]).strip(), str(row[1]).strip(), str(row[2]).strip(), str(operation).strip())
+
+
+def iter_activations(activation_requests,
+                     edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                     client: http_requests.AkamaiClient = None,
+                     max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY,
+                     requests_per_second: float = None,
+                     skip_unchanged: bool = False):
+    """
+    Submits the activations through a bounded pool of workers and yields the results as soon as they complete
+    (so not necessarily in the order of the requests). At most twice as many activations as there are workers are
+    queued at once, so the requests may be streamed. Failure of one activation does not stop the others.
+    @param activation_requests: iterable of ActivationRequest (or tuples of policy id, version, network, operation)
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param max_workers: how many activations are submitted at the same time
+    @param requests_per_second: upper limit of the submitted activations per second, None means no limit
+    @param skip_unchanged: if True, the activations of versions with the same match rules as the version already
+    active on the network are not submitted (their results are 'skipped')
+    @return: generator of ActivationResult
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="akamai-activation") as executor:
+        pending = set()
+        for activation_request in activation_requests:
+            pending.add(executor.submit(submit_activation, to_activation_request(activation_request), akamai_client,
+                                        rate_limiter, skip_unchanged))
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
+
+
+def activate_policies(activation_requests,
+                      edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                      client: http_requests.AkamaiClient = None,
+                      max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY,
+                      requests_per_second: float = None,
+                      on_result=None,
+                      skip_unchanged: bool = False) -> BulkActivationReport:
+    """
+    Submits all the activations (see iter_activations) and aggregates their results
+    @param on_result: optional callable that gets every ActivationResult as soon as it is available
+    @return: BulkActivationReport
+    """
+    report = BulkActivationReport()
+    started_at = time.monotonic()
+    for result in iter_activations(activation_requests, edgerc_location, client, max_workers, requests_per_second,
+                                   skip_unchanged):
+        report.add(result)
+        if on_result is not None:
+            on_result(result)
+    report.duration = time.monotonic() - started_at
+    return report
+
+
+def submit_activation(activation_request: ActivationRequest,
+                      client: http_requests.AkamaiClient,
+                      rate_limiter: TokenBucket = None,
+                      skip_unchanged: bool = False) -> ActivationResult:
+    """
+    Submits a single activation, never raises - any error is part of the result
+    @param skip_unchanged: whether to skip the activation if the active version has identical match rules
+    @return: ActivationResult
+    """
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    started_at = time.monotonic()
+    activation = None
+    error = None
+    try:
+        if skip_unchanged and is_activation(activation_request) and policy_diff.get_equivalent_active_version(
+                activation_request.policy_id, activation_request.network, activation_request.policy_version,
+                client=client) is not None:
+            return ActivationResult(request=activation_request, accepted=False, activation=None, error=None,
+                                    duration=time.monotonic() - started_at, skipped=True)
+        activation = api.request_policy_activation(
+            activation_request.policy_id,
+            activation_request.network,
+            activation_request.operation,
+            activation_request.policy_version,
+            client=client
+        )
+        if activation is None:
+            error = "Akamai did not accept the activation request"
+    except Exception as exception:
+        error = str(exception)
+    return ActivationResult(
+        request=activation_request,
+        accepted=activation is not None,
+        activation=activation,
+        error=error,
+        duration=time.monotonic() - started_at
+    )
+
+
+def is_activation(activation_request: ActivationRequest) -> bool:
+    return activation_request.operation.lower() == akamai_enums.ActivationOperations.ACTIVATION.value
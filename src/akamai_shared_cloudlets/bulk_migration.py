@@ -0,0 +1,271 @@
+import csv
+import json
+import os
+import statistics
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timezone
+
+from . import akamai_api_requests_abstractions as api
+from . import akamai_project_constants
+from . import exceptions
+from . import http_requests
+from . import policy_index
+from .throttling import TokenBucket
+
+MigrationRequest = namedtuple("MigrationRequest", ["policy_id", "new_name", "group_id", "additional_versions"])
+
+# status: 'migrated' (cloned now or by a previous run), 'existing' (a shared policy with the new name already
+# existed, so nothing was cloned) or 'failed'
+MigrationResult = namedtuple("MigrationResult", ["request", "status", "new_policy_id", "error", "duration", "resumed"])
+
+MIGRATED = "migrated"
+EXISTING = "existing"
+FAILED = "failed"
+STARTED = "started"
+
+
+class BulkMigrationReport:
+    """
+    Aggregated outcome of the bulk migration
+    """
+
+    def __init__(self):
+        self.migrated = []
+        self.existing = []
+        self.failed = []
+        self.duration = 0.0
+
+    def add(self, result: MigrationResult):
+        {MIGRATED: self.migrated, EXISTING: self.existing, FAILED: self.failed}[result.status].append(result)
+
+    def summary(self) -> dict:
+        """
+        @return: dict with the counts of the migrated, existing & failed policies and the latencies of the clones
+        sent by this run
+        """
+        results = self.migrated + self.existing + self.failed
+        durations = sorted(result.duration for result in results if not result.resumed)
+        return {
+            "total": len(results),
+            "migrated": len(self.migrated),
+            "existing": len(self.existing),
+            "failed": len(self.failed),
+            "resumed": sum(1 for result in results if result.resumed),
+            "duration": round(self.duration, 3),
+            "p50_latency": round(statistics.median(durations), 3) if durations else None,
+            "p95_latency": round(durations[int(0.95 * (len(durations) - 1))], 3) if durations else None,
+            "max_latency": round(durations[-1], 3) if durations else None
+        }
+
+
+class MigrationJournal:
+    """
+    Append-only JSONL log of the migration progress. Every clone is recorded as 'started' before it is sent and
+    with its outcome once it is answered, so a run that crashed or was interrupted knows what was done already.
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.entries = load_journal(file_name)
+        self._lock = threading.Lock()
+        self._journal = open(file_name, mode="a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
+
+    def get(self, policy_id):
+        """
+        @return: the last journal entry of the v2 policy, None if it was never migrated
+        """
+        return self.entries.get(str(policy_id), None)
+
+    def record(self, request: MigrationRequest, status: str, new_policy_id=None, error: str = None,
+               duration: float = None):
+        entry = {
+            "policy_id": str(request.policy_id),
+            "new_name": request.new_name,
+            "status": status,
+            "new_policy_id": new_policy_id,
+            "error": error,
+            "duration": round(duration, 3) if duration is not None else None,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock:
+            self._journal.write(json.dumps(entry) + "\n")
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self.entries[entry["policy_id"]] = entry
+
+
+def load_journal(file_name: str) -> dict:
+    """
+    @param file_name: the journal, it does not have to exist
+    @return: dict of the v2 policy ids and their last journal entries; a truncated last line (of a crashed run)
+    is ignored
+    """
+    entries = {}
+    if not os.path.exists(file_name):
+        return entries
+    with open(file_name, mode="r") as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            entries[entry["policy_id"]] = entry
+    return entries
+
+
+def load_migration_requests(file_name: str) -> list:
+    """
+    Reads the policies to migrate from a file. Json files (.json) contain a list of objects with 'policy_id',
+    'new_name', 'group_id' and 'additional_versions' (list of numbers) keys, any other file is read as csv with the
+    same columns (in this order, header line is optional), the additional versions separated by spaces or
+    semicolons. The additional versions may be omitted.
+    @param file_name: location of the file
+    @return: list of MigrationRequest
+    """
+    with open(file_name, mode="r", newline="") as requests_file:
+        if file_name.endswith(".json"):
+            rows = [
+                [item.get("policy_id"), item.get("new_name"), item.get("group_id"), item.get("additional_versions")]
+                for item in json.load(requests_file)
+            ]
+        else:
+            rows = [row for row in csv.reader(requests_file) if len(row) > 0 and not row[0].startswith("#")]
+            if len(rows) > 0 and rows[0][0].strip() == "policy_id":
+                rows = rows[1:]
+    return [to_migration_request(row) for row in rows]
+
+
+def to_migration_request(row) -> MigrationRequest:
+    """
+    @param row: sequence of the v2 policy id, the new name, the group id and (optionally) the additional versions
+    @return: MigrationRequest
+    """
+    if len(row) < 3 or not all(row[:3]):
+        raise exceptions.IncorrectInputParameter(f"Migration needs policy id, new name and group id, got {row}")
+    additional_versions = row[3] if len(row) > 3 and row[3] else []
+    if isinstance(additional_versions, str):
+        additional_versions = additional_versions.replace(";", " ").split()
+    return MigrationRequest(str(row[0]).strip(), str(row[1]).strip(), str(row[2]).strip(),
+                            [int(version) for version in additional_versions])
+
+
+def iter_migrations(migration_requests,
+                    journal_file: str,
+                    edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                    client: http_requests.AkamaiClient = None,
+                    max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY,
+                    requests_per_second: float = None,
+                    index: policy_index.PolicyNameIndex = None):
+    """
+    Clones the non-shared (API v2) policies into the new shared ones through a bounded pool of workers and yields
+    the results as soon as they complete. The progress is recorded in the journal, so running the migration again
+    (after a crash or an interruption) does not clone the migrated policies again: they are taken from the journal,
+    and the clones that were sent, but not answered, are looked up by their new names first. Failure of one
+    migration does not stop the others. At most twice as many clones as there are workers are queued at once.
+    Every request also takes a token from the shared rate limiter (see throttling.configure_shared_rate_limiter),
+    if there is one.
+    @param migration_requests: iterable of MigrationRequest (or tuples of policy id, new name, group id, versions)
+    @param journal_file: where the progress is recorded (and read from, when the migration is resumed)
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param max_workers: how many policies are cloned at the same time
+    @param requests_per_second: upper limit of the clones sent per second, None means no limit
+    @param index: PolicyNameIndex of the shared policies, if not provided, a new one is built on the first lookup
+    @return: generator of MigrationResult
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    name_index = index if index is not None else api.build_policy_name_index(client=akamai_client)
+    rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+    with MigrationJournal(journal_file) as journal:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="akamai-migration") as executor:
+            pending = set()
+            for migration_request in migration_requests:
+                migration_request = to_migration_request(migration_request)
+                entry = journal.get(migration_request.policy_id)
+                if entry is not None and entry["status"] in (MIGRATED, EXISTING):
+                    yield MigrationResult(migration_request, entry["status"], entry["new_policy_id"], None, 0.0, True)
+                    continue
+                pending.add(executor.submit(migrate_policy, migration_request, akamai_client, journal, name_index,
+                                            rate_limiter))
+                if len(pending) >= max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in as_completed(pending):
+                yield future.result()
+
+
+def migrate_policies(migration_requests,
+                     journal_file: str,
+                     edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                     client: http_requests.AkamaiClient = None,
+                     max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY,
+                     requests_per_second: float = None,
+                     on_result=None,
+                     index: policy_index.PolicyNameIndex = None) -> BulkMigrationReport:
+    """
+    Migrates all the policies (see iter_migrations) and aggregates their results
+    @param on_result: optional callable that gets every MigrationResult as soon as it is available
+    @return: BulkMigrationReport
+    """
+    report = BulkMigrationReport()
+    started_at = time.monotonic()
+    for result in iter_migrations(migration_requests, journal_file, edgerc_location, client, max_workers,
+                                  requests_per_second, index):
+        report.add(result)
+        if on_result is not None:
+            on_result(result)
+    report.duration = time.monotonic() - started_at
+    return report
+
+
+def migrate_policy(migration_request: MigrationRequest,
+                   client: http_requests.AkamaiClient,
+                   journal: MigrationJournal,
+                   index: policy_index.PolicyNameIndex,
+                   rate_limiter: TokenBucket = None) -> MigrationResult:
+    """
+    Clones a single policy, unless a shared policy with its new name exists already; never raises - any error is
+    part of the result
+    @return: MigrationResult
+    """
+    started_at = time.monotonic()
+    try:
+        existing_policy_id = index.get(migration_request.new_name)
+        if existing_policy_id is not None:
+            entry = journal.get(migration_request.policy_id)
+            # the clone sent by the interrupted run made it to Akamai
+            status = MIGRATED if entry is not None and entry["status"] == STARTED else EXISTING
+            duration = time.monotonic() - started_at
+            journal.record(migration_request, status, existing_policy_id, duration=duration)
+            return MigrationResult(migration_request, status, existing_policy_id, None, duration, False)
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        journal.record(migration_request, STARTED)
+        new_policy_id = api.clone_non_shared_policy(migration_request.policy_id,
+                                                    migration_request.additional_versions,
+                                                    migration_request.new_name, migration_request.group_id,
+                                                    client=client)
+        error = None if new_policy_id is not None else "Akamai did not clone the policy"
+    except Exception as exception:
+        new_policy_id = None
+        error = str(exception)
+    duration = time.monotonic() - started_at
+    status = MIGRATED if error is None else FAILED
+    journal.record(migration_request, status, new_policy_id, error, duration)
+    return MigrationResult(migration_request, status, new_policy_id, error, duration, False)
@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import json_codec
+
+
+class RequestCoalescer:
+    """
+    Single-flight layer of the GET requests, used by AkamaiClient. While a request is in flight, identical requests
+    (same credentials, path and query parameters) do not go to Akamai: they wait for it and get the same response, or
+    the same exception. Every waiter gets its own copy of the response, decoding its own json document from the body
+    downloaded once, so a caller changing what it got does not change it for the others. Once the request completes,
+    the next identical one is sent again - nothing is cached (see ResponseCache for that).
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.collapsed = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, key: str, send, timings: dict = None):
+        """
+        @param key: identity of the request, such as the credentials and the full url
+        @param send: callable without parameters that sends the request and returns the response
+        @param timings: dict of the request timings; a waiter records the seconds it waited under the 'wait' key
+        @return: the response of the request in flight with the same key (a copy of it), or of the one sent now
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key, None)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = Future()
+                self._in_flight[key] = in_flight
+                self.sent += 1
+            else:
+                self.collapsed += 1
+        if not is_leader:
+            started_at = time.perf_counter()
+            try:
+                return copy_response(in_flight.result())
+            finally:
+                if timings is not None:
+                    timings["wait"] = time.perf_counter() - started_at
+        try:
+            response = send()
+            in_flight.set_result(response)
+        except BaseException as exception:
+            in_flight.set_exception(exception)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return in_flight.result()
+
+    def stats(self) -> dict:
+        """
+        @return: dict with the number of the requests sent, of those collapsed into a request in flight and of the
+        requests in flight right now
+        """
+        with self._lock:
+            return {"sent": self.sent, "collapsed": self.collapsed, "in_flight": len(self._in_flight)}
+
+
+def copy_response(response):
+    """
+    @param response: requests.Response (anything else is returned as it is)
+    @return: copy of the response with its own headers and its own json document, decoded when it is asked for
+    """
+    if not isinstance(response, requests.Response):
+        return response
+    response_copy = requests.Response.__new__(requests.Response)
+    response_copy.__dict__.update(response.__dict__)
+    response_copy.headers = CaseInsensitiveDict(response.headers)
+    return json_codec.install_decoder(response_copy)
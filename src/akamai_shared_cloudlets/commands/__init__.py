@@ -0,0 +1 @@
+# the cli commands; every module is imported only when one of its commands is invoked
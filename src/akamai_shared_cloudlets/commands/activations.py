@@ -0,0 +1,113 @@
+import json
+import sys
+
+import click
+
+from .. import activation_tracker
+from .. import batch
+from .. import bulk_activation
+from .. import shared as common
+
+
+@click.command()
+@click.argument(
+    "activations_file",
+    type=click.Path(exists=True, dir_okay=False, allow_dash=True),
+)
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=10,
+    help="How many activations are submitted at the same time."
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Maximum number of activations submitted per second."
+)
+@click.option(
+    "--wait",
+    "wait_timeout",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Waits up to this number of seconds for the accepted activations to finish."
+)
+@click.option(
+    "--ndjson",
+    "ndjson_output",
+    is_flag=True,
+    default=False,
+    help="Prints every result as a line of json, in the order the activations complete."
+)
+@click.option(
+    "--skip-unchanged",
+    is_flag=True,
+    default=False,
+    help="Does not activate the versions whose match rules are identical to the version active on the network."
+)
+def activate_policies(activations_file, edgerc_location, max_workers, rate, wait_timeout, ndjson_output,
+                      skip_unchanged):
+    """Submits all (de)activations listed in the file (csv of policy_id,policy_version,network,operation or json)"""
+    edgerc = common.get_home_folder(edgerc_location)
+    activation_requests = bulk_activation.load_activation_requests(activations_file)
+
+    def print_result(result):
+        request = result.request
+        if ndjson_output:
+            outcome = {"skipped": True} if result.skipped else result.activation
+            print(batch.to_json_line(batch.BatchResult(request._asdict(), result.accepted or result.skipped, outcome,
+                                                       result.error, result.duration)), flush=True)
+            return
+        if result.skipped:
+            outcome = "skipped, the active version has identical match rules"
+        else:
+            outcome = "accepted" if result.accepted else f"FAILED ({result.error})"
+        print(f"{request.policy_id} v{request.policy_version} {request.network} {request.operation}: {outcome} "
+              f"in {result.duration:.2f}s")
+
+    report = bulk_activation.activate_policies(activation_requests, edgerc, max_workers=max_workers,
+                                               requests_per_second=rate, on_result=print_result,
+                                               skip_unchanged=skip_unchanged)
+    summary = report.summary()
+    if not ndjson_output:
+        print(f"{summary['succeeded']} of {summary['total']} activations accepted, {summary['failed']} failed, "
+              f"{summary['skipped']} skipped, took {summary['duration']}s")
+    failed_activations = 0
+    if wait_timeout is not None and len(report.succeeded) > 0:
+        failed_activations = wait_for_activations(edgerc, report, wait_timeout, ndjson_output)
+    if len(report.failed) > 0 or failed_activations > 0:
+        sys.exit(1)
+
+
+def wait_for_activations(edgerc: str, report: bulk_activation.BulkActivationReport, wait_timeout: float,
+                         ndjson_output: bool) -> int:
+    """
+    Prints the activations accepted by Akamai as they finish
+    @return: number of the activations that finished with the FAILED status
+    """
+    failed_activations = 0
+    with activation_tracker.ActivationTracker(edgerc) as tracker:
+        for result in report.succeeded:
+            tracker.track_activation(result.activation)
+        for event in tracker.events(timeout=wait_timeout):
+            if event.status == "FAILED":
+                failed_activations += 1
+            if ndjson_output:
+                print(json.dumps({"policy_id": event.policy_id, "activation_id": event.activation_id,
+                                  "status": event.status, "elapsed": round(event.elapsed, 3), "error": event.error}),
+                      flush=True)
+            else:
+                reason = f" ({event.error})" if event.error is not None else ""
+                print(f"{event.policy_id} activation {event.activation_id}: {event.status}{reason} after "
+                      f"{event.elapsed:.0f}s")
+        if tracker.pending_count() > 0 and not ndjson_output:
+            print(f"{tracker.pending_count()} activations did not finish in {wait_timeout}s")
+    return failed_activations
@@ -0,0 +1,131 @@
+import json
+
+import click
+
+from .. import delta_sync
+from .. import shared as common
+from .. import snapshot
+from .. import version_store
+
+
+@click.command(name="snapshot")
+@click.argument(
+    "output_file",
+    type=click.Path(dir_okay=False, writable=True),
+)
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=10,
+    help="How many requests are sent to Akamai at the same time."
+)
+@click.option(
+    "--compression",
+    type=click.Choice(snapshot.COMPRESSIONS),
+    default=None,
+    help="Compression of the output, guessed from the file name ('.gz', '.zst') if not provided."
+)
+@click.option(
+    "--rules/--no-rules",
+    "include_rules",
+    default=True,
+    help="Whether to export the match rules of every version or just the versions' metadata."
+)
+def export_snapshot(output_file, edgerc_location, max_workers, compression, include_rules):
+    """Exports all shared policies, their versions and match rules into a JSONL file"""
+    edgerc = common.get_home_folder(edgerc_location)
+    manifest = snapshot.export_snapshot(output_file, edgerc, max_workers=max_workers, compression=compression,
+                                        include_rules=include_rules)
+    counts = manifest["counts"]
+    print(f"Exported {counts['policies']} policies and {counts['versions']} versions in {manifest['duration']}s, "
+          f"{len(manifest['errors'])} errors, see {output_file}.manifest.json")
+
+
+@click.command(name="sync")
+@click.argument(
+    "state_file",
+    type=click.Path(dir_okay=False, writable=True),
+)
+@click.argument(
+    "output_file",
+    type=click.Path(dir_okay=False, writable=True),
+)
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=10,
+    help="How many requests are sent to Akamai at the same time."
+)
+@click.option(
+    "--changelog",
+    "changelog_file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Writes the list of added, modified and deleted policies into this json file."
+)
+def sync_policies(state_file, output_file, edgerc_location, max_workers, changelog_file):
+    """Exports only the policies and versions that changed since the last sync (recorded in the state file)"""
+    edgerc = common.get_home_folder(edgerc_location)
+    changes = delta_sync.sync_policies(state_file, output_file, edgerc, max_workers=max_workers)
+    if changelog_file is not None:
+        with open(changelog_file, mode="w") as changelog:
+            json.dump(changes, changelog, indent=2)
+    print(f"{len(changes['added'])} policies added, {len(changes['modified'])} modified, "
+          f"{len(changes['deleted'])} deleted, {changes['unchanged']} unchanged; {changes['versions_fetched']} "
+          f"versions downloaded in {changes['duration']}s, {len(changes['errors'])} errors")
+
+
+@click.command(name="archive")
+@click.argument(
+    "store_file",
+    type=click.Path(dir_okay=False, writable=True),
+)
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=10,
+    help="How many requests are sent to Akamai at the same time."
+)
+@click.option(
+    "--from-snapshot",
+    "snapshot_file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Imports the versions of this snapshot (created by the 'snapshot' command) instead of downloading them."
+)
+def archive_versions(store_file, edgerc_location, max_workers, snapshot_file):
+    """Stores all policy versions in a deduplicated archive, every distinct match rule is stored just once"""
+    with version_store.VersionStore(store_file) as store:
+        if snapshot_file is not None:
+            imported = version_store.import_snapshot(store, snapshot_file)
+            print(f"Imported {imported} versions from {snapshot_file}")
+        else:
+            edgerc = common.get_home_folder(edgerc_location)
+            result = version_store.archive_versions(store, edgerc, max_workers=max_workers)
+            print(f"Archived {result['versions_fetched']} versions of {result['policies']} policies "
+                  f"({result['versions_skipped']} already archived) in {result['duration']}s, "
+                  f"{len(result['errors'])} errors")
+        stats = store.stats()
+    print(f"The archive holds {stats['versions']} versions referencing {stats['rule_references']} match rules, "
+          f"{stats['rules']} of them distinct")
@@ -0,0 +1,78 @@
+import sys
+
+import click
+
+from .. import batch
+from .. import bulk_migration
+from .. import shared as common
+
+
+@click.command()
+@click.argument(
+    "mapping_file",
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "--journal",
+    "journal_file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Where the progress is recorded; running the command again with the same journal resumes the migration. "
+         "Defaults to the mapping file with the '.journal' suffix."
+)
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=10,
+    help="How many policies are cloned at the same time."
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Maximum number of clones sent per second."
+)
+@click.option(
+    "--ndjson",
+    "ndjson_output",
+    is_flag=True,
+    default=False,
+    help="Prints every result as a line of json, in the order the migrations complete."
+)
+def migrate_policies(mapping_file, journal_file, edgerc_location, max_workers, rate, ndjson_output):
+    """Clones the non-shared (v2) policies listed in the file into shared ones, resuming an interrupted migration"""
+    edgerc = common.get_home_folder(edgerc_location)
+    migration_requests = bulk_migration.load_migration_requests(mapping_file)
+
+    def print_result(result):
+        request = result.request
+        if ndjson_output:
+            outcome = {"status": result.status, "new_policy_id": result.new_policy_id, "resumed": result.resumed}
+            print(batch.to_json_line(batch.BatchResult(request._asdict(), result.status != bulk_migration.FAILED,
+                                                       outcome, result.error, result.duration)), flush=True)
+            return
+        if result.status == bulk_migration.FAILED:
+            outcome = f"FAILED ({result.error})"
+        elif result.resumed:
+            outcome = f"{result.status} by a previous run as {result.new_policy_id}"
+        else:
+            outcome = f"{result.status} as {result.new_policy_id}"
+        print(f"{request.policy_id} -> '{request.new_name}': {outcome} in {result.duration:.2f}s")
+
+    report = bulk_migration.migrate_policies(migration_requests, journal_file or f"{mapping_file}.journal", edgerc,
+                                             max_workers=max_workers, requests_per_second=rate,
+                                             on_result=print_result)
+    summary = report.summary()
+    if not ndjson_output:
+        print(f"{summary['migrated']} of {summary['total']} policies migrated ({summary['resumed']} by previous runs), "
+              f"{summary['existing']} existed already, {summary['failed']} failed, took {summary['duration']}s; "
+              f"clone latency p50 {summary['p50_latency']}s, p95 {summary['p95_latency']}s")
+    if len(report.failed) > 0:
+        sys.exit(1)
@@ -0,0 +1,228 @@
+import sys
+
+import click
+
+from .. import akamai_api_requests_abstractions as api
+from .. import batch
+from .. import exceptions
+from .. import shared as common
+
+
+@click.command()
+@click.argument(
+    "policy_id",
+    type=click.STRING,
+    required=False,
+)
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--batch",
+    "batch_file",
+    type=click.File(mode="r"),
+    default=None,
+    help="Reads the policy ids (one per line) from this file ('-' for stdin) and prints the results as NDJSON."
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=10,
+    help="How many policy ids are processed at the same time in the batch mode."
+)
+def find_policy_by_id(policy_id, edgerc_location, batch_file, max_workers):
+    """Provides the shared policy (including its details) identified by an ID. Returned data is in json format"""
+    edgerc_location = common.get_home_folder(edgerc_location)
+    if batch_file is not None:
+        print_batch_results(batch.find_policies_by_id(batch.read_batch_input(batch_file), edgerc_location,
+                                                      max_workers=max_workers))
+        return
+    if policy_id is None:
+        raise click.UsageError("Provide either the POLICY_ID or the --batch file")
+    policy = api.get_policy_by_id(policy_id, edgerc_location)
+    if policy is not None:
+        print(policy)
+    else:
+        print(f"Could not find any policy with ID {policy_id}")
+
+
+@click.command()
+@click.argument(
+    "policy_name",
+    type=click.STRING,
+    required=False,
+)
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--batch",
+    "batch_file",
+    type=click.File(mode="r"),
+    default=None,
+    help="Reads the policy names (one per line) from this file ('-' for stdin) and prints the results as NDJSON."
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=10,
+    help="How many policy names are processed at the same time in the batch mode."
+)
+def find_policy_by_name(policy_name, edgerc_location, batch_file, max_workers):
+    """ Returns the id of the policy identified by the provided name. Returns nothing, if policy not found in Akamai """
+    edgerc = common.get_home_folder(edgerc_location)
+    if batch_file is not None:
+        print_batch_results(batch.find_policies_by_name(batch.read_batch_input(batch_file), edgerc,
+                                                        max_workers=max_workers))
+        return
+    if policy_name is None:
+        raise click.UsageError("Provide either the POLICY_NAME or the --batch file")
+    index = api.build_policy_name_index(edgerc)
+    policy = api.get_shared_policy_by_name(policy_name, edgerc, index=index)
+    if len(policy) == 0:
+        print(f"We found no policy matching the name {policy_name}. Please check the input for"
+              f" any typing errors and try again")
+    elif len(policy) == 1:
+        final_policy_name = list(policy)[0]
+        policy_id = policy.get(final_policy_name)
+        print(f"We found the following policy matching the name {final_policy_name}: {policy_id} ")
+    else:
+        number_of_policies = len(policy)
+        print(f"We could not find policy matching exactly {policy_name}. Instead we found {number_of_policies} "
+              f"policies that contain the provided policy name '{policy_name}'")
+        for policy, policy_identifier in policy.items():
+            print(f"{policy}: {policy_identifier}")
+
+
+@click.command()
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--response-format",
+    help="Controls how to print the response. If 'text' is chosen, response contains "
+         "just policy names with their respective id. 'ndjson' (a policy per line), 'compact' (json array) "
+         "and 'tsv' are written while the policies are being downloaded",
+    type=click.Choice([
+        'json',
+        'text',
+        *common.STREAMING_FORMATS
+    ],
+        case_sensitive=False
+    )
+)
+@click.option(
+    "--fields",
+    default=None,
+    help="Comma-separated fields of the policies to print in the streaming formats, such as 'id,name' "
+         "(nested fields are separated by dots). All fields are printed by default ('id,name' for 'tsv')."
+)
+def list_policies(edgerc_location, response_format, fields):
+    """ Returns all available policies"""
+    edgerc = common.get_home_folder(edgerc_location)
+    if response_format is not None and response_format.lower() in common.STREAMING_FORMATS:
+        print_policies(edgerc, response_format.lower(), fields.split(",") if fields else None)
+        return
+    policies = api.list_shared_policies(edgerc)
+
+    if policies is not None:
+        if response_format == "text":
+            parsed_response = common.get_shared_policies_text(policies)
+            for name, policy_id in sorted(parsed_response.items()):
+                print(name, ':', policy_id)
+        else:
+            print(policies)
+    else:
+        print("No policies found...perhaps your credentials do not grant you permissions to view any policies?")
+
+
+def print_policies(edgerc: str, response_format: str, fields):
+    """
+    Writes the policies to stdout page by page as they are downloaded, so the memory stays flat
+    """
+    try:
+        for chunk in common.iter_formatted_output(api.iter_shared_policies(edgerc_location=edgerc), response_format,
+                                                  [field.strip() for field in fields] if fields else None):
+            sys.stdout.write(chunk)
+    except (exceptions.ApiRequestFailed, exceptions.PaginationError) as exception:
+        sys.stdout.flush()
+        print(f"Listing of the policies failed: {exception}", file=sys.stderr)
+        sys.exit(1)
+
+
+@click.command()
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+def list_cloudlets(edgerc_location):
+    """Returns the json with available cloudlet types"""
+    edgerc_location = common.get_home_folder(edgerc_location)
+    cloudlets = api.list_cloudlets(edgerc_location)
+    if cloudlets is not None:
+        print(cloudlets)
+    else:
+        print(f"Could not find any cloudlet types. Perhaps your credentials file ({edgerc_location})"
+              f" does not grant you enough permissions?")
+
+
+@click.command()
+@click.argument(
+    "input_file",
+    type=click.File(mode="r"),
+)
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--by-name",
+    is_flag=True,
+    default=False,
+    help="The file contains the exact policy names instead of the policy ids."
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=10,
+    help="How many policies are deleted at the same time."
+)
+def delete_policies(input_file, edgerc_location, by_name, max_workers):
+    """Deletes all shared policies listed in the file ('-' for stdin, one id or name per line), prints NDJSON"""
+    edgerc = common.get_home_folder(edgerc_location)
+    items = batch.read_batch_input(input_file)
+    if by_name:
+        results = batch.delete_policies_by_name(items, edgerc, max_workers=max_workers)
+    else:
+        results = batch.delete_policies(items, edgerc, max_workers=max_workers)
+    print_batch_results(results)
+
+
+def print_batch_results(results):
+    """
+    Prints every BatchResult as a line of json as soon as it is available, exits with 1 if any of them failed
+    """
+    failed = 0
+    for result in results:
+        print(batch.to_json_line(result), flush=True)
+        failed += 0 if result.ok else 1
+    if failed > 0:
+        sys.exit(1)
@@ -0,0 +1,69 @@
+import json
+import sys
+
+import click
+
+from .. import exceptions
+from .. import policy_diff
+from .. import shared as common
+
+
+@click.command(name="diff-versions")
+@click.argument(
+    "policy_id",
+    type=click.STRING,
+)
+@click.argument(
+    "policy_version",
+    type=click.STRING,
+)
+@click.argument(
+    "other_version",
+    type=click.STRING,
+    required=False,
+)
+@click.option(
+    "--edgerc-location",
+    "edgerc_location",
+    type=click.Path(exists=False),
+    default="~/.edgerc",
+    help="Gives an option to provide your own location of the 'edgerc' file."
+)
+@click.option(
+    "--against-file",
+    "rules_file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Compares the version with the match rules in this json file (a policy version or a list of rules)."
+)
+@click.option(
+    "--other-policy-id",
+    type=click.STRING,
+    default=None,
+    help="Policy of the OTHER_VERSION, if it is not the same policy."
+)
+@click.option(
+    "--json",
+    "json_output",
+    is_flag=True,
+    default=False,
+    help="Prints the differences as json."
+)
+def diff_versions(policy_id, policy_version, other_version, edgerc_location, rules_file, other_policy_id,
+                  json_output):
+    """Compares the match rules of two policy versions (or a version and a local file); exits with 1 if they differ"""
+    if (other_version is None) == (rules_file is None):
+        raise click.UsageError("Provide either the OTHER_VERSION or the --against-file")
+    edgerc = common.get_home_folder(edgerc_location)
+    try:
+        if rules_file is not None:
+            diff = policy_diff.diff_version_with_file(policy_id, policy_version, rules_file, edgerc)
+        else:
+            diff = policy_diff.diff_versions(policy_id, policy_version, other_version, edgerc,
+                                             other_policy_id=other_policy_id)
+    except exceptions.ApiRequestFailed as exception:
+        print(str(exception), file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(diff.to_dict()) if json_output else diff.format_text())
+    if not diff.is_identical():
+        sys.exit(1)
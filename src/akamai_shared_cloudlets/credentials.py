@@ -0,0 +1,99 @@
+import os
+import stat
+import threading
+from collections import namedtuple
+
+from akamai.edgegrid import EdgeGridAuth, EdgeRc
+
+from . import akamai_project_constants
+from . import exceptions
+from . import shared as common
+
+Credentials = namedtuple("Credentials", ["edge_rc", "section", "host", "auth"])
+
+
+class CredentialCache:
+    """
+    Process-wide cache of the parsed Akamai credentials files. Every entry is keyed on the resolved path of the
+    file and the requested section and remembers the modification time & size of the file it was parsed from,
+    so a changed file is parsed again on the next lookup. A lookup costs a single 'stat' of the file.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, edgerc_location: str, section: str = None) -> Credentials:
+        """
+        Provides the credentials stored in the edgerc file
+        @param edgerc_location: location of the edgerc file
+        @param section: the section we want the credentials from; if it does not exist in the file, 'default' is used
+        instead. If not provided, 'cloudlets' section is preferred, falling back to 'default' if there is none.
+        @return: Credentials tuple of the EdgeRc object, the section that was used, the host and EdgeGridAuth
+        """
+        path = os.path.realpath(common.get_home_folder(edgerc_location))
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            file_stat = None
+        if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+            raise exceptions.EdgeRcFileMissing(f"Could not find the edgerc file in {edgerc_location}")
+
+        key = (path, section)
+        fingerprint = (file_stat.st_mtime_ns, file_stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                return entry[1]
+
+        credentials = parse_credentials(path, section)
+        with self._lock:
+            self._entries[key] = (fingerprint, credentials)
+        return credentials
+
+    def clear(self):
+        """
+        Drops all the cached credentials
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def parse_credentials(path: str, section: str = None) -> Credentials:
+    """
+    Parses the edgerc file (without any caching) and picks the section to use
+    @param path: location of the edgerc file
+    @param section: requested section, see CredentialCache.get for the rules of picking the section
+    @return: Credentials tuple
+    """
+    edge_rc = EdgeRc(path)
+    if section is None:
+        section = 'cloudlets'
+    if not edge_rc.has_section(section):
+        section = 'default'
+    return Credentials(
+        edge_rc=edge_rc,
+        section=section,
+        host=edge_rc.get(section, "host"),
+        auth=EdgeGridAuth.from_edgerc(edge_rc, section)
+    )
+
+
+credential_cache = CredentialCache()
+
+
+def get_credentials(
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        section: str = None) -> Credentials:
+    """
+    Provides the credentials from the process-wide cache
+    @param edgerc_location: location of the edgerc file, if not provided, defaults to ~/.edgerc
+    @param section: requested section, if not provided, 'cloudlets' is preferred to 'default'
+    @return: Credentials tuple
+    """
+    if edgerc_location is None:
+        edgerc_location = akamai_project_constants.DEFAULT_EDGERC_LOCATION
+    return credential_cache.get(edgerc_location, section)
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+from . import akamai_api_requests_abstractions as api
+from . import akamai_project_constants
+from . import http_requests
+from . import snapshot
+
+STATE_FORMAT_VERSION = 1
+
+
+def sync_policies(state_file: str,
+                  output_file: str,
+                  edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                  client: http_requests.AkamaiClient = None,
+                  max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY,
+                  compression: str = None) -> dict:
+    """
+    Incremental counterpart of snapshot.export_snapshot. The policy listing is compared with the state file of the
+    previous sync: only the policies that are new or whose 'modifiedDate' (or current activations) changed get their
+    versions listed, and only the versions that are new or modified since the last sync are downloaded. The downloaded
+    records are written into the output file in the snapshot format, together with a record for every deleted policy
+    ({"type": "deleted", "policyId": ...}). The state file is updated once the sync is done; without it, everything
+    is considered new.
+    @param state_file: json file keeping what the last sync has seen
+    @param output_file: where to write the records of the changed policies and versions
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param max_workers: how many requests are sent to Akamai at the same time
+    @param compression: 'gzip', 'zstd' or 'none', if not provided, it is guessed from the file name
+    @return: dict with the change log - lists of 'added', 'modified' & 'deleted' policies, number of 'unchanged'
+    policies, number of downloaded versions, errors and duration
+    """
+    compression = compression or snapshot.get_compression(output_file)
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    started_at = time.monotonic()
+    known_policies = load_state(state_file)["policies"]
+    policies = {}
+    changes = {"added": [], "modified": [], "deleted": [], "unchanged": 0, "versions_fetched": 0, "errors": []}
+    with snapshot.open_output(output_file, compression) as output:
+        changed_policies = []
+        for policy in api.iter_shared_policies(client=akamai_client):
+            policy_id = str(policy["id"])
+            previous = known_policies.get(policy_id)
+            fingerprint = get_fingerprint(policy)
+            policies[policy_id] = {
+                "name": policy.get("name"),
+                "fingerprint": fingerprint,
+                "versions": previous["versions"] if previous is not None else {}
+            }
+            if previous is not None and previous["fingerprint"] == fingerprint:
+                changes["unchanged"] += 1
+                continue
+            snapshot.write_record(output, {"type": "policy", "data": policy})
+            changed_policies.append((policy["id"], previous is None))
+
+        for policy_id in known_policies:
+            if policy_id not in policies:
+                changes["deleted"].append({"policyId": policy_id, "name": known_policies[policy_id].get("name")})
+                snapshot.write_record(output, {"type": "deleted", "policyId": policy_id})
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="akamai-sync") as executor:
+            version_changes = sync_versions(changed_policies, policies, akamai_client, executor, output, changes)
+
+    for policy_id, is_new in changed_policies:
+        entry = {"policyId": policy_id, "name": policies[str(policy_id)]["name"], **version_changes[policy_id]}
+        changes["added" if is_new else "modified"].append(entry)
+    failed_policies = {error["policyId"] for error in changes["errors"]}
+    for policy_id in failed_policies:
+        # the next sync tries again
+        if str(policy_id) in known_policies:
+            policies[str(policy_id)] = known_policies[str(policy_id)]
+        else:
+            policies.pop(str(policy_id), None)
+    save_state(state_file, policies)
+    changes["duration"] = round(time.monotonic() - started_at, 3)
+    return changes
+
+
+def sync_versions(changed_policies: list, policies: dict, client: http_requests.AkamaiClient, executor, output,
+                  changes: dict) -> dict:
+    """
+    Lists the versions of the changed policies and downloads the new & modified ones
+    @return: dict of policy ids and the lists of their 'new_versions', 'modified_versions' & 'deleted_versions'
+    """
+    version_changes = {
+        policy_id: {"new_versions": [], "modified_versions": [], "deleted_versions": []}
+        for policy_id, _ in changed_policies
+    }
+    in_flight = {executor.submit(snapshot.fetch_versions, client, policy_id) for policy_id, _ in changed_policies}
+    while len(in_flight) > 0:
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            task, policy_id, payload, error, _ = future.result()
+            if error is not None:
+                changes["errors"].append({"task": task, "policyId": policy_id, "error": error})
+                continue
+            if task == "get_version":
+                snapshot.write_record(output, {"type": "version", "policyId": policy_id, "data": payload})
+                changes["versions_fetched"] += 1
+                continue
+            known_versions = policies[str(policy_id)]["versions"]
+            listed_versions = {str(version["version"]): version.get("modifiedDate") for version in payload}
+            for version, modified_date in listed_versions.items():
+                if version not in known_versions:
+                    version_changes[policy_id]["new_versions"].append(int(version))
+                elif known_versions[version] != modified_date:
+                    version_changes[policy_id]["modified_versions"].append(int(version))
+                else:
+                    continue
+                in_flight.add(executor.submit(snapshot.fetch_version, client, policy_id, version))
+            version_changes[policy_id]["deleted_versions"] = [
+                int(version) for version in known_versions if version not in listed_versions
+            ]
+            policies[str(policy_id)]["versions"] = listed_versions
+    return version_changes
+
+
+def get_fingerprint(policy: dict) -> str:
+    """
+    @param policy: the policy as listed by Akamai
+    @return: digest of the policy attributes that change whenever the policy, its versions or activations change
+    """
+    fingerprint_source = {
+        "modifiedDate": policy.get("modifiedDate"),
+        "name": policy.get("name"),
+        "currentActivations": policy.get("currentActivations")
+    }
+    return hashlib.sha256(json.dumps(fingerprint_source, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_state(state_file: str) -> dict:
+    """
+    @param state_file: json file written by the previous sync
+    @return: dict with the known 'policies', empty if the file does not exist
+    """
+    if not os.path.isfile(state_file):
+        return {"version": STATE_FORMAT_VERSION, "policies": {}}
+    with open(state_file, mode="r") as state:
+        return json.load(state)
+
+
+def save_state(state_file: str, policies: dict):
+    """
+    Replaces the state file atomically, so an interrupted sync never leaves a broken state behind
+    """
+    state = {
+        "version": STATE_FORMAT_VERSION,
+        "synced": datetime.now(timezone.utc).isoformat(),
+        "policies": policies
+    }
+    temporary_file = f"{state_file}.tmp"
+    with open(temporary_file, mode="w") as state_output:
+        json.dump(state, state_output)
+    os.replace(temporary_file, state_file)
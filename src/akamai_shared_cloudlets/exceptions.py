@@ -14,3 +14,25 @@ class IncorrectInputParameter(Exception):
     """
     Incorrect parameter was provided
     """
+
+
+class ApiRequestFailed(Exception):
+    """
+    Akamai did not respond with the expected http status code
+    """
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PaginationError(Exception):
+    """
+    Akamai provided a page that was already listed, so walking the pages would never end
+    """
+
+
+class MissingOptionalDependency(Exception):
+    """
+    The feature needs a package that is not installed
+    """
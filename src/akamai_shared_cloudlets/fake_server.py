@@ -0,0 +1,555 @@
+# local stand-in of the Cloudlets v3 API, for offline load & retry testing
+
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import click
+
+from . import akamai_enums
+
+CLOUDLET_TYPES = {
+    "AP": "API_PRIORITIZATION",
+    "AS": "AUDIENCE_SEGMENTATION",
+    "ER": "EDGE_REDIRECTOR",
+    "FR": "FORWARD_REWRITE",
+    "CD": "PHASED_RELEASE",
+    "IG": "REQUEST_CONTROL",
+    "VWR": "VIRTUAL_WAITING_ROOM"
+}
+
+EDGEGRID_HEADER = re.compile(r"^EG1-HMAC-SHA256 client_token=[^;]+;access_token=[^;]+;timestamp=[^;]+;nonce=[^;]+;"
+                             r"signature=[^;]+$")
+
+MIN_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 1000
+
+
+class FakeDataset:
+    """
+    Synthetic, reproducible content of an Akamai account: groups, shared policies, their versions (with match rules)
+    and activations. It is safe to use from many request handler threads at once.
+    """
+
+    def __init__(self, policy_count: int = 100, versions_per_policy: int = 3, group_count: int = 5,
+                 rules_per_version: int = 5, seed: int = 0, activation_delay: float = 0.0):
+        """
+        @param policy_count: how many shared policies the account has
+        @param versions_per_policy: how many versions every policy has (the real number varies around it)
+        @param group_count: how many groups the account has
+        @param rules_per_version: how many match rules every version has
+        @param seed: seed of the random generator; the same seed always produces the same account
+        @param activation_delay: number of seconds an activation stays 'IN_PROGRESS', zero means it succeeds at once
+        """
+        self.activation_delay = activation_delay
+        self.rules_per_version = rules_per_version
+        self.lock = threading.Lock()
+        self.groups = {}
+        self.policies = {}
+        self.versions = {}
+        self.activations = {}
+        self._random = random.Random(seed)
+        self._next_policy_id = 1001
+        self._next_activation_id = 300001
+        for group_number in range(group_count):
+            group_id = 1000 + group_number
+            self.groups[group_id] = {
+                "location": f"/cloudlets/api/v2/group-info/{group_id}",
+                "serviceVersion": None,
+                "apiVersion": "2.0",
+                "groupId": group_id,
+                "groupName": f"Group {group_number}",
+                "parentId": 1000 if group_number > 0 else 0,
+                "properties": None,
+                "capabilities": [{"cloudletId": 0, "cloudletCode": "ER", "capabilities": ["View", "Edit", "Activate"]}]
+            }
+        for policy_number in range(policy_count):
+            policy = self.create_policy(self._random.choice(list(self.groups)), f"policy_{policy_number:05d}",
+                                        "synthetic policy", self._random.choice(list(CLOUDLET_TYPES)))
+            version_count = max(1, versions_per_policy + self._random.randint(-1, 1))
+            for _ in range(version_count):
+                self.create_version(policy["id"], "synthetic version")
+
+    def create_policy(self, group_id, name: str, description: str, cloudlet_type: str) -> dict:
+        with self.lock:
+            policy_id = self._next_policy_id
+            self._next_policy_id += 1
+            now = get_timestamp()
+            policy = {
+                "cloudletType": cloudlet_type,
+                "createdBy": "fake",
+                "createdDate": now,
+                "description": description,
+                "groupId": int(group_id),
+                "id": policy_id,
+                "modifiedBy": "fake",
+                "modifiedDate": now,
+                "name": name,
+                "policyType": "SHARED",
+                "currentActivations": {
+                    "production": {"effective": None, "latest": None},
+                    "staging": {"effective": None, "latest": None}
+                },
+                "links": [{"href": f"/cloudlets/v3/policies/{policy_id}", "rel": "self"}]
+            }
+            self.policies[policy_id] = policy
+            self.versions[policy_id] = {}
+            self.activations[policy_id] = {}
+            return policy
+
+    def create_version(self, policy_id: int, description: str, match_rules: list = None) -> dict:
+        with self.lock:
+            versions = self.versions[policy_id]
+            version_number = len(versions) + 1
+            now = get_timestamp()
+            version = {
+                "createdBy": "fake",
+                "createdDate": now,
+                "modifiedBy": "fake",
+                "modifiedDate": now,
+                "description": description,
+                "id": policy_id * 1000 + version_number,
+                "immutable": False,
+                "policyId": policy_id,
+                "version": version_number,
+                "matchRulesWarnings": [],
+                "matchRules": match_rules if match_rules is not None else self._get_match_rules(),
+            }
+            versions[version_number] = version
+            self.policies[policy_id]["modifiedDate"] = now
+            return version
+
+    def update_version(self, policy_id: int, version_number: int, description: str, match_rules: list):
+        """
+        @return: the updated version, None if it does not exist or False if it can't be changed anymore
+        """
+        with self.lock:
+            version = self.versions.get(policy_id, {}).get(version_number)
+            if version is None or version["immutable"]:
+                return None if version is None else False
+            now = get_timestamp()
+            version.update({"description": description, "matchRules": match_rules, "modifiedDate": now})
+            self.policies[policy_id]["modifiedDate"] = now
+            return version
+
+    def activate(self, policy_id: int, network: str, operation: str, policy_version: int) -> dict:
+        with self.lock:
+            activation_id = self._next_activation_id
+            self._next_activation_id += 1
+            activation = {
+                "createdBy": "fake",
+                "createdDate": get_timestamp(),
+                "finishDate": None,
+                "id": activation_id,
+                "network": network.upper(),
+                "operation": operation.upper(),
+                "policyId": policy_id,
+                "status": "IN_PROGRESS",
+                "policyVersion": policy_version,
+                "policyVersionDeleted": False,
+                "links": [{"href": f"/cloudlets/v3/policies/{policy_id}/activations/{activation_id}", "rel": "self"}],
+                "finishes_at": time.monotonic() + self.activation_delay
+            }
+            self.activations[policy_id][activation_id] = activation
+            self.versions[policy_id][policy_version]["immutable"] = True
+            return self._get_activation(activation)
+
+    def get_activation(self, policy_id: int, activation_id: int):
+        with self.lock:
+            activation = self.activations[policy_id].get(activation_id)
+            return self._get_activation(activation) if activation is not None else None
+
+    def list_activations(self, policy_id: int) -> list:
+        with self.lock:
+            return [self._get_activation(activation) for activation in
+                    sorted(self.activations[policy_id].values(), key=lambda item: item["id"], reverse=True)]
+
+    def delete_policy(self, policy_id: int) -> bool:
+        with self.lock:
+            if self.policies.pop(policy_id, None) is None:
+                return False
+            self.versions.pop(policy_id)
+            self.activations.pop(policy_id)
+            return True
+
+    def _get_activation(self, activation: dict) -> dict:
+        """
+        @return: the public representation of the activation, finishing it if its time has come
+        """
+        if activation["status"] == "IN_PROGRESS" and activation["finishes_at"] <= time.monotonic():
+            activation["status"] = "SUCCESS"
+            activation["finishDate"] = get_timestamp()
+            network = activation["network"].lower()
+            current = self.policies[activation["policyId"]]["currentActivations"][network]
+            public = {key: value for key, value in activation.items() if key != "finishes_at"}
+            current["latest"] = public
+            if activation["operation"] == akamai_enums.ActivationOperations.ACTIVATION.value.upper():
+                current["effective"] = public
+            else:
+                current["effective"] = None
+        return {key: value for key, value in activation.items() if key != "finishes_at"}
+
+    def _get_match_rules(self) -> list:
+        return [
+            {
+                "type": "erMatchRule",
+                "id": 0,
+                "name": f"rule {rule_number}",
+                "start": 0,
+                "end": 0,
+                "matchURL": f"/path_{self._random.randint(0, 99999)}/*",
+                "akaRuleId": f"{self._random.getrandbits(64):016x}",
+                "statusCode": 302,
+                "redirectURL": f"/target_{self._random.randint(0, 99999)}/*",
+                "useIncomingQueryString": True,
+                "useRelativeUrl": "relative_url"
+            }
+            for rule_number in range(self.rules_per_version)
+        ]
+
+
+class FakeCloudletsServer:
+    """
+    Local http server answering the Cloudlets v3 requests sent by the library (point AkamaiClient to it with its
+    'base_url' parameter). It can delay the responses and fail some of them on purpose, and refuses the requests
+    that are not EdgeGrid-signed. It runs in a background thread:
+
+        with FakeCloudletsServer(FakeDataset(policy_count=1000), latency=0.05) as server:
+            client = AkamaiClient("~/.edgerc", base_url=server.url)
+    """
+
+    def __init__(self, dataset: FakeDataset = None, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: float = 1, require_auth: bool = True, seed: int = None):
+        """
+        @param dataset: the account to serve, defaults to FakeDataset()
+        @param host: interface to listen on
+        @param port: port to listen on, zero means any free port (see the 'url' attribute)
+        @param latency: number of seconds every response is delayed by
+        @param jitter: the latency is randomly shortened or extended by up to this number of seconds
+        @param error_rate: fraction of the requests answered with 500 or 503
+        @param throttle_rate: fraction of the requests answered with 429
+        @param retry_after: value of the 'Retry-After' header of the 429 responses
+        @param require_auth: whether to refuse the requests without EdgeGrid 'Authorization' header (with 401)
+        @param seed: seed of the random generator of the faults and jitter
+        """
+        self.dataset = dataset if dataset is not None else FakeDataset()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.require_auth = require_auth
+        self.request_count = 0
+        self.connection_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._http_server = ThreadingHTTPServer((host, port), FakeCloudletsRequestHandler)
+        self._http_server.daemon_threads = True
+        self._http_server.fake = self
+        self._thread = None
+        self.url = f"http://{host}:{self._http_server.server_address[1]}"
+
+    def start(self):
+        """
+        Starts serving the requests in a background thread
+        @return: self
+        """
+        self._thread = threading.Thread(target=self._http_server.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="fake-cloudlets", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server and closes its socket
+        """
+        self._http_server.shutdown()
+        self._http_server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def get_fault(self):
+        """
+        @return: status code of the fault to inject into the current request, None if it should be answered normally
+        """
+        with self._lock:
+            self.request_count += 1
+            chance = self._random.random()
+            delay = max(self.latency + self._random.uniform(-self.jitter, self.jitter), 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if chance < self.throttle_rate:
+            return 429
+        if chance < self.throttle_rate + self.error_rate:
+            return 500 if chance < self.throttle_rate + self.error_rate / 2 else 503
+        return None
+
+    def count_connection(self):
+        with self._lock:
+            self.connection_count += 1
+
+
+class FakeCloudletsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handler of a single connection to FakeCloudletsServer; keeps the connection alive like Akamai does
+    """
+
+    protocol_version = "HTTP/1.1"
+    # headers & body are written separately, Nagle's algorithm would delay the body of keep-alive responses
+    disable_nagle_algorithm = True
+
+    routes = [
+        ("GET", re.compile(r"^/cloudlets/v3/cloudlet-info$"), "list_cloudlets"),
+        ("GET", re.compile(r"^/cloudlets/api/v2/group-info$"), "list_groups"),
+        ("GET", re.compile(r"^/cloudlets/v3/policies$"), "list_policies"),
+        ("POST", re.compile(r"^/cloudlets/v3/policies$"), "create_policy"),
+        ("GET", re.compile(r"^/cloudlets/v3/policies/(\d+)$"), "get_policy"),
+        ("DELETE", re.compile(r"^/cloudlets/v3/policies/(\d+)$"), "delete_policy"),
+        ("POST", re.compile(r"^/cloudlets/v3/policies/(\d+)/clone$"), "clone_policy"),
+        ("GET", re.compile(r"^/cloudlets/v3/policies/(\d+)/versions$"), "list_versions"),
+        ("POST", re.compile(r"^/cloudlets/v3/policies/(\d+)/versions$"), "create_version"),
+        ("GET", re.compile(r"^/cloudlets/v3/policies/(\d+)/versions/(\d+)$"), "get_version"),
+        ("PUT", re.compile(r"^/cloudlets/v3/policies/(\d+)/versions/(\d+)$"), "update_version"),
+        ("GET", re.compile(r"^/cloudlets/v3/policies/(\d+)/properties$"), "list_properties"),
+        ("GET", re.compile(r"^/cloudlets/v3/policies/(\d+)/activations$"), "list_activations"),
+        ("POST", re.compile(r"^/cloudlets/v3/policies/(\d+)/activations$"), "activate"),
+        ("GET", re.compile(r"^/cloudlets/v3/policies/(\d+)/activations/(\d+)$"), "get_activation"),
+    ]
+
+    def setup(self):
+        super().setup()
+        self.server.fake.count_connection()
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PUT(self):
+        self.handle_request("PUT")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_request(self, method: str):
+        fake = self.server.fake
+        split_url = urlsplit(self.path)
+        self.query = dict(parse_qsl(split_url.query))
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length) if length > 0 else b""
+        if fake.require_auth and EDGEGRID_HEADER.match(self.headers.get("authorization", "")) is None:
+            return self.send_problem(401, "Not authorized", "The request is not EdgeGrid-signed")
+        fault = fake.get_fault()
+        if fault == 429:
+            return self.send_json(429, problem(429, "Too many requests", "Rate limit exceeded"), {
+                "Retry-After": str(fake.retry_after),
+                "X-RateLimit-Limit": "100",
+                "X-RateLimit-Remaining": "0"
+            })
+        if fault is not None:
+            return self.send_problem(fault, "Server error", "Injected fault")
+        for route_method, pattern, handler_name in self.routes:
+            match = pattern.match(split_url.path)
+            if route_method == method and match is not None:
+                try:
+                    self.body = json.loads(body) if body else {}
+                except ValueError:
+                    return self.send_problem(400, "Bad request", "The body is not valid json")
+                arguments = [int(argument) for argument in match.groups()]
+                return getattr(self, handler_name)(fake.dataset, *arguments)
+        return self.send_problem(404, "Not found", f"No such resource: {method} {split_url.path}")
+
+    def list_cloudlets(self, dataset: FakeDataset):
+        self.send_json(200, [{"cloudletName": name, "cloudletType": code} for code, name in CLOUDLET_TYPES.items()])
+
+    def list_groups(self, dataset: FakeDataset):
+        self.send_json(200, list(dataset.groups.values()))
+
+    def list_policies(self, dataset: FakeDataset):
+        with dataset.lock:
+            policies = sorted(dataset.policies.values(), key=lambda policy: policy["id"])
+        self.send_page("/cloudlets/v3/policies", policies)
+
+    def create_policy(self, dataset: FakeDataset):
+        name = self.body.get("name")
+        with dataset.lock:
+            taken = any(policy["name"] == name for policy in dataset.policies.values())
+        if not name or taken:
+            return self.send_problem(400, "Bad request", f"Policy name '{name}' is missing or already used")
+        policy = dataset.create_policy(self.body.get("groupId"), name, self.body.get("description"),
+                                       self.body.get("cloudletType"))
+        self.send_json(201, policy)
+
+    def get_policy(self, dataset: FakeDataset, policy_id: int):
+        policy = dataset.policies.get(policy_id)
+        if policy is None:
+            return self.send_problem(404, "Not found", f"Policy {policy_id} does not exist")
+        self.send_json(200, policy)
+
+    def delete_policy(self, dataset: FakeDataset, policy_id: int):
+        if not dataset.delete_policy(policy_id):
+            return self.send_problem(404, "Not found", f"Policy {policy_id} does not exist")
+        self.send_json(204, None)
+
+    def clone_policy(self, dataset: FakeDataset, policy_id: int):
+        if policy_id not in dataset.policies:
+            return self.send_problem(404, "Not found", f"Policy {policy_id} does not exist")
+        source = dataset.policies[policy_id]
+        clone = dataset.create_policy(self.body.get("groupId", source["groupId"]), self.body.get("newName"),
+                                      source["description"], source["cloudletType"])
+        for version in list(dataset.versions[policy_id].values()):
+            dataset.create_version(clone["id"], version["description"], version["matchRules"])
+        self.send_json(200, clone)
+
+    def list_versions(self, dataset: FakeDataset, policy_id: int):
+        if policy_id not in dataset.policies:
+            return self.send_problem(404, "Not found", f"Policy {policy_id} does not exist")
+        with dataset.lock:
+            versions = [
+                {key: value for key, value in version.items() if key not in ("matchRules", "matchRulesWarnings")}
+                for version in sorted(dataset.versions[policy_id].values(), key=lambda item: -item["version"])
+            ]
+        self.send_page(f"/cloudlets/v3/policies/{policy_id}/versions", versions)
+
+    def create_version(self, dataset: FakeDataset, policy_id: int):
+        if policy_id not in dataset.policies:
+            return self.send_problem(404, "Not found", f"Policy {policy_id} does not exist")
+        version = dataset.create_version(policy_id, self.body.get("description"), self.body.get("matchRules", []))
+        self.send_json(201, version)
+
+    def get_version(self, dataset: FakeDataset, policy_id: int, version_number: int):
+        version = dataset.versions.get(policy_id, {}).get(version_number)
+        if version is None:
+            return self.send_problem(404, "Not found", f"Version {version_number} of {policy_id} does not exist")
+        self.send_json(200, version)
+
+    def update_version(self, dataset: FakeDataset, policy_id: int, version_number: int):
+        version = dataset.update_version(policy_id, version_number, self.body.get("description"),
+                                         self.body.get("matchRules", []))
+        if version is None:
+            return self.send_problem(404, "Not found", f"Version {version_number} of {policy_id} does not exist")
+        if version is False:
+            return self.send_problem(400, "Bad request", f"Version {version_number} of {policy_id} is immutable")
+        self.send_json(200, version)
+
+    def list_properties(self, dataset: FakeDataset, policy_id: int):
+        if policy_id not in dataset.policies:
+            return self.send_problem(404, "Not found", f"Policy {policy_id} does not exist")
+        self.send_page(f"/cloudlets/v3/policies/{policy_id}/properties", [])
+
+    def list_activations(self, dataset: FakeDataset, policy_id: int):
+        if policy_id not in dataset.policies:
+            return self.send_problem(404, "Not found", f"Policy {policy_id} does not exist")
+        self.send_page(f"/cloudlets/v3/policies/{policy_id}/activations", dataset.list_activations(policy_id))
+
+    def activate(self, dataset: FakeDataset, policy_id: int):
+        version = int(self.body.get("policyVersion") or 0)
+        if version not in dataset.versions.get(policy_id, {}):
+            return self.send_problem(400, "Bad request", f"Version {version} of {policy_id} does not exist")
+        network = str(self.body.get("network", ""))
+        operation = str(self.body.get("operation", ""))
+        if network.lower() not in ("staging", "production") or operation.lower() not in ("activation",
+                                                                                         "deactivation"):
+            return self.send_problem(400, "Bad request", "Unknown network or operation")
+        self.send_json(202, dataset.activate(policy_id, network, operation, version))
+
+    def get_activation(self, dataset: FakeDataset, policy_id: int, activation_id: int):
+        activation = dataset.get_activation(policy_id, activation_id) if policy_id in dataset.policies else None
+        if activation is None:
+            return self.send_problem(404, "Not found", f"Activation {activation_id} does not exist")
+        self.send_json(200, activation)
+
+    def send_page(self, path: str, items: list):
+        try:
+            number = int(self.query.get("page", 0))
+            size = int(self.query.get("size", MAX_PAGE_SIZE))
+        except ValueError:
+            return self.send_problem(400, "Bad request", "Page and size must be numbers")
+        if not MIN_PAGE_SIZE <= size <= MAX_PAGE_SIZE:
+            return self.send_problem(400, "Bad request", f"Size must be between {MIN_PAGE_SIZE} and {MAX_PAGE_SIZE}")
+        total_pages = (len(items) + size - 1) // size
+        links = [{"href": f"{path}?page={number}&size={size}", "rel": "self"}]
+        if number + 1 < total_pages:
+            links.append({"href": f"{path}?page={number + 1}&size={size}", "rel": "next"})
+        self.send_json(200, {
+            "page": {"number": number, "size": size, "totalElements": len(items), "totalPages": total_pages},
+            "content": items[number * size:(number + 1) * size],
+            "links": links
+        })
+
+    def send_problem(self, status_code: int, title: str, detail: str):
+        self.send_json(status_code, problem(status_code, title, detail))
+
+    def send_json(self, status_code: int, payload, headers: dict = None):
+        content = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status_code)
+        content_type = "application/problem+json" if status_code >= 400 else "application/json"
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def problem(status_code: int, title: str, detail: str) -> dict:
+    """
+    @return: the error response in the format Akamai uses
+    """
+    return {
+        "status": status_code,
+        "title": title,
+        "type": f"/cloudlets/v3/error-types/{title.lower().replace(' ', '-')}",
+        "errors": [{"title": title, "detail": detail}]
+    }
+
+
+def get_timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Interface to listen on.")
+@click.option("--port", type=click.INT, default=8080, help="Port to listen on.")
+@click.option("--policies", "policy_count", type=click.IntRange(min=0), default=100, help="Number of policies.")
+@click.option("--versions", "versions_per_policy", type=click.IntRange(min=1), default=3,
+              help="Average number of versions per policy.")
+@click.option("--seed", type=click.INT, default=0, help="Seed of the synthetic account.")
+@click.option("--latency", type=click.FloatRange(min=0), default=0.0, help="Delay of every response in seconds.")
+@click.option("--jitter", type=click.FloatRange(min=0), default=0.0, help="Random variation of the latency.")
+@click.option("--error-rate", type=click.FloatRange(min=0, max=1), default=0.0,
+              help="Fraction of the requests answered with 500/503.")
+@click.option("--throttle-rate", type=click.FloatRange(min=0, max=1), default=0.0,
+              help="Fraction of the requests answered with 429.")
+@click.option("--activation-delay", type=click.FloatRange(min=0), default=0.0,
+              help="Number of seconds the activations stay in progress.")
+def main(host, port, policy_count, versions_per_policy, seed, latency, jitter, error_rate, throttle_rate,
+         activation_delay):
+    """Runs the fake Cloudlets v3 API until interrupted"""
+    dataset = FakeDataset(policy_count, versions_per_policy, seed=seed, activation_delay=activation_delay)
+    server = FakeCloudletsServer(dataset, host, port, latency, jitter, error_rate, throttle_rate, seed=seed)
+    print(f"Serving {policy_count} policies at {server.url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+from . import akamai_project_constants
+
+GroupSnapshot = namedtuple("GroupSnapshot", ["names", "ids", "ids_by_name", "ids_by_lowercase_name",
+                                             "lowercase_names"])
+
+_indexes = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+_index_options = {"ttl": akamai_project_constants.DEFAULT_GROUP_INDEX_TTL, "cache_directory": None}
+
+
+class GroupIndex:
+    """
+    Lookup structure of the groups by their ids and names, built once from the group listing. Lookups by id, by
+    exact name and by name regardless of the case are dictionary lookups; only the lookup by a part of the name scans
+    the names. The index is loaded again when it is older than the provided TTL, or on demand by calling 'refresh'.
+    With a cache file, the groups are also stored on the disk and reused by the next runs while they are fresh.
+    """
+
+    def __init__(self, loader, ttl: float = None, cache_file: str = None):
+        """
+        @param loader: callable without parameters that returns the list of the groups (dicts with at least
+        'groupId' and 'groupName' keys), such as a partial of 'list_groups', or None if they could not be listed
+        @param ttl: number of seconds after which the groups are loaded again on the next lookup; None means never
+        @param cache_file: json file where the groups are stored between the runs, None means memory only
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.cache_file = os.path.expanduser(cache_file) if cache_file is not None else None
+        self.built_at = None
+        self._refresh_lock = threading.Lock()
+        self._snapshot = None
+
+    def refresh(self) -> bool:
+        """
+        Loads the groups again and rebuilds the index. If the groups can't be listed, the previous version of the
+        index is kept.
+        @return: True if the index was rebuilt
+        """
+        with self._refresh_lock:
+            return self._load()
+
+    def is_stale(self) -> bool:
+        """
+        @return: True if the index was never built or is older than its TTL
+        """
+        if self.built_at is None:
+            return True
+        return self.ttl is not None and time.monotonic() - self.built_at > self.ttl
+
+    def __len__(self):
+        snapshot = self._get_snapshot()
+        return len(snapshot.names) if snapshot is not None else 0
+
+    def __contains__(self, group_id):
+        return self.get_name(group_id) is not None
+
+    def get_name(self, group_id):
+        """
+        @param group_id: id of the group (number or string)
+        @return: name of the group or None if there is no group with such id
+        """
+        snapshot = self._get_snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.names.get(snapshot.ids.get(str(group_id), None), None)
+
+    def get_id(self, group_name: str):
+        """
+        @param group_name: exact name of the group
+        @return: id of the (first listed) group with such name or None
+        """
+        snapshot = self._get_snapshot()
+        return snapshot.ids_by_name.get(group_name, None) if snapshot is not None else None
+
+    def get_id_case_insensitive(self, group_name: str):
+        """
+        @param group_name: name of the group, case does not matter
+        @return: id of the (first listed) group with such name or None
+        """
+        snapshot = self._get_snapshot()
+        return snapshot.ids_by_lowercase_name.get(group_name.lower(), None) if snapshot is not None else None
+
+    def find_id(self, group_name: str):
+        """
+        @param group_name: name of the group or a part of it, case does not matter
+        @return: id of the group with such name or, if there is none, of the first listed group whose name contains
+        it; None if nothing matches
+        """
+        snapshot = self._get_snapshot()
+        if snapshot is None:
+            return None
+        needle = group_name.lower()
+        group_id = snapshot.ids_by_lowercase_name.get(needle, None)
+        if group_id is not None:
+            return group_id
+        return next((group_id for name, group_id in snapshot.lowercase_names if needle in name), None)
+
+    def to_dict(self):
+        """
+        @return: dict where groupId is the key and group name the value, None if the groups could not be listed
+        """
+        snapshot = self._get_snapshot()
+        return dict(snapshot.names) if snapshot is not None else None
+
+    def _get_snapshot(self):
+        if self.is_stale():
+            with self._refresh_lock:
+                if self.built_at is None and self.cache_file is not None:
+                    self._read_cache_file()
+                if self.is_stale():
+                    self._load()
+        return self._snapshot
+
+    def _load(self) -> bool:
+        groups = self.loader()
+        if groups is None:
+            return False
+        groups = [{"groupId": group["groupId"], "groupName": group["groupName"]} for group in groups]
+        self._snapshot = build_snapshot(groups)
+        self.built_at = time.monotonic()
+        if self.cache_file is not None:
+            write_cache_file(self.cache_file, groups)
+        return True
+
+    def _read_cache_file(self):
+        try:
+            with open(self.cache_file, mode="r") as cache_file:
+                stored = json.load(cache_file)
+            age = max(0.0, time.time() - stored["saved_at"])
+            snapshot = build_snapshot(stored["groups"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        self._snapshot = snapshot
+        self.built_at = time.monotonic() - age
+
+
+def build_snapshot(groups) -> GroupSnapshot:
+    """
+    Builds all the lookup structures of the index
+    @param groups: list of the groups (dicts with at least 'groupId' and 'groupName' keys)
+    @return: GroupSnapshot
+    """
+    names = {}
+    ids = {}
+    ids_by_name = {}
+    ids_by_lowercase_name = {}
+    lowercase_names = []
+    for group in groups:
+        group_id = group["groupId"]
+        name = group["groupName"]
+        names[group_id] = name
+        ids[str(group_id)] = group_id
+        ids_by_name.setdefault(name, group_id)
+        ids_by_lowercase_name.setdefault(name.lower(), group_id)
+        lowercase_names.append((name.lower(), group_id))
+    return GroupSnapshot(names, ids, ids_by_name, ids_by_lowercase_name, lowercase_names)
+
+
+def write_cache_file(file_name: str, groups: list):
+    """
+    Stores the groups atomically, so a concurrent run never reads a half-written file
+    """
+    directory = os.path.dirname(file_name)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+    temporary_file_name = f"{file_name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary_file_name, mode="w") as cache_file:
+        json.dump({"saved_at": time.time(), "groups": groups}, cache_file)
+    os.replace(temporary_file_name, file_name)
+
+
+def configure_group_indexes(ttl: float = akamai_project_constants.DEFAULT_GROUP_INDEX_TTL,
+                            cache_directory: str = None):
+    """
+    Sets how the group indexes of the clients (see get_index) are built; the existing ones are dropped
+    @param ttl: number of seconds after which the groups are listed again, None means never
+    @param cache_directory: directory where the groups of every account are stored, so they are reused between
+    the runs (of the CLI for example); None means memory only
+    """
+    with _indexes_lock:
+        _indexes.clear()
+        _index_options.update({"ttl": ttl, "cache_directory": cache_directory})
+
+
+def get_index(client, loader) -> GroupIndex:
+    """
+    Returns the group index of the client, created on the first call, so the groups are listed once per client
+    (and again when they are older than the configured TTL)
+    @param client: AkamaiClient the index belongs to
+    @param loader: callable listing the groups with the client, used when the index is created
+    @return: GroupIndex
+    """
+    with _indexes_lock:
+        index = _indexes.get(client, None)
+        if index is None:
+            index = GroupIndex(loader, _index_options["ttl"], get_cache_file(client, _index_options["cache_directory"]))
+            _indexes[client] = index
+        return index
+
+
+def get_cache_file(client, cache_directory: str):
+    """
+    @return: the file the groups of the client's account are stored in, None if there is no cache directory
+    """
+    if cache_directory is None:
+        return None
+    account = f"{client.base_url}|{client.edgerc_location}|{client.section}"
+    return os.path.join(cache_directory, hashlib.sha256(account.encode("utf-8")).hexdigest() + ".groups.json")
@@ -1,16 +1,25 @@
-import json
-from configparser import NoSectionError
-from urllib.parse import urljoin
+import atexit
+import sys
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
 from pathlib import Path
 
 import requests
-from akamai.edgegrid import EdgeGridAuth, EdgeRc
 from requests import Request
 
 from . import akamai_project_constants
 from . import akamai_project_constants as constants
+from . import coalescing
+from . import credentials
 from . import exceptions
+from . import instrumentation
+from . import json_codec
 from . import shared as common
+from . import throttling
+from . import tracing
+from .response_cache import LatestVersionCache, ResponseCache
+from .throttling import RetryPolicy, TokenBucket
 
 
 def sign_request(edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
@@ -20,9 +29,8 @@ def sign_request(edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_
     @return: Session object that already contains the authentication to Akamai based on the
     edgerc_location attribute
     """
-    edge_rc, section = get_edgerc_file(edgerc_location)
     session = requests.session()
-    session.auth = EdgeGridAuth.from_edgerc(edge_rc, section)
+    session.auth = credentials.get_credentials(edgerc_location).auth
     return session
 
 
@@ -32,10 +40,7 @@ def get_base_url(edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_
     credentials file location is not provided, it defaults to ~/.edgerc
     """
     try:
-        return 'https://%s' % read_edge_grid_file("cloudlets", "host", edgerc_location)
-    except NoSectionError:
-        print("Cannot find section 'cloudlets' in EdgeRc file, falling back to 'default'")
-        return 'https://%s' % read_edge_grid_file("default", "host", edgerc_location)
+        return 'https://%s' % credentials.get_credentials(edgerc_location).host
     except exceptions.EdgeRcFileMissing:
         print(f"Unable to find the 'edgerc' file at provided location {edgerc_location}")
 
@@ -47,45 +52,27 @@ def read_edge_grid_file(
     """
     Reads the credentials file and provides the value of the specified section. If such section does not exist,
     we try to return the value related to 'default' section (assuming that at least THAT should always exist in
-    Akamai credentials file)
+    Akamai credentials file). The parsed file is cached until it changes on the disk.
     @param edgerc_location: location of the edgerc file, if not provided, defaults to {@code ~/.edgerc}
     @param section: is an identifier of a 'section' in the Akamai credentials file
     @param key: is the 'key' in the section (such as host or secret_token)
     @return: the value associated with the provided host within the section, or, if missing, then that section
     from the 'default' section
     """
-    path = Path(edgerc_location)
-    if path.is_file():
-        edgerc = EdgeRc(edgerc_location)
-        if edgerc.has_section(section):
-            section_to_get = section
-        else:
-            section_to_get = 'default'
-        return edgerc.get(section_to_get, key)
-    raise exceptions.EdgeRcFileMissing(f"File {edgerc_location} could not be found. This is NOT ok.")
+    edgerc_credentials = credentials.get_credentials(edgerc_location, section)
+    return edgerc_credentials.edge_rc.get(edgerc_credentials.section, key)
 
 
 def get_edgerc_file(edgerc_location: str):
     """
     Simple method that provides the EdgeRc object plus the section that is available in the file - it prefers the
     'cloudlets' section to 'default' or any other. However, if no 'cloudlets' section exists, then it provides
-    the 'default'
+    the 'default'. The parsed file is cached until it changes on the disk.
     @return: a tuple of an instance of EdgeRc object and section or None if the credentials file does not exist
     in the initialized location
     """
-    if edgerc_location is None:
-        edgerc_location = akamai_project_constants.DEFAULT_EDGERC_LOCATION
-
-    if does_edgegrid_file_exist(edgerc_location) is True:
-        edge_rc = EdgeRc(edgerc_location)
-
-        if edge_rc.has_section('cloudlets'):
-            section = 'cloudlets'
-        else:
-            section = 'default'
-        return edge_rc, section
-
-    raise exceptions.EdgeRcFileMissing(f"Could not find the edgerc file in {edgerc_location}")
+    edgerc_credentials = credentials.get_credentials(edgerc_location)
+    return edgerc_credentials.edge_rc, edgerc_credentials.section
 
 
 def does_edgegrid_file_exist(edge_file_location: str):
@@ -95,33 +82,340 @@ def does_edgegrid_file_exist(edge_file_location: str):
     return False
 
 
+JSON_REQUEST_HEADERS = {
+    "accept": constants.JSON_CONTENT_TYPE,
+    "content-type": constants.JSON_CONTENT_TYPE
+}
+
+DELETE_REQUEST_HEADERS = {
+    "accept": "application/problem+json"
+}
+
+
+class AkamaiClient:
+    """
+    Long-lived client that owns one signed session to Akamai. Contrary to the module-level 'send_*' functions,
+    which sign a new session for every call, the client keeps its connection pool (and therefore the TCP & TLS
+    connections to the Akamai host) alive between the requests. It is meant to be created once and passed
+    to the functions in 'akamai_api_requests_abstractions' via their 'client' parameter.
+    """
+
+    def __init__(self,
+                 edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                 pool_connections: int = constants.DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = constants.DEFAULT_POOL_MAXSIZE,
+                 keep_alive: bool = True,
+                 response_cache: ResponseCache = None,
+                 retry_policy: RetryPolicy = None,
+                 rate_limiter: TokenBucket = None,
+                 base_url: str = None,
+                 coalescer: coalescing.RequestCoalescer = None,
+                 latest_version_ttl: float = constants.DEFAULT_LATEST_VERSION_TTL):
+        """
+        @param edgerc_location: location of the edgerc file, defaults to ~/.edgerc if not provided
+        @param pool_connections: how many connection pools (one per host) the adapter should cache
+        @param pool_maxsize: how many connections to the same host should be kept in the pool; should be at least
+        the number of threads sharing the client
+        @param keep_alive: if False, every request asks Akamai to close the connection once it is answered
+        @param response_cache: ResponseCache used for the GET requests, None means no caching
+        @param retry_policy: RetryPolicy deciding which failed requests are sent again, None means no retries
+        @param rate_limiter: TokenBucket every request has to take a token from, if not provided, the shared one
+        (see throttling.configure_shared_rate_limiter) is used, if there is any
+        @param base_url: where to send the requests (such as 'http://127.0.0.1:8080' of the fake server), if not
+        provided, the host from the edgerc file is used
+        @param coalescer: RequestCoalescer sharing one in-flight GET request between identical concurrent ones,
+        None means every request is sent
+        @param latest_version_ttl: number of seconds the latest version of a policy is reused for (see
+        LatestVersionCache), None means until the client changes the policy
+        """
+        self.edgerc_location = common.get_home_folder(edgerc_location)
+        edgerc_credentials = credentials.get_credentials(self.edgerc_location)
+        self.credentials = edgerc_credentials
+        self.section = edgerc_credentials.section
+        self.base_url = base_url if base_url is not None else 'https://%s' % edgerc_credentials.host
+        self.session = requests.session()
+        self.session.auth = edgerc_credentials.auth
+        adapter = instrumentation.TimedHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if keep_alive is False:
+            self.session.headers.update({"connection": "close"})
+        self.response_cache = response_cache
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.coalescer = coalescer
+        self.latest_versions = LatestVersionCache(latest_version_ttl)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the session and all the connections kept in its pool
+        """
+        self.session.close()
+
+    def request(self, method: str, path: str, headers: dict = None, body: dict = None, query_params: dict = None,
+                stream: bool = False):
+        """
+        Sends the request to Akamai using the pooled session
+        @param method: http method (such as 'GET' or 'POST')
+        @param path: is the path where we want to send the request, the hostname comes from the edgerc file
+        @param headers: additional request headers, may be None
+        @param body: a dict that is sent json-encoded as the request body, may be None (nothing is sent then)
+        @param query_params: a dict of query string parameters, may be None
+        @param stream: if True, the body is not downloaded up front (read it with 'iter_content' and close the
+        response); such requests bypass the response cache and the instrumentation listeners
+        @return: raw response provided by Akamai, its 'json()' decodes the body with the selected json codec
+        """
+        if not tracing.is_enabled():
+            return self._measured_request(method, path, headers, body, query_params, stream)
+        attributes = {
+            "http.request.method": method,
+            "url.path": path,
+            "server.address": urlsplit(self.base_url).hostname,
+            "akamai.endpoint": instrumentation.get_path_template(path),
+        }
+        if query_params is not None and "page" in query_params:
+            attributes["akamai.page"] = str(query_params["page"])
+        with tracing.get_tracer().start_as_current_span(f"HTTP {method}", attributes=attributes) as span:
+            response = self._measured_request(method, path, headers, body, query_params, stream)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if getattr(response, "from_cache", False):
+                span.set_attribute("akamai.from_cache", True)
+            return response
+
+    def _measured_request(self, method: str, path: str, headers: dict, body: dict, query_params: dict,
+                          stream: bool = False):
+        if stream or not instrumentation.has_listeners():
+            return self._request(method, path, headers, body, query_params, None, stream)
+        started_at = time.perf_counter()
+        timings = {"sign": 0.0, "connect": 0.0, "ttfb": 0.0, "retries": 0, "bytes_out": 0, "wait": 0.0}
+        response = None
+        error = None
+        try:
+            response = self._request(method, path, headers, body, query_params, timings)
+            return response
+        except Exception as exception:
+            error = str(exception)
+            raise
+        finally:
+            instrumentation.emit(get_request_event(method, path, response, timings, started_at, error))
+
+    def _request(self, method: str, path: str, headers: dict, body: dict, query_params: dict, timings: dict,
+                 stream: bool = False):
+        if method != 'GET':
+            try:
+                return self._cached_request(method, path, headers, body, query_params, timings, stream)
+            finally:
+                self.latest_versions.invalidate(path)
+        if self.coalescer is None or stream:
+            return self._cached_request(method, path, headers, body, query_params, timings, stream)
+        url = Request(method, urljoin(self.base_url, path), params=query_params).prepare().url
+        key = f"{self.edgerc_location}|{self.section}|{url}|{sorted((headers or {}).items())}"
+        return self.coalescer.fetch(key, lambda: self._cached_request(method, path, headers, body, query_params,
+                                                                      timings), timings)
+
+    def _cached_request(self, method: str, path: str, headers: dict, body: dict, query_params: dict, timings: dict,
+                        stream: bool = False):
+        if self.response_cache is None or stream:
+            return json_codec.install_decoder(self._send(method, path, headers, body, query_params, timings, stream))
+        if method == 'GET':
+            url = Request(method, urljoin(self.base_url, path), params=query_params).prepare().url
+            return json_codec.install_decoder(self.response_cache.fetch(
+                url,
+                lambda conditional_headers: self._send(method, path, {**(headers or {}), **conditional_headers},
+                                                       body, query_params, timings)))
+        response = self._send(method, path, headers, body, query_params, timings)
+        self.response_cache.invalidate(urljoin(self.base_url, path))
+        return json_codec.install_decoder(response)
+
+    def _send(self, method: str, path: str, headers: dict, body: dict, query_params: dict, timings: dict = None,
+              stream: bool = False):
+        """
+        Sends the request, retrying it according to the retry policy
+        @param timings: dict where the durations of the phases of the request are recorded, None if they are not
+        measured
+        @param stream: whether to leave the body of the response to be read by the caller
+        """
+        destination = urljoin(self.base_url, path)
+        data = json_codec.dumps(body) if body is not None else None
+        attempt = 0
+        while True:
+            rate_limiter = self.rate_limiter or throttling.get_shared_rate_limiter()
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            # signed again for every attempt, Akamai refuses a reused nonce
+            request = Request(method, destination, data=data, headers=headers, params=query_params)
+            if timings is None:
+                prepared_request = self.session.prepare_request(request)
+                response = self._send_prepared(method, attempt, prepared_request, stream=stream)
+            else:
+                started_at = time.perf_counter()
+                prepared_request = self.session.prepare_request(request)
+                timings["sign"] += time.perf_counter() - started_at
+                timings["bytes_out"] += len(prepared_request.body or b"")
+                timings["retries"] = attempt
+                instrumentation.reset_connect_duration()
+                started_at = time.perf_counter()
+                response = self._send_prepared(method, attempt, prepared_request, stream=True)
+                timings["ttfb"] = time.perf_counter() - started_at
+                timings["connect"] += instrumentation.get_connect_duration()
+                if response is not None:
+                    # the body is downloaded only now, after the time to the first byte was measured
+                    response.content
+            requested_delay = None
+            if response is not None and response.status_code == 429 and rate_limiter is not None:
+                # everybody sharing the limiter has to wait, not just this request
+                requested_delay = throttling.get_requested_delay(response.headers)
+                if requested_delay is not None:
+                    rate_limiter.pause(requested_delay)
+            if response is not None and (self.retry_policy is None or
+                                         not self.retry_policy.should_retry(method, attempt, response)):
+                return response
+            if response is not None and stream:
+                response.close()
+            if requested_delay is None:
+                time.sleep(self.retry_policy.get_delay(attempt, response))
+            attempt += 1
+
+    def _send_prepared(self, method: str, attempt: int, prepared_request, stream: bool = False):
+        """
+        @return: the response or None if the connection failed and the request is to be retried
+        """
+        try:
+            return self.session.send(prepared_request, stream=stream)
+        except requests.ConnectionError:
+            if self.retry_policy is None or not self.retry_policy.should_retry(method, attempt):
+                raise
+            return None
+
+    def get(self, path: str, query_params: dict = None):
+        return self.request('GET', path, query_params=query_params)
+
+    def post(self, path: str, post_body: dict):
+        return self.request('POST', path, headers=JSON_REQUEST_HEADERS, body=post_body)
+
+    def put(self, path: str, body: dict):
+        return self.request('PUT', path, headers=JSON_REQUEST_HEADERS, body=body)
+
+    def delete(self, path: str):
+        return self.request('DELETE', path, headers=DELETE_REQUEST_HEADERS)
+
+
+def get_request_event(method: str, path: str, response, timings: dict, started_at: float, error: str = None):
+    """
+    Builds the instrumentation event of the finished request. A json response is decoded right away (to measure
+    the decoding), the callers get the already decoded json from it.
+    @return: instrumentation.RequestEvent
+    """
+    decode_duration = 0.0
+    if response is not None and response.content and "json" in response.headers.get("content-type", "json"):
+        decode_started_at = time.perf_counter()
+        try:
+            decoded = response.json()
+            response.json = lambda **kwargs: decoded
+        except ValueError:
+            pass
+        decode_duration = time.perf_counter() - decode_started_at
+    from_cache = getattr(response, "from_cache", False)
+    return instrumentation.RequestEvent(
+        method=method,
+        path_template=instrumentation.get_path_template(path),
+        status=response.status_code if response is not None else None,
+        bytes_out=timings["bytes_out"],
+        bytes_in=len(response.content or b"") if response is not None else 0,
+        sign_duration=timings["sign"],
+        connect_duration=timings["connect"],
+        ttfb=timings["ttfb"],
+        decode_duration=decode_duration,
+        duration=time.perf_counter() - started_at,
+        retries=timings["retries"],
+        from_cache=from_cache,
+        error=error,
+        wait_duration=timings.get("wait", 0.0)
+    )
+
+
+_default_clients = {}
+_default_clients_lock = threading.Lock()
+_default_client_options = {}
+
+
+def configure_default_clients(**client_options):
+    """
+    Sets the options (AkamaiClient constructor parameters, such as 'response_cache') the default clients are created
+    with. The default clients that already exist are closed, so they are created again with the new options.
+    @param client_options: keyword arguments passed to AkamaiClient
+    """
+    close_default_clients()
+    with _default_clients_lock:
+        _default_client_options.clear()
+        _default_client_options.update(client_options)
+
+
+def get_client(edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+               client: AkamaiClient = None) -> AkamaiClient:
+    """
+    Returns the provided client or, if there is none, the default client of the credentials file. The default client
+    is created once per credentials file (and again only when the file changes), so the module-level functions
+    reuse the connections as well.
+    @param edgerc_location: is the location of Akamai credentials file, if not provided, defaults to ~/.edgerc
+    @param client: an existing client that should be reused, may be None
+    @return: an instance of AkamaiClient
+    """
+    if client is not None:
+        return client
+    edgerc_credentials = credentials.get_credentials(edgerc_location)
+    key = common.get_home_folder(edgerc_location)
+    with _default_clients_lock:
+        default_client = _default_clients.get(key)
+        if default_client is not None and default_client.credentials is edgerc_credentials:
+            return default_client
+        default_client = AkamaiClient(edgerc_location, **_default_client_options)
+        _default_clients[key] = default_client
+        return default_client
+
+
+@atexit.register
+def close_default_clients():
+    """
+    Closes all the default clients created by get_client (and their connections)
+    """
+    with _default_clients_lock:
+        for default_client in _default_clients.values():
+            default_client.close()
+        _default_clients.clear()
+
+
 def send_get_request(
         path: str,
         query_params: dict,
-        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: AkamaiClient = None):
     """
     Serves as GET request abstraction
     @param edgerc_location: is the location of Akamai credentials file, if not provided, defaults to ~/.edgerc
     @param path: is the path where we want to send the request. It is assumed
     the hostname (aka base_url) would come from the EdgeGrid file
-    @param query_params: a dictionary of additional query parameters, may be empty dictionary
+    @param query_params: a dictionary of query string parameters, may be empty dictionary
+    @param client: an existing AkamaiClient to send the request with, if not provided, the default one is used
     @return: raw response provided by Akamai, if you want json, do it yourself ;)
     """
     if query_params is None:
         query_params = {}
-    real_edgerc_location = common.get_home_folder(edgerc_location)
-    base_url = get_base_url(real_edgerc_location)
-    session = sign_request(real_edgerc_location)
-    session.headers.update(query_params)
-    final_url = urljoin(base_url, path)
-    print("Sending request to Akamai...")
-    return session.get(final_url)
+    print("Sending request to Akamai...", file=sys.stderr)
+    return get_client(edgerc_location, client).get(path, query_params)
 
 
 def send_post_request(
         path: str,
         post_body: dict,
-        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+        client: AkamaiClient = None):
     """
     Serves as an abstraction of most of the 'post' http requests. Sets the 'accept' & 'content-type' headers to
     'application/json'
@@ -129,44 +423,31 @@ def send_post_request(
     @param path: is the path where we want to send the request. It is assumed the hostname (aka base_url) would come
     from the EdgeGrid file
     @param post_body: is a dictionary that represents the post body
+    @param client: an existing AkamaiClient to send the request with, if not provided, the default one is used
     @return: raw response from Akamai, if you want json, do it yourself ;)
     """
-    request_headers = {
-        "accept": constants.JSON_CONTENT_TYPE,
-        "content-type": constants.JSON_CONTENT_TYPE
-    }
-    real_edgerc_location = common.get_home_folder(edgerc_location)
-    base_url = get_base_url(real_edgerc_location)
-    destination = urljoin(base_url, path)
-    request = Request('POST', destination, data=json.dumps(post_body), headers=request_headers)
-    session = sign_request(real_edgerc_location)
-
-    prepared_request = session.prepare_request(request)
-    return session.send(prepared_request)
+    return get_client(edgerc_location, client).post(path, post_body)
 
 
-def send_delete_request(path: str, edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+def send_delete_request(path: str,
+                        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                        client: AkamaiClient = None):
     """
     Serves as an abstraction of 'delete' request. Contains no logic to assess the correctness of the data provided
     or response returned.
     @param edgerc_location: is the location of Akamai credentials file, if not provided, defaults to ~/.edgerc
     @param path: is the path where we want to send the request. It is assumed the hostname (aka base_url) would come
     from the EdgeGrid file
+    @param client: an existing AkamaiClient to send the request with, if not provided, the default one is used
     @return: raw response from Akamai, if you want json (or other processing), you need to do it yourself
     """
-    request_headers = {
-        "accept": "application/problem+json"
-    }
-    real_edgerc_location = common.get_home_folder(edgerc_location)
-    base_url = get_base_url(real_edgerc_location)
-    destination = urljoin(base_url, path)
-    request = Request('DELETE', destination, headers=request_headers)
-    session = sign_request(real_edgerc_location)
-    prepared_request = session.prepare_request(request)
-    return session.send(prepared_request)
+    return get_client(edgerc_location, client).delete(path)
 
 
-def send_put_request(path: str, body: dict, edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION):
+def send_put_request(path: str,
+                     body: dict,
+                     edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                     client: AkamaiClient = None):
     """
     Serves as an abstraction of PUT request. Contains no logic to assess the correctness of the data provided or
     response returned
@@ -174,16 +455,7 @@ def send_put_request(path: str, body: dict, edgerc_location: str = akamai_projec
     @param path: is the path where we want to send the request, It is assumed the hostname (aka base_url) would come
     from the EdgeGrid file
     @param body: a dict of put body, may be empty (if there's nothing you want to pass)
+    @param client: an existing AkamaiClient to send the request with, if not provided, the default one is used
     @return: raw response from Akamai, if you want json (or other processing), you need to do it yourself
     """
-    request_headers = {
-        "accept": constants.JSON_CONTENT_TYPE,
-        "content-type": constants.JSON_CONTENT_TYPE
-    }
-    real_edgerc_location = common.get_home_folder(edgerc_location)
-    base_url = get_base_url(real_edgerc_location)
-    destination = urljoin(base_url, path)
-    request = Request('PUT', destination, data=json.dumps(body), headers=request_headers)
-    session = sign_request(real_edgerc_location)
-    prepared_request = session.prepare_request(request)
-    return session.send(prepared_request)
+    return get_client(edgerc_location, client).put(path, body)
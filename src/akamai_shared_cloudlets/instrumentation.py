@@ -0,0 +1,276 @@
+import re
+import statistics
+import threading
+import time
+from collections import deque, namedtuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+RequestEvent = namedtuple("RequestEvent", [
+    "method",
+    "path_template",
+    "status",
+    "bytes_out",
+    "bytes_in",
+    "sign_duration",
+    "connect_duration",
+    "ttfb",
+    "decode_duration",
+    "duration",
+    "retries",
+    "from_cache",
+    "error",
+    "wait_duration"
+], defaults=[0.0])
+
+PATH_PARAMETERS = [
+    (re.compile(r"/policies/\d+"), "/policies/{policyId}"),
+    (re.compile(r"/versions/\d+"), "/versions/{version}"),
+    (re.compile(r"/activations/\d+"), "/activations/{activationId}"),
+    (re.compile(r"/group-info/\d+"), "/group-info/{groupId}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{id}"),
+]
+
+_listeners = []
+_listeners_lock = threading.Lock()
+_connect_timings = threading.local()
+
+
+def add_listener(listener):
+    """
+    Registers the callable that gets the RequestEvent of every request sent by any AkamaiClient. The listeners are
+    called from the thread that sent the request, so they should be quick and thread-safe.
+    @param listener: callable accepting a RequestEvent, such as an instance of MetricsAggregator
+    """
+    global _listeners
+    with _listeners_lock:
+        _listeners = _listeners + [listener]
+
+
+def remove_listener(listener):
+    """
+    Unregisters the listener added by add_listener
+    """
+    global _listeners
+    with _listeners_lock:
+        _listeners = [registered for registered in _listeners if registered is not listener]
+
+
+def has_listeners() -> bool:
+    return len(_listeners) > 0
+
+
+def emit(event: RequestEvent):
+    for listener in _listeners:
+        try:
+            listener(event)
+        except Exception as exception:
+            print(f"Request listener {listener} failed: {exception}")
+
+
+def get_path_template(path: str) -> str:
+    """
+    @param path: path of the request, such as '/cloudlets/v3/policies/1001/versions/2'
+    @return: the path with the identifiers replaced by placeholders ('/cloudlets/v3/policies/{policyId}/versions/
+    {version}'), so the requests of the same endpoint can be aggregated
+    """
+    path = path.split("?", 1)[0]
+    for pattern, replacement in PATH_PARAMETERS:
+        path = pattern.sub(replacement, path)
+    return path
+
+
+def reset_connect_duration():
+    _connect_timings.duration = 0.0
+
+
+def get_connect_duration() -> float:
+    """
+    @return: seconds the current thread spent opening connections since reset_connect_duration
+    """
+    return getattr(_connect_timings, "duration", 0.0)
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timings.duration = get_connect_duration() + time.perf_counter() - started_at
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timings.duration = get_connect_duration() + time.perf_counter() - started_at
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that measures how long opening of the connections (including the TLS handshake) takes
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool
+        }
+
+
+class MetricsAggregator:
+    """
+    Listener that aggregates the RequestEvents per endpoint (method & path template). Provides the summary with
+    the duration percentiles and the metrics in Prometheus / OpenMetrics text format.
+
+        aggregator = MetricsAggregator()
+        instrumentation.add_listener(aggregator)
+        ...
+        print(aggregator.format_table())
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        """
+        @param max_samples: how many most recent durations per endpoint are kept for the percentiles
+        """
+        self.max_samples = max_samples
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent):
+        with self._lock:
+            endpoint = self._endpoints.get((event.method, event.path_template))
+            if endpoint is None:
+                endpoint = {
+                    "durations": deque(maxlen=self.max_samples),
+                    "count": 0,
+                    "duration_sum": 0.0,
+                    "statuses": {},
+                    "bytes_in": 0,
+                    "bytes_out": 0,
+                    "retries": 0,
+                    "cache_hits": 0
+                }
+                self._endpoints[(event.method, event.path_template)] = endpoint
+            endpoint["durations"].append(event.duration)
+            endpoint["count"] += 1
+            endpoint["duration_sum"] += event.duration
+            status = str(event.status) if event.status is not None else "error"
+            endpoint["statuses"][status] = endpoint["statuses"].get(status, 0) + 1
+            endpoint["bytes_in"] += event.bytes_in
+            endpoint["bytes_out"] += event.bytes_out
+            endpoint["retries"] += event.retries
+            endpoint["cache_hits"] += 1 if event.from_cache else 0
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def summary(self) -> list:
+        """
+        @return: list of dicts, one per endpoint, with the request count, errors, retries, transferred bytes
+        and the p50/p95/p99 durations in milliseconds
+        """
+        with self._lock:
+            endpoints = {key: {**value, "durations": list(value["durations"]), "statuses": dict(value["statuses"])}
+                         for key, value in self._endpoints.items()}
+        rows = []
+        for (method, path_template), endpoint in sorted(endpoints.items(), key=lambda item: item[0][1]):
+            p50, p95, p99 = get_percentiles(endpoint["durations"], (50, 95, 99))
+            rows.append({
+                "method": method,
+                "path": path_template,
+                "count": endpoint["count"],
+                "errors": sum(count for status, count in endpoint["statuses"].items()
+                              if status == "error" or int(status) >= 400),
+                "retries": endpoint["retries"],
+                "cache_hits": endpoint["cache_hits"],
+                "bytes_in": endpoint["bytes_in"],
+                "bytes_out": endpoint["bytes_out"],
+                "p50_ms": round(p50 * 1000, 2),
+                "p95_ms": round(p95 * 1000, 2),
+                "p99_ms": round(p99 * 1000, 2)
+            })
+        return rows
+
+    def format_table(self) -> str:
+        """
+        @return: the summary as a text table
+        """
+        header = f"{'METHOD':<7} {'PATH':<56} {'COUNT':>7} {'ERRORS':>6} {'RETRIES':>7} {'P50 ms':>9} " \
+                 f"{'P95 ms':>9} {'P99 ms':>9}"
+        lines = [header]
+        for row in self.summary():
+            lines.append(f"{row['method']:<7} {row['path']:<56} {row['count']:>7} {row['errors']:>6} "
+                         f"{row['retries']:>7} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+        return "\n".join(lines)
+
+    def to_openmetrics(self, prefix: str = "akamai_cloudlets") -> str:
+        """
+        @param prefix: prefix of the metric names
+        @return: the metrics in OpenMetrics text format (which Prometheus reads as well)
+        """
+        with self._lock:
+            endpoints = {key: {**value, "durations": list(value["durations"]), "statuses": dict(value["statuses"])}
+                         for key, value in self._endpoints.items()}
+        lines = [
+            f"# TYPE {prefix}_requests counter",
+            f"# HELP {prefix}_requests Requests sent to Akamai by the endpoint and response status."
+        ]
+        for (method, path_template), endpoint in sorted(endpoints.items()):
+            for status, count in sorted(endpoint["statuses"].items()):
+                lines.append(f'{prefix}_requests_total{{{get_labels(method, path_template)},status="{status}"}} '
+                             f'{count}')
+        lines += [
+            f"# TYPE {prefix}_request_duration_seconds summary",
+            f"# UNIT {prefix}_request_duration_seconds seconds",
+            f"# HELP {prefix}_request_duration_seconds Duration of the requests, including the retries."
+        ]
+        for (method, path_template), endpoint in sorted(endpoints.items()):
+            labels = get_labels(method, path_template)
+            quantiles = (0.5, 0.95, 0.99)
+            values = get_percentiles(endpoint["durations"], [int(quantile * 100) for quantile in quantiles])
+            for quantile, value in zip(quantiles, values):
+                lines.append(f'{prefix}_request_duration_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+            lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {endpoint['count']}")
+            lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {endpoint['duration_sum']:.6f}")
+        for name, key, description in (("received_bytes", "bytes_in", "Bytes of the response bodies."),
+                                       ("sent_bytes", "bytes_out", "Bytes of the request bodies."),
+                                       ("retries", "retries", "Requests that had to be sent again.")):
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            for (method, path_template), endpoint in sorted(endpoints.items()):
+                lines.append(f"{prefix}_{name}_total{{{get_labels(method, path_template)}}} {endpoint[key]}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def get_labels(method: str, path_template: str) -> str:
+    escaped_path = path_template.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",path="{escaped_path}"'
+
+
+def get_percentiles(durations: list, percentiles) -> list:
+    """
+    @return: list of the requested percentiles (such as 50, 95, 99) of the durations, zeros if there are none
+    """
+    if len(durations) == 0:
+        return [0.0 for _ in percentiles]
+    if len(durations) == 1:
+        return [durations[0] for _ in percentiles]
+    cut_points = statistics.quantiles(durations, n=100, method="inclusive")
+    return [cut_points[percentile - 1] for percentile in percentiles]
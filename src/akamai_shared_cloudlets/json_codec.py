@@ -0,0 +1,237 @@
+import codecs
+import json
+
+from . import exceptions
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CODECS = ("auto", "orjson", "json")
+
+# bytes read from the response at once by the incremental parser
+INCREMENTAL_CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = " \t\r\n"
+
+
+class StdlibCodec:
+    """
+    Codec of the standard library 'json' module, always available
+    """
+    name = "json"
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+class OrjsonCodec:
+    """
+    Codec of the 'orjson' package, several times faster than the standard library on large documents. Whatever
+    orjson can't handle (non UTF-8 input, integers over 64 bits) is passed on to the standard library.
+    """
+    name = "orjson"
+
+    def loads(self, data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+
+    def dumps(self, obj) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def get_default_codec():
+    return OrjsonCodec() if orjson is not None else StdlibCodec()
+
+
+_codec = get_default_codec()
+
+
+def set_codec(codec):
+    """
+    Selects the codec all the requests & responses are encoded and decoded with
+    @param codec: 'auto' (orjson if it is installed, the standard library otherwise), 'orjson', 'json' or any object
+    with 'loads(data)' and 'dumps(obj) -> bytes' methods
+    @raise MissingOptionalDependency: if 'orjson' is requested, but not installed
+    """
+    global _codec
+    if codec == "auto":
+        _codec = get_default_codec()
+    elif codec == "orjson":
+        if orjson is None:
+            raise exceptions.MissingOptionalDependency("the orjson codec needs the 'orjson' package "
+                                                       "(pip install akamai-shared-cloudlets[orjson])")
+        _codec = OrjsonCodec()
+    elif codec == "json":
+        _codec = StdlibCodec()
+    elif isinstance(codec, str):
+        raise exceptions.IncorrectInputParameter(f"Unknown json codec '{codec}', expected one of {CODECS}")
+    else:
+        _codec = codec
+
+
+def get_codec():
+    return _codec
+
+
+def loads(data):
+    """
+    @param data: json document as bytes or str
+    @return: the decoded document
+    """
+    return _codec.loads(data)
+
+
+def dumps(obj) -> bytes:
+    """
+    @param obj: what to encode
+    @return: compact json document encoded in UTF-8
+    """
+    return _codec.dumps(obj)
+
+
+def install_decoder(response):
+    """
+    Makes 'response.json()' decode the body with the selected codec (just once, the decoded document is kept)
+    @param response: requests.Response
+    @return: the same response
+    """
+    decoded = []
+
+    def decode(**kwargs):
+        if len(decoded) == 0:
+            decoded.append(_codec.loads(response.content))
+        return decoded[0]
+
+    response.json = decode
+    return response
+
+
+def iter_content_items(chunks, key: str = "content"):
+    """
+    Parses the json object incrementally and yields the items of its array 'key' one by one, without building the
+    whole document; only the item being parsed and a chunk of the input are held in memory. This is how the
+    listings of Akamai (such as the policies or the policy versions) can be consumed while they are downloaded.
+    @param chunks: iterable of bytes (or str) making the json document, such as 'response.iter_content(size)'
+    @param key: name of the top-level array to yield the items of
+    @return: generator of the items; its return value (the 'value' of StopIteration, or the result of 'yield from')
+    is the dict of the other top-level keys, such as 'page' or 'links'
+    @raise ValueError: if the document is not a json object
+    """
+    reader = IncrementalReader(chunks)
+    rest = {}
+    reader.expect("{")
+    if reader.peek() == "}":
+        return rest
+    while True:
+        name = reader.read_value()
+        if not isinstance(name, str):
+            raise ValueError(f"Expected a key of the json object, got {name!r}")
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.expect("[")
+            rest[key] = []
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield reader.read_value()
+                    if reader.expect(",]") == "]":
+                        break
+        else:
+            rest[name] = reader.read_value()
+        if reader.expect(",}") == "}":
+            return rest
+
+
+class IncrementalReader:
+    """
+    Buffer over the chunks of a json document that decodes one value at a time
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.exhausted = False
+
+    def peek(self) -> str:
+        """
+        @return: the next character that is not a whitespace (without consuming it), empty at the end of input
+        """
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more(1):
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """
+        Consumes the next character that is not a whitespace
+        @param characters: the characters allowed at this place
+        @return: the consumed character
+        @raise ValueError: if the next character is not one of the allowed ones
+        """
+        character = self.peek()
+        if character == "" or character not in characters:
+            raise ValueError(f"Expected one of '{characters}' in the json document, got '{character}'")
+        self.position += 1
+        return character
+
+    def read_value(self):
+        """
+        Consumes and decodes the next json value, reading as much input as the value needs
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                # at least doubles the buffered part of the value, so long values are not parsed over and over
+                if not self.read_more(max(INCREMENTAL_CHUNK_SIZE, len(self.buffer) - self.position)):
+                    raise
+                continue
+            # a number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self.read_more(1):
+                continue
+            self.position = end
+            return value
+
+    def read_more(self, minimum: int) -> bool:
+        """
+        Appends at least 'minimum' characters to the buffer (less at the end of input), dropping the consumed ones
+        @return: False if there was nothing more to read
+        """
+        if self.exhausted:
+            return False
+        parts = [self.buffer[self.position:]]
+        self.position = 0
+        added = 0
+        while added < minimum:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                text = self.text_decoder.decode(b"", final=True)
+                self.exhausted = True
+            elif isinstance(chunk, str):
+                text = chunk
+            else:
+                text = self.text_decoder.decode(chunk)
+            parts.append(text)
+            added += len(text)
+            if self.exhausted:
+                break
+        self.buffer = "".join(parts)
+        return added > 0
@@ -0,0 +1,167 @@
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from . import exceptions
+from . import http_requests
+from . import json_codec
+
+
+def iter_pages(client: http_requests.AkamaiClient, api_path: str, page_size: int, first_page: int = 0,
+               prefetch: bool = True):
+    """
+    Walks all the pages of a paginated Akamai listing. While the caller works with the current page, the next one
+    is already being downloaded in the background (unless prefetch is disabled), so only two pages are ever held
+    in memory.
+    @param client: AkamaiClient used to send the requests
+    @param api_path: path of the listing, such as '/cloudlets/v3/policies'
+    @param page_size: how many records should be returned in one 'page'
+    @param first_page: number of the page to start with
+    @param prefetch: whether to download the next page in the background
+    @return: generator of the decoded pages, it ends after the last page
+    @raise ApiRequestFailed: if any of the pages could not be downloaded, so the listing is incomplete
+    @raise PaginationError: if Akamai points us to a page that was already listed
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="akamai-prefetch") if prefetch else None
+    try:
+        page_request = (api_path, {"page": str(first_page), "size": str(page_size)})
+        requested = {get_request_key(page_request)}
+        last_number = None
+        pending = _submit(executor, client, page_request)
+        while page_request is not None:
+            page = pending.result() if pending is not None else fetch_page(client, *page_request)
+            page_request, last_number = get_following_request(page, len(page.get("content", [])), api_path,
+                                                              page_size, requested, last_number)
+            pending = _submit(executor, client, page_request) if page_request is not None else None
+            yield page
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_items(client: http_requests.AkamaiClient, api_path: str, page_size: int, first_page: int = 0,
+               prefetch: bool = True, incremental: bool = False):
+    """
+    Same as iter_pages, just yields the items found in the 'content' of the pages one by one
+    @param incremental: if True, every page is parsed while it is being downloaded and its items are yielded
+    before the rest of the page arrives, so not even a whole page is held in memory (the pages are not prefetched
+    then)
+    @return: generator of the listed items
+    """
+    if incremental:
+        yield from iter_items_incrementally(client, api_path, page_size, first_page)
+        return
+    for page in iter_pages(client, api_path, page_size, first_page, prefetch):
+        yield from page.get("content", [])
+
+
+def iter_items_incrementally(client: http_requests.AkamaiClient, api_path: str, page_size: int, first_page: int = 0):
+    """
+    Walks all the pages of the listing, yielding the items of every page as they are parsed from the response
+    stream (see json_codec.iter_content_items)
+    @return: generator of the listed items
+    @raise ApiRequestFailed: if any of the pages could not be downloaded, so the listing is incomplete
+    @raise PaginationError: if Akamai points us to a page that was already listed
+    """
+    page_request = (api_path, {"page": str(first_page), "size": str(page_size)})
+    requested = {get_request_key(page_request)}
+    last_number = None
+    while page_request is not None:
+        response = client.request("GET", page_request[0], query_params=page_request[1], stream=True)
+        with contextlib.closing(response):
+            if response.status_code != 200:
+                raise exceptions.ApiRequestFailed(f"Listing of {api_path} failed with status code "
+                                                  f"{response.status_code}", response.status_code)
+            items = json_codec.iter_content_items(response.iter_content(json_codec.INCREMENTAL_CHUNK_SIZE))
+            item_count = 0
+            while True:
+                try:
+                    item = next(items)
+                except StopIteration as end_of_page:
+                    page = end_of_page.value
+                    break
+                item_count += 1
+                yield item
+        page_request, last_number = get_following_request(page, item_count, api_path, page_size, requested,
+                                                          last_number)
+
+
+def get_following_request(page: dict, item_count: int, api_path: str, page_size: int, requested: set,
+                          last_number):
+    """
+    Determines the request of the page following the provided one and checks the listing keeps advancing
+    @param page: decoded page of the listing (its 'content' may be missing)
+    @param item_count: number of the items the page contained, the listing ends with an empty page
+    @param requested: keys (see get_request_key) of the pages requested so far, the next one is added to them
+    @param last_number: number of the previous page, None if unknown
+    @return: tuple of the next page request (None after the last page) and the number of the provided page
+    @raise PaginationError: if the listing does not advance
+    """
+    number = (page.get("page", None) or {}).get("number", None)
+    if number is not None and last_number is not None and number <= last_number:
+        raise exceptions.PaginationError(f"Listing of {api_path} returned page {number} after page {last_number}")
+    last_number = number if number is not None else last_number
+
+    page_request = get_next_page_request(page, api_path, page_size)
+    if item_count == 0:
+        page_request = None
+    if page_request is not None:
+        key = get_request_key(page_request)
+        if key in requested:
+            raise exceptions.PaginationError(f"Listing of {api_path} points to already requested page "
+                                             f"{page_request}")
+        requested.add(key)
+    return page_request, last_number
+
+
+def get_next_page_request(page: dict, api_path: str, page_size: int):
+    """
+    Determines what to ask for to get the page following the provided one. The 'next' link provided by Akamai is
+    preferred; if there is none, the page metadata (number & totalPages) is used instead.
+    @param page: decoded page of the listing
+    @param api_path: path of the listing
+    @param page_size: how many records should be returned in one 'page'
+    @return: tuple of the path and query parameters or None if the provided page is the last one
+    """
+    for link in page.get("links", None) or []:
+        if link.get("rel") == "next":
+            return link["href"], None
+    page_info = page.get("page", None)
+    if page_info is None:
+        return None
+    next_number = page_info.get("number", 0) + 1
+    if next_number >= page_info.get("totalPages", 0):
+        return None
+    return api_path, {"page": str(next_number), "size": str(page_size)}
+
+
+def fetch_page(client: http_requests.AkamaiClient, api_path: str, query_params: dict):
+    """
+    Downloads one page of the listing
+    @return: decoded page
+    @raise ApiRequestFailed: if the http status code was not 200
+    """
+    response = http_requests.send_get_request(api_path, query_params, client=client)
+    if response.status_code == 200:
+        return response.json()
+    raise exceptions.ApiRequestFailed(f"Listing of {api_path} failed with status code {response.status_code}",
+                                      response.status_code)
+
+
+def get_request_key(page_request: tuple) -> tuple:
+    """
+    @param page_request: tuple of the path and query parameters (may be None)
+    @return: hashable representation of the request, used to recognize the pages already requested (no matter
+    whether the query parameters are part of the path or not)
+    """
+    path, query_params = page_request
+    url = urlsplit(path)
+    parameters = dict(parse_qsl(url.query))
+    parameters.update(query_params or {})
+    return url.path, tuple(sorted(parameters.items()))
+
+
+def _submit(executor: ThreadPoolExecutor, client: http_requests.AkamaiClient, page_request: tuple):
+    if executor is None:
+        return None
+    return executor.submit(fetch_page, client, *page_request)
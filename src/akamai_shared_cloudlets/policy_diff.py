@@ -0,0 +1,322 @@
+import bisect
+import hashlib
+import json
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from . import akamai_api_requests_abstractions as api
+from . import akamai_enums
+from . import akamai_project_constants
+from . import exceptions
+from . import http_requests
+
+# fields of the match rules Akamai assigns on its own, they differ between versions with the very same rules
+IGNORED_RULE_FIELDS = ("id", "akaRuleId", "location")
+
+RuleChange = namedtuple("RuleChange", ["name", "old_position", "new_position", "changed_fields"])
+
+
+class PolicyDiff:
+    """
+    Differences between two lists of match rules. The positions of the rules are 0-based, 'changed_fields' of the
+    modified rules lists the fields that differ.
+    """
+
+    def __init__(self, added: list, removed: list, modified: list, reordered: list, unchanged: int):
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+        self.reordered = reordered
+        self.unchanged = unchanged
+
+    def is_identical(self) -> bool:
+        """
+        @return: True if both lists contain the same rules in the same order (ignoring the fields Akamai assigns)
+        """
+        return len(self.added) == 0 and len(self.removed) == 0 and len(self.modified) == 0 and \
+            len(self.reordered) == 0
+
+    def summary(self) -> dict:
+        """
+        @return: dict with the numbers of the added, removed, modified, reordered and unchanged rules
+        """
+        return {
+            "identical": self.is_identical(),
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "modified": len(self.modified),
+            "reordered": len(self.reordered),
+            "unchanged": self.unchanged
+        }
+
+    def to_dict(self) -> dict:
+        """
+        @return: the summary with the lists of the changes, serializable to json
+        """
+        return {
+            **self.summary(),
+            "changes": {
+                "added": [change._asdict() for change in self.added],
+                "removed": [change._asdict() for change in self.removed],
+                "modified": [change._asdict() for change in self.modified],
+                "reordered": [change._asdict() for change in self.reordered]
+            }
+        }
+
+    def format_text(self) -> str:
+        """
+        @return: one line per change ('+' added, '-' removed, '~' modified, '>' moved) and the summary line
+        """
+        changes = [(change.new_position, f"+ [{change.new_position}] {change.name}") for change in self.added]
+        changes += [(change.old_position, f"- [{change.old_position}] {change.name}") for change in self.removed]
+        changes += [(change.new_position, f"~ [{change.old_position} -> {change.new_position}] {change.name}: "
+                                          f"{', '.join(change.changed_fields)}") for change in self.modified]
+        changes += [(change.new_position, f"> [{change.old_position} -> {change.new_position}] {change.name}")
+                    for change in self.reordered]
+        lines = [line for _, line in sorted(changes, key=lambda change: change[0])]
+        summary = self.summary()
+        lines.append("identical match rules" if summary["identical"] else
+                     f"{summary['added']} added, {summary['removed']} removed, {summary['modified']} modified, "
+                     f"{summary['reordered']} reordered, {summary['unchanged']} unchanged")
+        return "\n".join(lines)
+
+
+def get_rule_fingerprint(rule: dict) -> str:
+    """
+    @param rule: the match rule
+    @return: hash of the rule content, without the fields Akamai assigns to the rule (see IGNORED_RULE_FIELDS)
+    """
+    content = {key: value for key, value in rule.items() if key not in IGNORED_RULE_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def diff_match_rules(old_rules: list, new_rules: list) -> PolicyDiff:
+    """
+    Compares two lists of match rules. Every rule is hashed once, the identical rules are paired by their hashes,
+    the remaining ones by their names (those are the modified rules), whatever is left was added or removed. The
+    rules that kept their content, but not their relative order, are reported as reordered.
+    @param old_rules: the match rules of the original version, may be None
+    @param new_rules: the match rules of the new version, may be None
+    @return: PolicyDiff
+    """
+    old_rules = old_rules or []
+    new_rules = new_rules or []
+    old_fingerprints = [get_rule_fingerprint(rule) for rule in old_rules]
+    new_fingerprints = [get_rule_fingerprint(rule) for rule in new_rules]
+
+    unmatched_by_fingerprint = {}
+    for position, fingerprint in enumerate(old_fingerprints):
+        unmatched_by_fingerprint.setdefault(fingerprint, deque()).append(position)
+    pairs = []
+    unpaired_new = []
+    for position, fingerprint in enumerate(new_fingerprints):
+        candidates = unmatched_by_fingerprint.get(fingerprint)
+        if candidates:
+            pairs.append((candidates.popleft(), position))
+        else:
+            unpaired_new.append(position)
+    paired_old = {old_position for old_position, _ in pairs}
+
+    unmatched_by_name = {}
+    for position, rule in enumerate(old_rules):
+        if position not in paired_old:
+            unmatched_by_name.setdefault(rule.get("name"), deque()).append(position)
+    added = []
+    modified = []
+    for position in unpaired_new:
+        rule = new_rules[position]
+        candidates = unmatched_by_name.get(rule.get("name")) if rule.get("name") is not None else None
+        if candidates:
+            old_position = candidates.popleft()
+            modified.append(RuleChange(rule.get("name"), old_position, position,
+                                       get_changed_fields(old_rules[old_position], rule)))
+        else:
+            added.append(RuleChange(rule.get("name"), None, position, []))
+    removed = [
+        RuleChange(old_rules[position].get("name"), position, None, [])
+        for candidates in unmatched_by_name.values() for position in candidates
+    ]
+
+    in_order = get_ordered_pairs(sorted(pairs, key=lambda pair: pair[1]))
+    reordered = [RuleChange(new_rules[new_position].get("name"), old_position, new_position, [])
+                 for old_position, new_position in sorted(pairs, key=lambda pair: pair[1])
+                 if (old_position, new_position) not in in_order]
+    return PolicyDiff(added, sorted(removed, key=lambda change: change.old_position), modified, reordered,
+                      len(pairs) - len(reordered))
+
+
+def get_changed_fields(old_rule: dict, new_rule: dict) -> list:
+    """
+    @return: sorted list of the fields whose values differ between the rules (ignoring the IGNORED_RULE_FIELDS)
+    """
+    fields = (set(old_rule) | set(new_rule)) - set(IGNORED_RULE_FIELDS)
+    return sorted(field for field in fields if old_rule.get(field) != new_rule.get(field))
+
+
+def get_ordered_pairs(pairs: list) -> set:
+    """
+    Finds the largest set of the pairs that kept their relative order (the longest increasing subsequence of the
+    old positions, in O(n log n)); the other pairs are the ones that moved
+    @param pairs: tuples of the old & new positions, sorted by the new position
+    @return: set of the pairs that did not move
+    """
+    tails = []
+    tail_indexes = []
+    previous = [None] * len(pairs)
+    for index, (old_position, _) in enumerate(pairs):
+        length = bisect.bisect_left(tails, old_position)
+        if length == len(tails):
+            tails.append(old_position)
+            tail_indexes.append(index)
+        else:
+            tails[length] = old_position
+            tail_indexes[length] = index
+        previous[index] = tail_indexes[length - 1] if length > 0 else None
+    ordered = set()
+    index = tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        ordered.add(pairs[index])
+        index = previous[index]
+    return ordered
+
+
+def get_match_rules(version) -> list:
+    """
+    @param version: the policy version (as provided by get_policy_version) or just the list of its match rules
+    @return: list of the match rules
+    """
+    if isinstance(version, list):
+        return version
+    return version.get("matchRules", None) or []
+
+
+def load_match_rules(file_name: str) -> list:
+    """
+    @param file_name: json file with the policy version (such as the response of get_policy_version) or with the
+    list of the match rules
+    @return: list of the match rules
+    """
+    with open(file_name, mode="r") as rules_file:
+        return get_match_rules(json.load(rules_file))
+
+
+def fetch_version(policy_id: str, policy_version: str, client: http_requests.AkamaiClient) -> dict:
+    """
+    @return: the policy version
+    @raise ApiRequestFailed: if the version could not be fetched
+    """
+    version = api.get_policy_version(str(policy_id), str(policy_version), client=client)
+    if version is None:
+        raise exceptions.ApiRequestFailed(f"Could not fetch version {policy_version} of policy {policy_id}")
+    return version
+
+
+def diff_versions(policy_id: str,
+                  policy_version: str,
+                  other_version: str,
+                  edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                  client: http_requests.AkamaiClient = None,
+                  other_policy_id: str = None) -> PolicyDiff:
+    """
+    Compares the match rules of two policy versions, both are fetched at the same time
+    @param policy_id: the policy of the original version
+    @param policy_version: the original version
+    @param other_version: the new version
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param other_policy_id: the policy of the new version, if it is not the same policy
+    @return: PolicyDiff
+    @raise ApiRequestFailed: if any of the versions could not be fetched
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="akamai-diff") as executor:
+        old = executor.submit(fetch_version, policy_id, policy_version, akamai_client)
+        new = executor.submit(fetch_version, other_policy_id or policy_id, other_version, akamai_client)
+        return diff_match_rules(get_match_rules(old.result()), get_match_rules(new.result()))
+
+
+def diff_version_with_file(policy_id: str,
+                           policy_version: str,
+                           file_name: str,
+                           edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                           client: http_requests.AkamaiClient = None) -> PolicyDiff:
+    """
+    Compares the match rules of the policy version (the original) with the rules in the local file (the new ones)
+    @param file_name: json file with the policy version or the list of the match rules
+    @return: PolicyDiff
+    @raise ApiRequestFailed: if the version could not be fetched
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    version = fetch_version(policy_id, policy_version, akamai_client)
+    return diff_match_rules(get_match_rules(version), load_match_rules(file_name))
+
+
+def get_active_version(policy: dict, network: str):
+    """
+    @param policy: the policy (as provided by get_policy_by_id)
+    @param network: 'staging' or 'production'
+    @return: number of the version effective on the network, None if there is none
+    """
+    activations = (policy.get("currentActivations", None) or {}).get(network.lower(), None) or {}
+    effective = activations.get("effective", None) or {}
+    if effective.get("operation", "ACTIVATION").upper() != "ACTIVATION":
+        return None
+    return effective.get("policyVersion", None)
+
+
+def get_equivalent_active_version(policy_id: str,
+                                  network: str,
+                                  policy_version: str,
+                                  edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                                  client: http_requests.AkamaiClient = None):
+    """
+    Checks whether activating the version would change anything on the network
+    @return: the version effective on the network if it is the provided version or has identical match rules,
+    None otherwise (the activation is not a no-op then)
+    @raise ApiRequestFailed: if the policy or any of the versions could not be fetched
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    policy = api.get_policy_by_id(str(policy_id), client=akamai_client)
+    if policy is None:
+        raise exceptions.ApiRequestFailed(f"Could not fetch policy {policy_id}")
+    active_version = get_active_version(policy, network)
+    if active_version is None:
+        return None
+    if str(active_version) == str(policy_version):
+        return active_version
+    if diff_versions(policy_id, str(active_version), policy_version, client=akamai_client).is_identical():
+        return active_version
+    return None
+
+
+def activate_if_changed(policy_id: str,
+                        network: str,
+                        policy_version: str,
+                        edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                        client: http_requests.AkamaiClient = None):
+    """
+    Activates the policy version unless the version effective on the network has identical match rules, so no
+    activation is spent on a no-op
+    @param policy_id: is the policy identifier
+    @param network: either 'PRODUCTION' or 'STAGING'
+    @param policy_version: is the policy version that is to be activated
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @return: the activation (as provided by request_policy_activation) or None if the activation was skipped
+    @raise ApiRequestFailed: if the policy or the versions could not be fetched, or Akamai did not accept the
+    activation
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    if get_equivalent_active_version(policy_id, network, policy_version, client=akamai_client) is not None:
+        return None
+    activation = api.request_policy_activation(str(policy_id), network,
+                                               akamai_enums.ActivationOperations.ACTIVATION.value,
+                                               str(policy_version), client=akamai_client)
+    if activation is None:
+        raise exceptions.ApiRequestFailed(f"Akamai did not accept the activation of version {policy_version} of "
+                                          f"policy {policy_id}")
+    return activation
@@ -0,0 +1,138 @@
+import bisect
+import threading
+import time
+from collections import namedtuple
+
+NGRAM_LENGTH = 3
+
+
+class PolicyNameIndex:
+    """
+    Lookup structure of the shared policies by their names, built once from the policy listing. Exact and
+    case-insensitive lookups are dictionary lookups, prefix lookups use binary search over the sorted (lowercase)
+    names and substring lookups intersect the trigram postings before verifying the few remaining candidates.
+    The index refreshes itself when it is older than the provided TTL, or on demand by calling 'refresh'.
+    """
+
+    def __init__(self, loader, ttl: float = None):
+        """
+        @param loader: callable without parameters that returns an iterable of the policies (dicts with at least
+        'name' and 'id' keys), such as a partial of 'iter_shared_policies'
+        @param ttl: number of seconds after which the index is rebuilt on the next lookup; None means never
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.built_at = None
+        self._refresh_lock = threading.Lock()
+        self._snapshot = build_snapshot([])
+
+    def refresh(self):
+        """
+        Downloads the policies again and rebuilds the index. Lookups running in the meantime keep using the
+        previous version of the index.
+        """
+        with self._refresh_lock:
+            self._snapshot = build_snapshot(self.loader())
+            self.built_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        """
+        @return: True if the index was never built or is older than its TTL
+        """
+        if self.built_at is None:
+            return True
+        return self.ttl is not None and time.monotonic() - self.built_at > self.ttl
+
+    def __len__(self):
+        return len(self._get_snapshot().names)
+
+    def __contains__(self, policy_name: str):
+        return self.get(policy_name) is not None
+
+    def get(self, policy_name: str):
+        """
+        @param policy_name: exact name of the policy
+        @return: id of the policy or None if there is no policy with such name
+        """
+        return self._get_snapshot().names.get(policy_name, None)
+
+    def find_case_insensitive(self, policy_name: str) -> dict:
+        """
+        @param policy_name: name of the policy, case does not matter
+        @return: dict with policy name as key and its id as value, empty if nothing matches
+        """
+        snapshot = self._get_snapshot()
+        return to_dict(snapshot, snapshot.lowercase_names.get(policy_name.lower(), []))
+
+    def find_by_prefix(self, prefix: str) -> dict:
+        """
+        @param prefix: beginning of the policy name, case does not matter
+        @return: dict with policy name as key and its id as value, empty if nothing matches
+        """
+        snapshot = self._get_snapshot()
+        sorted_names = snapshot.sorted_names
+        needle = prefix.lower()
+        position = bisect.bisect_left(sorted_names, (needle,))
+        names = []
+        while position < len(sorted_names) and sorted_names[position][0].startswith(needle):
+            names.append(sorted_names[position][1])
+            position += 1
+        return to_dict(snapshot, names)
+
+    def find_by_substring(self, needle: str) -> dict:
+        """
+        @param needle: string the policy name should contain, case does not matter
+        @return: dict with policy name as key and its id as value, empty if nothing matches
+        """
+        snapshot = self._get_snapshot()
+        needle = needle.lower()
+        ngrams = get_ngrams(needle)
+        if len(ngrams) == 0:
+            candidates = snapshot.names.keys()
+        else:
+            postings = sorted((snapshot.ngrams.get(ngram, set()) for ngram in ngrams), key=len)
+            candidates = set.intersection(*postings)
+        return to_dict(snapshot, [name for name in candidates if needle in name.lower()])
+
+    def _get_snapshot(self):
+        if self.is_stale():
+            with self._refresh_lock:
+                if self.is_stale():
+                    self._snapshot = build_snapshot(self.loader())
+                    self.built_at = time.monotonic()
+        return self._snapshot
+
+
+IndexSnapshot = namedtuple("IndexSnapshot", ["names", "lowercase_names", "sorted_names", "ngrams"])
+
+
+def build_snapshot(policies) -> IndexSnapshot:
+    """
+    Builds all the lookup structures of the index
+    @param policies: iterable of the policies (dicts with at least 'name' and 'id' keys)
+    @return: IndexSnapshot
+    """
+    names = {}
+    lowercase_names = {}
+    ngrams = {}
+    for policy in policies:
+        name = policy["name"]
+        names[name] = policy["id"]
+        lowercase = name.lower()
+        lowercase_names.setdefault(lowercase, []).append(name)
+        for ngram in get_ngrams(lowercase):
+            ngrams.setdefault(ngram, set()).add(name)
+    sorted_names = sorted((name.lower(), name) for name in names)
+    return IndexSnapshot(names, lowercase_names, sorted_names, ngrams)
+
+
+def to_dict(snapshot: IndexSnapshot, names) -> dict:
+    return {name: snapshot.names[name] for name in sorted(names)}
+
+
+def get_ngrams(text: str) -> set:
+    """
+    @param text: the text to split
+    @return: set of all substrings of NGRAM_LENGTH characters of the text (empty if the text is shorter)
+    """
+    return {text[i:i + NGRAM_LENGTH] for i in range(len(text) - NGRAM_LENGTH + 1)}
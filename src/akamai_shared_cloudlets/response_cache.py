@@ -0,0 +1,371 @@
+import base64
+import copy
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# path patterns of the read-only endpoints and for how many seconds their responses may be reused
+DEFAULT_TTLS = {
+    r"^/cloudlets/v3/cloudlet-info$": 3600,
+    r"^/cloudlets/api/v2/group-info$": 3600,
+    r"^/cloudlets/v3/policies/\d+$": 60,
+    r"^/cloudlets/v3/policies/\d+/versions$": 60,
+    r"^/cloudlets/v3/policies/\d+/versions/\d+$": 60,
+}
+
+IMMUTABLE_VERSION_PATH = re.compile(r"^/cloudlets/v3/policies/\d+/versions/\d+$")
+POLICY_PATH = re.compile(r"^(/cloudlets/v3/policies/\d+)(?:/|$)")
+
+CacheEntry = namedtuple("CacheEntry", ["url", "status_code", "headers", "content", "expires_at"])
+
+
+class MemoryStore:
+    """
+    In-memory LRU store of the cached responses
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url_prefix: str):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if is_under(entry.url, url_prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskStore:
+    """
+    Store of the cached responses on the disk (one json file per response), so they survive between the runs. The
+    files are sharded by the policy (or the path) they belong to, see get_invalidation_prefix, so a write request
+    drops just the directory of its policy instead of reading every cached file.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key: str):
+        try:
+            with open(self._get_file_name(key), mode="r") as cache_file:
+                stored = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(
+            url=stored["url"],
+            status_code=stored["status_code"],
+            headers=stored["headers"],
+            content=base64.b64decode(stored["content"]),
+            expires_at=stored["expires_at"]
+        )
+
+    def set(self, key: str, entry: CacheEntry):
+        stored = entry._asdict()
+        stored["content"] = base64.b64encode(entry.content).decode("ascii")
+        file_name = self._get_file_name(key)
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        temporary_file_name = f"{file_name}.{threading.get_ident()}.tmp"
+        with open(temporary_file_name, mode="w") as cache_file:
+            json.dump(stored, cache_file)
+        os.replace(temporary_file_name, file_name)
+
+    def invalidate(self, url_prefix: str):
+        shutil.rmtree(self._get_shard_directory(url_prefix), ignore_errors=True)
+
+    def clear(self):
+        for shard in os.listdir(self.directory):
+            shard_directory = os.path.join(self.directory, shard)
+            if os.path.isdir(shard_directory):
+                shutil.rmtree(shard_directory, ignore_errors=True)
+
+    def _get_shard_directory(self, url_prefix: str):
+        return os.path.join(self.directory, hashlib.sha256(url_prefix.encode("utf-8")).hexdigest()[:32])
+
+    def _get_file_name(self, key: str):
+        return os.path.join(self._get_shard_directory(get_invalidation_prefix(key)),
+                            hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+
+class ResponseCache:
+    """
+    Cache of the responses of the read-only endpoints, used by AkamaiClient for its GET requests. Fresh responses are
+    served from the memory (or disk) without asking Akamai at all; expired ones are revalidated with
+    If-None-Match / If-Modified-Since when Akamai provided ETag / Last-Modified. Versions that Akamai marks as
+    immutable (activated at least once) never expire. Every write request invalidates the cached responses
+    of the affected policy.
+    """
+
+    def __init__(self, ttls: dict = None, max_entries: int = 1024, disk_directory: str = None):
+        """
+        @param ttls: dict of path regex patterns and the number of seconds the responses may be reused for; paths that
+        match none of the patterns are not cached. Defaults to DEFAULT_TTLS.
+        @param max_entries: how many responses are kept in the memory
+        @param disk_directory: directory where the responses are stored as well, None means memory only
+        """
+        if ttls is None:
+            ttls = DEFAULT_TTLS
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls.items()]
+        self.memory = MemoryStore(max_entries)
+        self.disk = DiskStore(disk_directory) if disk_directory is not None else None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+    def get_ttl(self, path: str):
+        """
+        @param path: path of the request (without the query string)
+        @return: number of seconds the response may be reused for or None if it should not be cached at all
+        """
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return None
+
+    def fetch(self, url: str, send):
+        """
+        Provides the response for the GET request, from the cache if possible
+        @param url: full url of the request (including the query string), serves as the cache key
+        @param send: callable that sends the request; it gets a dict of additional (conditional) request headers
+        @return: requests.Response
+        """
+        path = urlsplit(url).path
+        ttl = self.get_ttl(path)
+        if ttl is None:
+            return send({})
+
+        entry = self._lookup(url)
+        now = time.time()
+        if entry is not None and (entry.expires_at is None or entry.expires_at > now):
+            self._count("hits")
+            return to_response(entry)
+
+        conditional_headers = get_conditional_headers(entry)
+        response = send(conditional_headers)
+        if entry is not None and response.status_code == 304:
+            self._count("revalidations")
+            entry = entry._replace(expires_at=now + ttl)
+            self._store(url, entry)
+            return to_response(entry)
+
+        self._count("misses")
+        if response.status_code == 200:
+            expires_at = None if is_immutable(path, response) else now + ttl
+            self._store(url, CacheEntry(
+                url=url,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                content=response.content,
+                expires_at=expires_at
+            ))
+        return response
+
+    def invalidate(self, url: str):
+        """
+        Drops the cached responses affected by a write request to the provided url
+        @param url: full url of the write request
+        """
+        url_prefix = get_invalidation_prefix(url)
+        self.memory.invalidate(url_prefix)
+        if self.disk is not None:
+            self.disk.invalidate(url_prefix)
+
+    def clear(self):
+        """
+        Drops all the cached responses
+        """
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        """
+        @return: dict with the number of hits, misses and revalidations of the cache
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "entries": len(self.memory)
+        }
+
+    def _lookup(self, key: str):
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        return entry
+
+    def _store(self, key: str, entry: CacheEntry):
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class LatestVersionCache:
+    """
+    Latest version of every policy the client looked up, kept by AkamaiClient even without a ResponseCache. It is
+    dropped as soon as the client sends a write request to the policy (such as creating or updating a version), so
+    the client always sees its own changes; versions created by other clients show up once the TTL expires.
+    """
+
+    def __init__(self, ttl: float = None):
+        """
+        @param ttl: number of seconds a latest version is reused for, None means until the client changes the policy
+        """
+        self.ttl = ttl
+        self._versions = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, policy_id):
+        """
+        @param policy_id: id of the policy (number or string)
+        @return: copy of the latest version of the policy, None if it is not cached (or expired)
+        """
+        with self._lock:
+            cached = self._versions.get(str(policy_id), None)
+        if cached is None:
+            return None
+        version, expires_at = cached
+        if expires_at is not None and expires_at <= time.monotonic():
+            return None
+        return copy.deepcopy(version)
+
+    def get_generation(self, policy_id) -> int:
+        """
+        @return: how many times the policy was invalidated; pass it to 'set' once the latest version is listed
+        """
+        with self._lock:
+            return self._generations.get(str(policy_id), 0)
+
+    def set(self, policy_id, version: dict, generation: int):
+        """
+        Stores the latest version, unless the policy was changed while it was being listed
+        @param policy_id: id of the policy (number or string)
+        @param version: latest version of the policy
+        @param generation: result of 'get_generation' taken before the versions were listed
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if self._generations.get(str(policy_id), 0) == generation:
+                self._versions[str(policy_id)] = (copy.deepcopy(version), expires_at)
+
+    def invalidate(self, url: str):
+        """
+        Drops the latest version of the policy a write request was sent to
+        @param url: path (or full url) of the write request
+        """
+        match = POLICY_PATH.match(urlsplit(url).path)
+        if match is None:
+            return
+        policy_id = match.group(1).rsplit("/", 1)[1]
+        with self._lock:
+            self._versions.pop(policy_id, None)
+            self._generations[policy_id] = self._generations.get(policy_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+
+
+def get_invalidation_prefix(url: str) -> str:
+    """
+    @param url: full url of a request
+    @return: url of the policy the request belongs to (or of its path, if it is not a policy request), without the
+    query string
+    """
+    split_url = urlsplit(url)
+    match = POLICY_PATH.match(split_url.path)
+    path = match.group(1) if match is not None else split_url.path
+    return f"{split_url.scheme}://{split_url.netloc}{path}"
+
+
+def is_under(url: str, url_prefix: str) -> bool:
+    """
+    @return: True if the url is the prefix itself or continues it with a path segment or a query string (so the
+    prefix of policy 1 does not cover policy 10)
+    """
+    return url == url_prefix or (url.startswith(url_prefix) and url[len(url_prefix)] in "/?")
+
+
+def get_conditional_headers(entry: CacheEntry) -> dict:
+    """
+    @param entry: cached response that expired, may be None
+    @return: dict of the headers that let Akamai answer '304 Not Modified' if the response did not change
+    """
+    if entry is None:
+        return {}
+    headers = CaseInsensitiveDict(entry.headers)
+    conditional_headers = {}
+    if "etag" in headers:
+        conditional_headers["If-None-Match"] = headers["etag"]
+    if "last-modified" in headers:
+        conditional_headers["If-Modified-Since"] = headers["last-modified"]
+    return conditional_headers
+
+
+def is_immutable(path: str, response: requests.Response) -> bool:
+    """
+    @return: True if the response is a policy version that can not change anymore
+    """
+    if IMMUTABLE_VERSION_PATH.match(path) is None:
+        return False
+    try:
+        return response.json().get("immutable", False) is True
+    except ValueError:
+        return False
+
+
+def to_response(entry: CacheEntry) -> requests.Response:
+    """
+    Builds the response object out of the cached one; every call provides a new object, so the callers can't
+    modify the cached data
+    @param entry: the cached response
+    @return: requests.Response with 'from_cache' attribute set to True
+    """
+    response = requests.Response()
+    response.status_code = entry.status_code
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = entry.url
+    response._content = entry.content
+    response.from_cache = True
+    return response
@@ -1,5 +1,9 @@
+import json
 import os
 
+STREAMING_FORMATS = ("ndjson", "compact", "tsv")
+DEFAULT_TSV_FIELDS = ("id", "name")
+
 
 def get_shared_policies_text(json_response: dict):
     """
@@ -25,3 +29,66 @@ def get_home_folder(edgerc_location: str):
     @return: OS-agnostic reference to home folder
     """
     return os.path.expanduser(edgerc_location)
+
+
+def get_field(item: dict, field: str):
+    """
+    @param item: dict (such as a policy) to read the field from
+    @param field: name of the field, nested fields are separated by dots ('currentActivations.staging.effective')
+    @return: value of the field or None if the item does not have it
+    """
+    value = item
+    for key in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def project_fields(item: dict, fields) -> dict:
+    """
+    @param item: dict (such as a policy) to pick the fields from
+    @param fields: list of the field names (see get_field), None means all fields
+    @return: dict with just the requested fields, in the requested order
+    """
+    if fields is None:
+        return item
+    return {field: get_field(item, field) for field in fields}
+
+
+def iter_formatted_output(items, response_format: str, fields=None):
+    """
+    Formats the items one by one, so the output can be written while the items are still being downloaded
+    @param items: iterable of dicts, such as the generator of 'iter_shared_policies'
+    @param response_format: 'ndjson' (one json object per line), 'compact' (a single-line json array without any
+    whitespace) or 'tsv' (tab-separated values of the fields with a header line)
+    @param fields: list of the fields to output (see get_field), None means all of them ('id' and 'name' for 'tsv')
+    @return: generator of the chunks of the output (including the line ends)
+    """
+    if response_format == "tsv":
+        fields = list(fields or DEFAULT_TSV_FIELDS)
+        yield "\t".join(fields) + "\n"
+        for item in items:
+            yield "\t".join(to_tsv_value(get_field(item, field)) for field in fields) + "\n"
+    elif response_format == "compact":
+        separator = "["
+        for item in items:
+            yield separator + json.dumps(project_fields(item, fields), separators=(",", ":"))
+            separator = ","
+        yield "[]\n" if separator == "[" else "]\n"
+    elif response_format == "ndjson":
+        for item in items:
+            yield json.dumps(project_fields(item, fields), separators=(",", ":")) + "\n"
+    else:
+        raise ValueError(f"Unknown streaming format '{response_format}', expected one of {STREAMING_FORMATS}")
+
+
+def to_tsv_value(value) -> str:
+    """
+    @return: the value as a single tsv cell - None is empty, dicts & lists are json, tabs & line ends are escaped
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list, bool)):
+        value = json.dumps(value, separators=(",", ":"))
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
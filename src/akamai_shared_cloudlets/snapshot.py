@@ -0,0 +1,195 @@
+import gzip
+import io
+import json
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+from . import akamai_api_requests_abstractions as api
+from . import akamai_project_constants
+from . import exceptions
+from . import http_requests
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIONS = ("gzip", "zstd", "none")
+
+
+def export_snapshot(output_file: str,
+                    edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                    client: http_requests.AkamaiClient = None,
+                    max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY,
+                    compression: str = None,
+                    include_rules: bool = True) -> dict:
+    """
+    Exports all the shared policies of the account, all their versions and the match rules of the versions
+    into a JSONL file (one record per line, {"type": "policy", "data": ...} or {"type": "version", "policyId": ...,
+    "data": ...}). The versions are downloaded by a bounded pool of workers and every record is written as soon as
+    it arrives, so the account is never held in memory. The manifest (counts, timings & errors) is written next
+    to the output file, with '.manifest.json' suffix.
+    @param output_file: where to write the records
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param max_workers: how many requests are sent to Akamai at the same time
+    @param compression: 'gzip', 'zstd' or 'none', if not provided, it is guessed from the file name ('.gz', '.zst')
+    @param include_rules: whether to download every version with its match rules or just the versions' metadata
+    @return: dict with the manifest
+    """
+    compression = compression or get_compression(output_file)
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    started_at = time.monotonic()
+    started = datetime.now(timezone.utc).isoformat()
+    counts = Counter()
+    timings = Counter()
+    errors = []
+    with open_output(output_file, compression) as output:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="akamai-snapshot") as executor:
+            policies = api.iter_shared_policies(client=akamai_client)
+            versions_to_fetch = deque()
+            in_flight = set()
+            policies_listed = False
+            while True:
+                while len(in_flight) < max_workers * 2:
+                    if len(versions_to_fetch) > 0:
+                        policy_id, version = versions_to_fetch.popleft()
+                        in_flight.add(executor.submit(fetch_version, akamai_client, policy_id, version))
+                        continue
+                    policy = None if policies_listed else next(policies, None)
+                    if policy is None:
+                        policies_listed = True
+                        break
+                    write_record(output, {"type": "policy", "data": policy})
+                    counts["policies"] += 1
+                    in_flight.add(executor.submit(fetch_versions, akamai_client, policy["id"]))
+                if len(in_flight) == 0:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, policy_id, payload, error, duration = future.result()
+                    timings[task] += duration
+                    if error is not None:
+                        errors.append({"task": task, "policyId": policy_id, "error": error})
+                    elif task == "list_versions" and include_rules:
+                        versions_to_fetch.extend((policy_id, version["version"]) for version in payload)
+                    elif task == "list_versions":
+                        for version in payload:
+                            write_record(output, {"type": "version", "policyId": policy_id, "data": version})
+                            counts["versions"] += 1
+                    else:
+                        write_record(output, {"type": "version", "policyId": policy_id, "data": payload})
+                        counts["versions"] += 1
+                        counts["match_rules"] += len(payload.get("matchRules") or [])
+
+    manifest = {
+        "output": output_file,
+        "compression": compression,
+        "started": started,
+        "duration": round(time.monotonic() - started_at, 3),
+        "counts": {"policies": counts["policies"], "versions": counts["versions"],
+                   "match_rules": counts["match_rules"]},
+        "timings": {task: round(duration, 3) for task, duration in timings.items()},
+        "errors": errors
+    }
+    with open(f"{output_file}.manifest.json", mode="w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def iter_snapshot(input_file: str, compression: str = None):
+    """
+    Reads the records of the snapshot back, one by one
+    @param input_file: the snapshot created by export_snapshot
+    @param compression: 'gzip', 'zstd' or 'none', if not provided, it is guessed from the file name
+    @return: generator of the records (dicts)
+    """
+    compression = compression or get_compression(input_file)
+    with open_input(input_file, compression) as snapshot_file:
+        for line in snapshot_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def fetch_versions(client: http_requests.AkamaiClient, policy_id):
+    """
+    Lists the versions of the policy, never raises - any error is part of the result
+    @return: tuple of task name, policy id, list of versions, error & duration
+    """
+    started_at = time.monotonic()
+    try:
+        versions = list(api.iter_policy_versions(policy_id, client=client, prefetch=False))
+        return "list_versions", policy_id, versions, None, time.monotonic() - started_at
+    except Exception as exception:
+        return "list_versions", policy_id, None, str(exception), time.monotonic() - started_at
+
+
+def fetch_version(client: http_requests.AkamaiClient, policy_id, version):
+    """
+    Downloads the policy version including its match rules, never raises - any error is part of the result
+    @return: tuple of task name, policy id, the version, error & duration
+    """
+    started_at = time.monotonic()
+    try:
+        policy_version = api.get_policy_version(policy_id, version, client=client)
+        error = None if policy_version is not None else f"Unable to get version {version}"
+        return "get_version", policy_id, policy_version, error, time.monotonic() - started_at
+    except Exception as exception:
+        return "get_version", policy_id, None, str(exception), time.monotonic() - started_at
+
+
+def write_record(output, record: dict):
+    output.write(json.dumps(record, separators=(",", ":")))
+    output.write("\n")
+
+
+def get_compression(file_name: str) -> str:
+    """
+    @return: compression guessed from the file name
+    """
+    if file_name.endswith(".gz"):
+        return "gzip"
+    if file_name.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def open_output(file_name: str, compression: str):
+    """
+    @return: text file object writing into the (compressed) file
+    """
+    if compression == "gzip":
+        return gzip.open(file_name, mode="wt", encoding="utf-8")
+    if compression == "zstd":
+        raw_file = open(file_name, mode="wb")
+        return io.TextIOWrapper(get_zstandard().ZstdCompressor().stream_writer(raw_file, closefd=True),
+                                encoding="utf-8")
+    if compression == "none":
+        return open(file_name, mode="w", encoding="utf-8")
+    raise exceptions.IncorrectInputParameter(f"Compression must be one of {COMPRESSIONS}, it was {compression}")
+
+
+def open_input(file_name: str, compression: str):
+    """
+    @return: text file object reading the (compressed) file
+    """
+    if compression == "gzip":
+        return gzip.open(file_name, mode="rt", encoding="utf-8")
+    if compression == "zstd":
+        raw_file = open(file_name, mode="rb")
+        return io.TextIOWrapper(get_zstandard().ZstdDecompressor().stream_reader(raw_file, closefd=True),
+                                encoding="utf-8")
+    if compression == "none":
+        return open(file_name, mode="r", encoding="utf-8")
+    raise exceptions.IncorrectInputParameter(f"Compression must be one of {COMPRESSIONS}, it was {compression}")
+
+
+def get_zstandard():
+    if zstandard is None:
+        raise exceptions.MissingOptionalDependency("zstd compression needs the 'zstandard' package "
+                                                   "(pip install akamai-shared-cloudlets[zstd])")
+    return zstandard
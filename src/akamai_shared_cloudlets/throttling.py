@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket; every request takes one token and the tokens are refilled at a constant rate,
+    so the requests never exceed that rate (apart from the initial burst of 'capacity' requests)
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        @param rate: how many tokens (requests) are added per second
+        @param capacity: maximum number of tokens the bucket holds, defaults to the rate (one second worth of requests)
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be a positive number, it was {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """
+        Takes the tokens from the bucket, waiting for them if there are not enough of them
+        @param tokens: how many tokens to take
+        @return: number of seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                missing = max(self._paused_until - time.monotonic(), 0.0)
+                if missing == 0 and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                if missing == 0:
+                    missing = (tokens - self._tokens) / self.rate
+            time.sleep(missing)
+            waited += missing
+
+    def pause(self, seconds: float):
+        """
+        Makes everybody who shares the bucket wait, such as when Akamai says the quota is exhausted
+        @param seconds: for how long no tokens are handed out
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+class RetryPolicy:
+    """
+    Decides whether (and after how long) a failed request is sent again. Only the idempotent requests are retried,
+    on 429 and on the transient 5xx errors, with exponential backoff and jitter. When Akamai tells us how long to
+    wait ('Retry-After' or the 'X-RateLimit-Next' header), we wait for that long instead.
+    """
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 60,
+                 jitter: float = 0.2,
+                 status_codes: tuple = RETRYABLE_STATUS_CODES,
+                 methods: tuple = IDEMPOTENT_METHODS):
+        """
+        @param max_retries: how many times the request may be sent again
+        @param backoff_factor: the n-th retry waits backoff_factor * 2 ** (n - 1) seconds
+        @param max_backoff: no retry waits longer than this number of seconds
+        @param jitter: the wait is randomly shortened or extended by up to this fraction of itself
+        @param status_codes: response status codes that are worth another attempt
+        @param methods: http methods that are safe to send again
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_codes = status_codes
+        self.methods = methods
+
+    def should_retry(self, method: str, attempt: int, response: requests.Response = None) -> bool:
+        """
+        @param method: http method of the request
+        @param attempt: how many retries were done already
+        @param response: response of the last attempt, None if the connection failed
+        @return: True if the request should be sent again
+        """
+        if attempt >= self.max_retries or method.upper() not in self.methods:
+            return False
+        return response is None or response.status_code in self.status_codes
+
+    def get_delay(self, attempt: int, response: requests.Response = None) -> float:
+        """
+        @param attempt: how many retries were done already
+        @param response: response of the last attempt, None if the connection failed
+        @return: number of seconds to wait before the next attempt
+        """
+        requested_delay = get_requested_delay(response.headers) if response is not None else None
+        if requested_delay is not None:
+            return min(requested_delay, self.max_backoff)
+        delay = min(self.backoff_factor * 2 ** attempt, self.max_backoff)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def get_requested_delay(headers) -> float:
+    """
+    Finds out how long Akamai wants us to wait, based on the 'Retry-After' header (seconds or http date) or on the
+    rate limit headers ('X-RateLimit-Remaining' being zero and 'X-RateLimit-Next' the time of the next free request)
+    @param headers: response headers
+    @return: number of seconds to wait or None if the headers do not say
+    """
+    headers = CaseInsensitiveDict(headers)
+    retry_after = headers.get("retry-after")
+    if retry_after is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            return get_seconds_until(parse_http_date(retry_after))
+    if headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-next" in headers:
+        return get_seconds_until(parse_iso_date(headers["x-ratelimit-next"]))
+    return None
+
+
+def parse_http_date(value: str):
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_iso_date(value: str):
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def get_seconds_until(moment: datetime):
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+_shared_rate_limiter = None
+_shared_rate_limiter_lock = threading.Lock()
+
+
+def configure_shared_rate_limiter(rate: float, capacity: float = None) -> TokenBucket:
+    """
+    Sets the process-wide request rate; all the clients using the shared limiter stay under it together
+    @param rate: how many requests per second all the threads may send together, None turns the limiter off
+    @param capacity: how many requests may be sent at once in a burst, defaults to the rate
+    @return: the shared TokenBucket (or None if it was turned off)
+    """
+    global _shared_rate_limiter
+    with _shared_rate_limiter_lock:
+        _shared_rate_limiter = TokenBucket(rate, capacity) if rate is not None else None
+        return _shared_rate_limiter
+
+
+def get_shared_rate_limiter() -> TokenBucket:
+    """
+    @return: the process-wide TokenBucket set by configure_shared_rate_limiter, None if there is none
+    """
+    return _shared_rate_limiter
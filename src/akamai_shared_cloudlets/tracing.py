@@ -0,0 +1,90 @@
+import contextlib
+import functools
+import inspect
+
+# arguments of the library functions that are recorded as the span attributes
+SPAN_ATTRIBUTES = {
+    "policy_id": "akamai.policy_id",
+    "policy_name": "akamai.policy_name",
+    "policy_version": "akamai.policy_version",
+    "network": "akamai.network",
+    "operation": "akamai.operation",
+    "page_number": "akamai.page",
+    "page_size": "akamai.page_size",
+    "group_id": "akamai.group_id",
+    "activation_id": "akamai.activation_id",
+}
+
+
+class NoOpSpan:
+    """
+    Span that records nothing; has the subset of the OpenTelemetry Span interface the library uses
+    """
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def set_status(self, status, description: str = None):
+        pass
+
+    def record_exception(self, exception: BaseException):
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+
+class NoOpTracer:
+    """
+    Tracer that creates no spans at all, used unless set_tracer is called
+    """
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name: str, attributes: dict = None, **kwargs):
+        yield NoOpSpan()
+
+
+_tracer = NoOpTracer()
+
+
+def set_tracer(tracer):
+    """
+    Makes the library trace its calls: a parent span for every library function and a child span for every http
+    request it sends. Any object with the OpenTelemetry 'start_as_current_span(name, attributes=...)' method works,
+    typically 'opentelemetry.trace.get_tracer("akamai_shared_cloudlets")'.
+    @param tracer: the tracer to use, None turns the tracing off
+    """
+    global _tracer
+    _tracer = tracer if tracer is not None else NoOpTracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def is_enabled() -> bool:
+    return not isinstance(_tracer, NoOpTracer)
+
+
+def traced(function):
+    """
+    Decorator that wraps every call of the library function in a span named after the function. The known arguments
+    (such as policy_id, policy_version, network or page_number, see SPAN_ATTRIBUTES) become the span attributes.
+    """
+    signature = inspect.signature(function)
+    recorded_arguments = [name for name in signature.parameters if name in SPAN_ATTRIBUTES]
+    span_name = f"akamai_shared_cloudlets.{function.__name__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not is_enabled():
+            return function(*args, **kwargs)
+        bound_arguments = signature.bind_partial(*args, **kwargs).arguments
+        attributes = {
+            SPAN_ATTRIBUTES[name]: str(bound_arguments[name])
+            for name in recorded_arguments if bound_arguments.get(name) is not None
+        }
+        with _tracer.start_as_current_span(span_name, attributes=attributes):
+            return function(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,301 @@
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import akamai_api_requests_abstractions as api
+from . import akamai_project_constants
+from . import http_requests
+from . import snapshot
+from .policy_diff import IGNORED_RULE_FIELDS, get_rule_fingerprint
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rules (
+    hash TEXT PRIMARY KEY,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rule_lists (
+    hash TEXT PRIMARY KEY,
+    rule_hashes BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    policy_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    metadata BLOB NOT NULL,
+    rule_list_hash TEXT,
+    rule_fields BLOB,
+    immutable INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (policy_id, version)
+);
+"""
+
+# how many versions are written in one transaction by archive_versions & import_snapshot
+COMMIT_INTERVAL = 500
+
+
+class VersionStore:
+    """
+    Deduplicated on-disk archive of the policy versions (a single SQLite file). Every match rule is stored once,
+    addressed by the hash of its content (without the fields Akamai assigns to it, see IGNORED_RULE_FIELDS); the
+    ordered list of the rule hashes is stored once per distinct list of rules, and every version keeps just its
+    metadata, the reference to its rule list and the assigned fields of its rules. The versions are reconstructed
+    on demand, rule by rule.
+
+        with VersionStore("versions.db") as store:
+            store.put_version(policy_id, api.get_policy_version(policy_id, version))
+            for rule in store.iter_match_rules(policy_id, version):
+                ...
+    """
+
+    def __init__(self, path: str, rule_cache_size: int = 4096):
+        """
+        @param path: the SQLite file, created if it does not exist
+        @param rule_cache_size: how many decompressed rules are kept in memory for the reconstruction of the versions
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._load_rule = functools.lru_cache(maxsize=rule_cache_size)(self._load_rule_uncached)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Commits the pending writes and closes the file
+        """
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def commit(self):
+        """
+        Makes the versions stored so far durable; put_version does not commit on its own, so many versions may be
+        written in one transaction
+        """
+        with self._lock:
+            self._connection.commit()
+
+    def put_version(self, policy_id, version: dict) -> str:
+        """
+        Stores the policy version (replacing the one with the same number, if it is stored already)
+        @param policy_id: the policy of the version
+        @param version: the policy version as provided by get_policy_version (with 'version' & 'matchRules')
+        @return: hash of the list of its match rules, None if the version has no rules
+        """
+        metadata = {key: value for key, value in version.items() if key != "matchRules"}
+        rules = version.get("matchRules", None)
+        rule_list_hash = None
+        rule_fields = None
+        with self._lock:
+            if rules is not None:
+                rule_hashes = [self._put_rule(rule) for rule in rules]
+                encoded_hashes = encode(rule_hashes)
+                rule_list_hash = hashlib.sha256(encoded_hashes).hexdigest()
+                self._connection.execute("INSERT OR IGNORE INTO rule_lists (hash, rule_hashes) VALUES (?, ?)",
+                                         (rule_list_hash, encoded_hashes))
+                assigned_fields = [{key: rule[key] for key in IGNORED_RULE_FIELDS if key in rule} for rule in rules]
+                if any(assigned_fields):
+                    rule_fields = encode(assigned_fields)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO versions (policy_id, version, metadata, rule_list_hash, rule_fields, "
+                "immutable) VALUES (?, ?, ?, ?, ?, ?)",
+                (str(policy_id), int(version["version"]), encode(metadata), rule_list_hash, rule_fields,
+                 1 if version.get("immutable", False) else 0))
+        return rule_list_hash
+
+    def _put_rule(self, rule: dict) -> str:
+        rule_hash = get_rule_fingerprint(rule)
+        content = {key: value for key, value in rule.items() if key not in IGNORED_RULE_FIELDS}
+        self._connection.execute("INSERT OR IGNORE INTO rules (hash, body) VALUES (?, ?)", (rule_hash, encode(content)))
+        return rule_hash
+
+    def has_version(self, policy_id, version, immutable_only: bool = False) -> bool:
+        """
+        @param immutable_only: whether to count only the versions that can't change anymore and are stored with
+        their match rules (a snapshot exported without the rules stores just the metadata)
+        @return: True if the version is stored
+        """
+        query = "SELECT immutable, rule_list_hash FROM versions WHERE policy_id = ? AND version = ?"
+        row = self._query_one(query, (str(policy_id), int(version)))
+        return row is not None and (not immutable_only or (row[0] == 1 and row[1] is not None))
+
+    def list_policies(self) -> list:
+        """
+        @return: sorted list of the ids of the policies with any version stored
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT DISTINCT policy_id FROM versions ORDER BY policy_id").fetchall()
+        return [row[0] for row in rows]
+
+    def list_versions(self, policy_id) -> list:
+        """
+        @return: sorted list of the stored version numbers of the policy
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT version FROM versions WHERE policy_id = ? ORDER BY version",
+                                            (str(policy_id),)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_metadata(self, policy_id, version):
+        """
+        @return: the version without its match rules, None if it is not stored
+        """
+        row = self._query_one("SELECT metadata FROM versions WHERE policy_id = ? AND version = ?",
+                              (str(policy_id), int(version)))
+        return decode(row[0]) if row is not None else None
+
+    def iter_match_rules(self, policy_id, version):
+        """
+        Reconstructs the match rules of the version one by one
+        @return: generator of the match rules, empty if the version is not stored or has no rules
+        """
+        row = self._query_one("SELECT rule_list_hash, rule_fields FROM versions WHERE policy_id = ? AND version = ?",
+                              (str(policy_id), int(version)))
+        if row is None or row[0] is None:
+            return
+        rule_hashes = self._load_rule_list(row[0])
+        rule_fields = decode(row[1]) if row[1] is not None else [{}] * len(rule_hashes)
+        for rule_hash, assigned_fields in zip(rule_hashes, rule_fields):
+            # the cache holds the encoded rules, so every caller gets its own copy to modify
+            yield {**assigned_fields, **json.loads(self._load_rule(rule_hash))}
+
+    def get_version(self, policy_id, version):
+        """
+        @return: the version as it was stored (as provided by get_policy_version), None if it is not stored
+        """
+        metadata = self.get_metadata(policy_id, version)
+        if metadata is None:
+            return None
+        row = self._query_one("SELECT rule_list_hash FROM versions WHERE policy_id = ? AND version = ?",
+                              (str(policy_id), int(version)))
+        if row[0] is not None:
+            metadata["matchRules"] = list(self.iter_match_rules(policy_id, version))
+        return metadata
+
+    def stats(self) -> dict:
+        """
+        @return: dict with the numbers of the stored versions, distinct rule lists, distinct rules, all the rule
+        references and the stored bytes of the rules
+        """
+        with self._lock:
+            versions = self._connection.execute("SELECT COUNT(*) FROM versions").fetchone()[0]
+            rule_lists = self._connection.execute("SELECT COUNT(*) FROM rule_lists").fetchone()[0]
+            rules, rule_bytes = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM rules").fetchone()
+            list_rows = self._connection.execute(
+                "SELECT rule_lists.rule_hashes FROM versions JOIN rule_lists ON rule_list_hash = rule_lists.hash"
+            ).fetchall()
+        return {
+            "versions": versions,
+            "rule_lists": rule_lists,
+            "rules": rules,
+            "rule_references": sum(len(decode(row[0])) for row in list_rows),
+            "rule_bytes": rule_bytes
+        }
+
+    def _load_rule_uncached(self, rule_hash: str) -> bytes:
+        row = self._query_one("SELECT body FROM rules WHERE hash = ?", (rule_hash,))
+        return zlib.decompress(row[0])
+
+    def _load_rule_list(self, rule_list_hash: str) -> list:
+        row = self._query_one("SELECT rule_hashes FROM rule_lists WHERE hash = ?", (rule_list_hash,))
+        return decode(row[0])
+
+    def _query_one(self, query: str, parameters: tuple):
+        with self._lock:
+            return self._connection.execute(query, parameters).fetchone()
+
+
+def encode(value) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def decode(data: bytes):
+    return json.loads(zlib.decompress(data))
+
+
+def archive_versions(store: VersionStore,
+                     edgerc_location: str = akamai_project_constants.DEFAULT_EDGERC_LOCATION,
+                     client: http_requests.AkamaiClient = None,
+                     max_workers: int = akamai_project_constants.DEFAULT_MAX_CONCURRENCY,
+                     policy_ids=None) -> dict:
+    """
+    Downloads the versions of the policies (with their match rules) into the store. The immutable versions already
+    stored are not downloaded again, so repeated runs fetch just the new and the still editable versions.
+    @param store: VersionStore to write into
+    @param edgerc_location: is the location of EdgeRC file that we use to extract the authentication credentials for
+     your API user
+    @param client: an existing AkamaiClient to reuse, if not provided, the default client of the credentials file
+    is used
+    @param max_workers: how many requests are sent to Akamai at the same time
+    @param policy_ids: the policies to archive, all the shared policies of the account if not provided
+    @return: dict with the numbers of the listed policies, fetched & skipped versions, the errors and the duration
+    """
+    akamai_client = http_requests.get_client(edgerc_location, client)
+    started_at = time.monotonic()
+    result = {"policies": 0, "versions_fetched": 0, "versions_skipped": 0, "errors": []}
+    if policy_ids is None:
+        policy_ids = (policy["id"] for policy in api.iter_shared_policies(client=akamai_client))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="akamai-archive") as executor:
+        pending = set()
+        for policy_id in policy_ids:
+            result["policies"] += 1
+            pending.add(executor.submit(snapshot.fetch_versions, akamai_client, policy_id))
+            while len(pending) >= max_workers * 2:
+                pending = handle_completed(store, executor, akamai_client, pending, result)
+        while len(pending) > 0:
+            pending = handle_completed(store, executor, akamai_client, pending, result)
+    store.commit()
+    result["duration"] = round(time.monotonic() - started_at, 3)
+    return result
+
+
+def handle_completed(store: VersionStore, executor, client: http_requests.AkamaiClient, pending: set,
+                     result: dict) -> set:
+    """
+    Waits for some of the pending tasks, stores the fetched versions and submits the downloads of the listed ones
+    @return: the tasks still pending
+    """
+    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        task, policy_id, payload, error, _ = future.result()
+        if error is not None:
+            result["errors"].append({"task": task, "policyId": policy_id, "error": error})
+        elif task == "list_versions":
+            for version in payload:
+                if store.has_version(policy_id, version["version"], immutable_only=True):
+                    result["versions_skipped"] += 1
+                else:
+                    pending.add(executor.submit(snapshot.fetch_version, client, policy_id, version["version"]))
+        else:
+            store.put_version(policy_id, payload)
+            result["versions_fetched"] += 1
+            if result["versions_fetched"] % COMMIT_INTERVAL == 0:
+                store.commit()
+    return pending
+
+
+def import_snapshot(store: VersionStore, snapshot_file: str, compression: str = None) -> int:
+    """
+    Stores the versions (with their match rules) of the snapshot created by snapshot.export_snapshot
+    @return: number of the imported versions
+    """
+    imported = 0
+    for record in snapshot.iter_snapshot(snapshot_file, compression):
+        if record.get("type") == "version" and record.get("data") is not None:
+            store.put_version(record["policyId"], record["data"])
+            imported += 1
+            if imported % COMMIT_INTERVAL == 0:
+                store.commit()
+    store.commit()
+    return imported
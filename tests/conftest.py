@@ -0,0 +1,66 @@
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_akamai_host, get_sample_json
+import src.akamai_shared_cloudlets.http_requests as http_requests
+
+
+@pytest.fixture(autouse=True)
+def default_clients():
+    """
+    Closes the default clients after every test, so nothing they keep (such as the latest policy versions) leaks
+    into the next one
+    """
+    yield
+    http_requests.close_default_clients()
+
+
+@pytest.fixture()
+def test_edgerc_file():
+    """
+    Provides the location of the 'sample' edgerc file @return: a String representing the location of edgerc file that
+    can be used for testing purposes (it contains no real credentials values to Akamai APIs)
+    """
+    return test_common.get_sample_edgerc()
+
+
+@pytest.fixture()
+def api_destination(test_edgerc_file):
+    """
+    Provides the akamai host from the 'sample' edgerc file
+    @return: a String representing the Akamai hostname obtained from the credentials file
+    """
+    return get_akamai_host(test_edgerc_file)
+
+
+@pytest.fixture()
+def client(test_edgerc_file):
+    """
+    Provides the AkamaiClient built from the 'sample' edgerc file
+    @return: an instance of AkamaiClient that is closed once the test finishes
+    """
+    with http_requests.AkamaiClient(test_edgerc_file) as akamai_client:
+        yield akamai_client
+
+
+@pytest.fixture()
+def account(requests_mock, api_destination):
+    """
+    Mocks an account of two shared policies (1001 with versions 1 & 2, 1002 with version 1) and all their versions
+    @return: url of the policy listing
+    """
+    url = f"https://{api_destination}/cloudlets/v3/policies"
+    requests_mock.get(url, json={
+        "content": [{"id": 1001, "name": "first"}, {"id": 1002, "name": "second"}],
+        "page": {"number": 0, "size": 1000, "totalElements": 2, "totalPages": 1}
+    })
+    for policy_id, versions in ((1001, [2, 1]), (1002, [1])):
+        requests_mock.get(f"{url}/{policy_id}/versions", json={
+            "content": [{"policyId": policy_id, "version": version} for version in versions],
+            "page": {"number": 0, "size": 1000, "totalElements": len(versions), "totalPages": 1}
+        })
+        for version in versions:
+            policy_version = get_sample_json("get_policy_version")
+            policy_version.update({"policyId": policy_id, "version": version})
+            requests_mock.get(f"{url}/{policy_id}/versions/{version}", json=policy_version)
+    return url
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from . import common_test_func as test_common
+from src.akamai_shared_cloudlets.activation_tracker import ActivationTracker
+
+
+@pytest.fixture()
+def tracker():
+    with ActivationTracker(test_common.get_sample_edgerc(), initial_interval=0.01, max_interval=0.05) as tracker:
+        yield tracker
+
+
+def activation(policy_id: int, activation_id: int, status: str):
+    return {"policyId": policy_id, "id": activation_id, "status": status}
+
+
+def test_wait_for_activations(requests_mock, api_destination, tracker):
+    url = f"https://{api_destination}/cloudlets/v3/policies"
+    requests_mock.get(f"{url}/1001/activations/1", [
+        {"json": activation(1001, 1, "IN_PROGRESS")},
+        {"status_code": 500},
+        {"json": activation(1001, 1, "SUCCESS")},
+    ])
+    requests_mock.get(f"{url}/1002/activations/2", json=activation(1002, 2, "FAILED"))
+    tracker.track(1001, 1)
+    tracker.track(1002, 2)
+    tracker.track(1002, 2)
+    events = tracker.wait(timeout=5)
+    assert sorted((event.policy_id, event.status) for event in events) == [("1001", "SUCCESS"), ("1002", "FAILED")]
+    assert tracker.pending_count() == 0
+    assert requests_mock.call_count == 4
+
+
+def test_activations_of_one_policy_share_the_poll(requests_mock, api_destination, tracker):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001/activations", json={
+        "content": [activation(1001, 2, "SUCCESS"), activation(1001, 1, "SUCCESS")]
+    })
+    tracker.track(1001, 1)
+    tracker.track(1001, 2)
+    events = list(tracker.events(timeout=5))
+    assert sorted(event.activation_id for event in events) == ["1", "2"]
+    assert requests_mock.call_count == 1
+
+
+def test_finished_activation_is_reported_without_poll(requests_mock, tracker):
+    tracker.track_activation(activation(1001, 1, "SUCCESS"))
+    assert [event.status for event in tracker.wait(timeout=1)] == ["SUCCESS"]
+    assert requests_mock.call_count == 0
+
+
+def test_wait_times_out(requests_mock, api_destination, tracker):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001/activations/1",
+                      json=activation(1001, 1, "IN_PROGRESS"))
+    tracker.track(1001, 1)
+    assert tracker.wait(timeout=0.1) == []
+    assert tracker.pending_count() == 1
+
+
+def test_activation_not_found_fails_after_max_polls(requests_mock, api_destination, capsys):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001/activations/1", status_code=404)
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1002/activations/2", exc=ConnectionError)
+    with ActivationTracker(test_common.get_sample_edgerc(), initial_interval=0.01, max_interval=0.01,
+                           max_unknown_polls=3) as tracker:
+        tracker.track(1001, 1)
+        tracker.track(1002, 2)
+        events = sorted(tracker.wait(timeout=5))
+    assert [(event.policy_id, event.status) for event in events] == [("1001", "FAILED"), ("1002", "FAILED")]
+    assert events[0].activation is None
+    assert events[0].error.startswith("State unknown after 3 polls")
+    assert "Unable to check the activations of policy 1002" in events[1].error
+    assert requests_mock.call_count == 6
+    assert capsys.readouterr().out == ""
+
+
+def test_closed_tracker_stops_waiting(requests_mock, api_destination, tracker):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001/activations/1",
+                      json=activation(1001, 1, "IN_PROGRESS"))
+    tracker.track(1001, 1)
+    threading.Timer(0.05, tracker.close).start()
+    assert tracker.wait() == []
+    assert list(tracker.events()) == []
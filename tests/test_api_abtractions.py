@@ -1,10 +1,10 @@
 import json
 import os
-from . import common_test_func as test_common
 from os import path
 import pytest
 from akamai.edgegrid import EdgeRc
 import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+import src.akamai_shared_cloudlets.http_requests as http_requests
 
 
 def get_request_loc():
@@ -41,30 +41,21 @@ def get_akamai_host(edgerc_path):
 #     return AkamaiApiRequestsAbstractions(test_common.get_sample_edgerc())
 
 
-@pytest.fixture()
-def api_destination():
-    """
-    Provides the akamai host from the 'sample' edgerc file
-    @return: a String representing the Akamai hostname obtained from the credentials file
-    """
-    return get_akamai_host(test_common.get_sample_edgerc())
-
-
-@pytest.fixture()
-def test_edgerc_file():
-    """
-    Provides the location of the 'sample' edgerc file @return: a String representing the location of edgerc file that
-    can be used for testing purposes (it contains no real credentials values to Akamai APIs)
-    """
-    return test_common.get_sample_edgerc()
-
-
 def test_list_shared_policies(requests_mock, test_edgerc_file, api_destination):
     requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies", json=get_sample_json("list_shared_policies"))
     response = api.list_shared_policies(test_edgerc_file)
     assert response is not None
 
 
+def test_list_shared_policies_with_client(requests_mock, test_edgerc_file, api_destination, client):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies", json=get_sample_json("list_shared_policies"))
+    response = api.list_shared_policies(test_edgerc_file, client)
+    assert response is not None
+    response = api.get_shared_policy_by_name("static_assets_redirector", client=client)
+    assert response.get("static_assets_redirector") == 1001
+    assert requests_mock.call_count == 2
+
+
 def test_list_shared_policies_negative(requests_mock, test_edgerc_file, api_destination):
     requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies", status_code=404)
     response = api.list_shared_policies(test_edgerc_file)
@@ -130,6 +121,13 @@ def test_get_latest_policy(requests_mock, test_edgerc_file, api_destination):
                       json=get_sample_json('list_policy_versions'))
     response = api.get_latest_policy(policy_id, test_edgerc_file)
     assert response["description"] == "Initial version"
+    assert requests_mock.last_request.qs == {"page": ["0"], "size": ["10"]}
+
+
+def test_get_latest_policy_without_versions(requests_mock, test_edgerc_file, api_destination):
+    policy_id = "1001"
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/{policy_id}/versions", json={"content": []})
+    assert api.get_latest_policy(policy_id, test_edgerc_file) is None
 
 
 def test_get_latest_policy_negative_response(requests_mock, test_edgerc_file, api_destination):
@@ -148,6 +146,30 @@ def test_get_latest_policy_version(requests_mock, test_edgerc_file, api_destinat
     assert response == 1
 
 
+def test_latest_policy_version_is_kept_until_the_policy_changes(requests_mock, client, api_destination):
+    url = f"https://{api_destination}/cloudlets/v3/policies"
+    versions = requests_mock.get(f"{url}/1001/versions", json=get_sample_json("list_policy_versions"))
+    requests_mock.post(f"{url}/10010/versions", status_code=201, json={})
+    requests_mock.post(f"{url}/1001/versions", status_code=201, json={})
+    assert api.get_latest_policy_version("1001", client=client) == 1
+    assert api.get_latest_policy_version("1001", client=client) == 1
+    client.post("/cloudlets/v3/policies/10010/versions", {})
+    assert api.get_latest_policy_version("1001", client=client) == 1
+    assert versions.call_count == 1
+    client.post("/cloudlets/v3/policies/1001/versions", {})
+    assert api.get_latest_policy_version("1001", client=client) == 1
+    assert versions.call_count == 2
+
+
+def test_latest_policy_version_expires(requests_mock, test_edgerc_file, api_destination):
+    versions = requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001/versions",
+                                 json=get_sample_json("list_policy_versions"))
+    with http_requests.AkamaiClient(test_edgerc_file, latest_version_ttl=0) as akamai_client:
+        api.get_latest_policy("1001", client=akamai_client)
+        api.get_latest_policy("1001", client=akamai_client)
+    assert versions.call_count == 2
+
+
 def test_get_latest_policy_version_negative_response(requests_mock, test_edgerc_file, api_destination):
     policy_id = "1001"
     requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/{policy_id}/versions",
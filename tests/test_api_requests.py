@@ -30,6 +30,34 @@ class TestAkamaiRequestWrapper(unittest.TestCase):
         access_token = signed_session.auth.ah.access_token
         self.assertTrue(access_token, "akab-dummy-dummy-dummy-dummy")
 
+    def test_client_owns_signed_session(self):
+        edgerc_location = test_common.get_sample_edgerc()
+        client = AkamaiClient(edgerc_location)
+        self.assertEqual(client.base_url, "https://dummy.luna.akamaiapis.net")
+        self.assertEqual(client.session.auth.ah.access_token, "akab-aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")
+        client.close()
+
+    def test_client_pool_settings(self):
+        edgerc_location = test_common.get_sample_edgerc()
+        with AkamaiClient(edgerc_location, pool_connections=2, pool_maxsize=32, keep_alive=False) as client:
+            adapter = client.session.get_adapter(client.base_url)
+            self.assertEqual(adapter._pool_maxsize, 32)
+            self.assertEqual(adapter._pool_connections, 2)
+            self.assertEqual(client.session.headers["connection"], "close")
+
+    def test_get_client_reuses_provided_client(self):
+        edgerc_location = test_common.get_sample_edgerc()
+        client = AkamaiClient(edgerc_location)
+        self.assertIs(get_client(edgerc_location, client), client)
+        self.assertIsNot(get_client(edgerc_location), client)
+
+    def test_get_client_reuses_default_client(self):
+        edgerc_location = test_common.get_sample_edgerc()
+        default_client = get_client(edgerc_location)
+        self.assertIs(get_client(edgerc_location), default_client)
+        close_default_clients()
+        self.assertIsNot(get_client(edgerc_location), default_client)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from .test_api_abtractions import get_sample_json
+import src.akamai_shared_cloudlets.async_api_requests_abstractions as async_api
+import src.akamai_shared_cloudlets.http_requests as http_requests
+
+
+def test_gather_policies(requests_mock, test_edgerc_file, api_destination):
+    for policy_id in range(5):
+        requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/{policy_id}",
+                          json={"id": policy_id})
+
+    async def fan_out():
+        async with async_api.AsyncAkamaiClient(test_edgerc_file, max_concurrency=2) as client:
+            return await asyncio.gather(*[async_api.get_policy_by_id(str(i), client) for i in range(5)])
+
+    responses = asyncio.run(fan_out())
+    assert [response["id"] for response in responses] == list(range(5))
+    assert requests_mock.call_count == 5
+
+
+def test_list_and_delete(requests_mock, test_edgerc_file, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies", json=get_sample_json("list_shared_policies"))
+    requests_mock.delete(f"https://{api_destination}/cloudlets/v3/policies/1001", status_code=204)
+
+    async def run():
+        async with async_api.AsyncAkamaiClient(test_edgerc_file) as client:
+            policies = await async_api.list_shared_policies(client)
+            deleted = await async_api.delete_shared_policy("1001", client)
+            return policies, deleted
+
+    policies, deleted = asyncio.run(run())
+    assert policies["content"][0]["id"] == 1001
+    assert deleted == "Policy was deleted successfully"
+
+
+def test_activate_policy(requests_mock, test_edgerc_file, api_destination):
+    requests_mock.post(f"https://{api_destination}/cloudlets/v3/policies/1001/activations",
+                       json=get_sample_json("activate_policy"), status_code=202)
+
+    async def run():
+        async with async_api.AsyncAkamaiClient(test_edgerc_file) as client:
+            return await async_api.activate_policy("1001", "staging", "activation", "1", client)
+
+    assert asyncio.run(run()) is True
+
+
+def test_invalid_concurrency(test_edgerc_file):
+    with pytest.raises(ValueError):
+        async_api.AsyncAkamaiClient(test_edgerc_file, max_concurrency=0)
+
+
+def test_provided_client_is_not_closed(requests_mock, test_edgerc_file, api_destination, mocker):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json={"id": 1001})
+    akamai_client = http_requests.AkamaiClient(test_edgerc_file)
+    close = mocker.spy(akamai_client, "close")
+
+    async def run():
+        async with async_api.AsyncAkamaiClient(client=akamai_client) as client:
+            return await async_api.get_policy_by_id("1001", client)
+
+    assert asyncio.run(run()) == {"id": 1001}
+    assert close.call_count == 0
+    akamai_client.close()
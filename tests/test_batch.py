@@ -0,0 +1,152 @@
+import json
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_sample_json
+from src.akamai_shared_cloudlets import batch
+from src.akamai_shared_cloudlets import bulk_activation
+from src.akamai_shared_cloudlets.commands import activations
+from src.akamai_shared_cloudlets.commands import policies
+from src.akamai_shared_cloudlets.policy_index import PolicyNameIndex
+
+
+@pytest.fixture()
+def name_index():
+    return PolicyNameIndex(lambda: [{"name": "static_assets_redirector", "id": 1001},
+                                    {"name": "api_redirector", "id": 1002},
+                                    {"name": "api_redirector_v2", "id": 1003}])
+
+
+def test_read_batch_input():
+    assert list(batch.read_batch_input(["1001\n", "\n", "# comment\n", "  1002  \n"])) == ["1001", "1002"]
+
+
+def test_iter_batch_yields_in_completion_order():
+    release = threading.Event()
+
+    def operation(item):
+        if item == "slow":
+            release.wait(timeout=5)
+        return item.upper(), None
+
+    results = batch.iter_batch(operation, ["slow", "fast"], max_workers=2)
+    first = next(results)
+    release.set()
+    second = next(results)
+    assert (first.input, first.result) == ("fast", "FAST")
+    assert (second.input, second.result) == ("slow", "SLOW")
+
+
+def test_iter_batch_reports_failures():
+    def operation(item):
+        if item == "broken":
+            raise ValueError("no way")
+        return item, None
+
+    results = {result.input: result for result in batch.iter_batch(operation, ["fine", "broken"] * 20, max_workers=3)}
+    assert results["fine"].ok
+    assert not results["broken"].ok
+    assert results["broken"].error == "no way"
+
+
+def test_find_policies_by_id(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json=get_sample_json("get_a_policy"))
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1002", status_code=404)
+    results = {result.input: result for result in batch.find_policies_by_id(["1001", "1002"],
+                                                                            test_common.get_sample_edgerc())}
+    assert results["1001"].ok
+    assert results["1001"].result == get_sample_json("get_a_policy")
+    assert results["1002"].error == "Could not find any policy with ID 1002"
+
+
+def test_find_policies_by_name_uses_one_index(requests_mock, name_index):
+    names = ["static_assets_redirector", "api_redirector", "nothing"]
+    results = {result.input: result for result in batch.find_policies_by_name(names, test_common.get_sample_edgerc(),
+                                                                              index=name_index)}
+    assert results["static_assets_redirector"].result == {"static_assets_redirector": 1001}
+    assert results["api_redirector"].result == {"api_redirector": 1002}
+    assert not results["nothing"].ok
+    assert requests_mock.call_count == 0
+
+
+def test_delete_policies_by_name(requests_mock, api_destination, name_index):
+    requests_mock.delete(f"https://{api_destination}/cloudlets/v3/policies/1001", status_code=204)
+    requests_mock.delete(f"https://{api_destination}/cloudlets/v3/policies/1002", status_code=403)
+    results = {result.input: result for result in batch.delete_policies_by_name(
+        ["static_assets_redirector", "api_redirector", "api"], test_common.get_sample_edgerc(), index=name_index)}
+    assert results["static_assets_redirector"].ok
+    assert results["api_redirector"].error == "No permissions to delete policy with id '1002'"
+    assert not results["api"].ok
+    assert requests_mock.call_count == 2
+
+
+def test_to_json_line():
+    line = batch.to_json_line(batch.BatchResult("1001", True, {"id": 1001}, None, 0.0123))
+    assert json.loads(line) == {"input": "1001", "ok": True, "result": {"id": 1001}, "error": None,
+                                "duration_ms": 12.3}
+
+
+def test_cli_find_policy_by_id_batch(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json=get_sample_json("get_a_policy"))
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1002", json=get_sample_json("get_a_policy"))
+    result = CliRunner().invoke(policies.find_policy_by_id, ["--batch", "-", "--edgerc-location",
+                                                             test_common.get_sample_edgerc()], input="1001\n1002\n")
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert sorted(record["input"] for record in records) == ["1001", "1002"]
+    assert all(record["ok"] for record in records)
+
+
+def test_cli_find_policy_by_id_batch_fails_on_errors(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", status_code=404)
+    result = CliRunner().invoke(policies.find_policy_by_id, ["--batch", "-", "--edgerc-location",
+                                                             test_common.get_sample_edgerc()], input="1001\n")
+    assert result.exit_code == 1
+    assert json.loads(result.stdout)["ok"] is False
+
+
+def test_cli_find_policy_by_name_reports_missing_policy(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies", status_code=403)
+    result = CliRunner().invoke(policies.find_policy_by_name, ["missing", "--edgerc-location",
+                                                               test_common.get_sample_edgerc()])
+    assert result.exit_code == 0, result.output
+    assert "We found no policy matching the name missing" in result.stdout
+
+
+def test_cli_requires_argument_or_batch():
+    result = CliRunner().invoke(policies.find_policy_by_name, ["--edgerc-location", test_common.get_sample_edgerc()])
+    assert result.exit_code == 2
+
+
+def test_cli_delete_policies(requests_mock, api_destination):
+    requests_mock.delete(f"https://{api_destination}/cloudlets/v3/policies/1001", status_code=204)
+    result = CliRunner().invoke(policies.delete_policies, ["-", "--edgerc-location", test_common.get_sample_edgerc()],
+                                input="1001\n")
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["result"]["policy_id"] == "1001"
+
+
+def test_cli_activate_policies_from_stdin(requests_mock, api_destination):
+    requests_mock.post(f"https://{api_destination}/cloudlets/v3/policies/1001/activations",
+                       json=get_sample_json("activate_policy"), status_code=202)
+    result = CliRunner().invoke(activations.activate_policies, ["-", "--ndjson", "--edgerc-location",
+                                                                test_common.get_sample_edgerc()],
+                                input="1001,3,staging\n")
+    assert result.exit_code == 0, result.output
+    record = json.loads(result.stdout)
+    assert record["ok"]
+    assert record["input"] == bulk_activation.ActivationRequest("1001", "3", "staging", "activation")._asdict()
+
+
+def test_cli_activate_policies_fails_on_rejected_activation(requests_mock, api_destination):
+    requests_mock.post(f"https://{api_destination}/cloudlets/v3/policies/1001/activations",
+                       json=get_sample_json("activate_policy"), status_code=202)
+    requests_mock.post(f"https://{api_destination}/cloudlets/v3/policies/1002/activations", status_code=403)
+    result = CliRunner().invoke(activations.activate_policies, ["-", "--edgerc-location",
+                                                                test_common.get_sample_edgerc()],
+                                input="1001,3,staging\n1002,1,staging\n")
+    assert result.exit_code == 1
+    assert "1 of 2 activations accepted, 1 failed" in result.stdout
@@ -0,0 +1,76 @@
+import json
+import re
+
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_sample_json
+from src.akamai_shared_cloudlets import bulk_activation
+from src.akamai_shared_cloudlets.bulk_activation import ActivationRequest
+from src.akamai_shared_cloudlets.throttling import TokenBucket
+
+
+def test_load_csv_requests(tmp_path):
+    requests_file = tmp_path / "activations.csv"
+    requests_file.write_text("policy_id,policy_version,network,operation\n"
+                             "1001,3,staging,activation\n"
+                             "1002,1,production\n")
+    assert bulk_activation.load_activation_requests(str(requests_file)) == [
+        ActivationRequest("1001", "3", "staging", "activation"),
+        ActivationRequest("1002", "1", "production", "activation"),
+    ]
+
+
+def test_load_json_requests(tmp_path):
+    requests_file = tmp_path / "activations.json"
+    requests_file.write_text(json.dumps([{"policy_id": 1001, "policy_version": 3, "network": "staging",
+                                          "operation": "deactivation"}]))
+    assert bulk_activation.load_activation_requests(str(requests_file)) == [
+        ActivationRequest("1001", "3", "staging", "deactivation")
+    ]
+
+
+def test_activate_policies_report(requests_mock, api_destination):
+    for policy_id, status_code in [(1001, 202), (1002, 202), (1003, 403)]:
+        requests_mock.post(f"https://{api_destination}/cloudlets/v3/policies/{policy_id}/activations",
+                           json=get_sample_json("activate_policy"), status_code=status_code)
+    streamed = []
+    activation_requests = [
+        ("1001", "1", "staging", "activation"),
+        ("1002", "1", "production", "activation"),
+        ("1003", "1", "staging", "activation"),
+        ("1004", "1", "nowhere", "activation"),
+    ]
+    report = bulk_activation.activate_policies(activation_requests, test_common.get_sample_edgerc(), max_workers=3,
+                                               on_result=streamed.append)
+    assert len(streamed) == 4
+    assert sorted(result.request.policy_id for result in report.succeeded) == ["1001", "1002"]
+    assert sorted(result.request.policy_id for result in report.failed) == ["1003", "1004"]
+    assert report.succeeded[0].activation["id"] == 300001
+    assert report.summary()["failed"] == 2
+    assert requests_mock.call_count == 3
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, capacity=1)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() > 0
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_activations_are_submitted_through_bounded_window(requests_mock, api_destination):
+    requests_mock.post(re.compile(f"https://{api_destination}/cloudlets/v3/policies/\\d+/activations"),
+                       json=get_sample_json("activate_policy"), status_code=202)
+    taken = []
+
+    def activation_requests():
+        for policy_id in range(1000, 1050):
+            taken.append(policy_id)
+            yield str(policy_id), "1", "staging", "activation"
+
+    results = bulk_activation.iter_activations(activation_requests(), test_common.get_sample_edgerc(), max_workers=2)
+    next(results)
+    assert len(taken) <= 4
+    assert len(list(results)) == 49
+
@@ -0,0 +1,131 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from . import common_test_func as test_common
+from src.akamai_shared_cloudlets import bulk_migration
+from src.akamai_shared_cloudlets.bulk_migration import MigrationRequest
+from src.akamai_shared_cloudlets.commands import migrations
+from src.akamai_shared_cloudlets.policy_index import PolicyNameIndex
+
+
+@pytest.fixture()
+def name_index():
+    return PolicyNameIndex(lambda: [{"name": "already_shared", "id": 5001}])
+
+
+def mock_clones(requests_mock, api_destination, results: dict):
+    for policy_id, (status_code, new_policy_id) in results.items():
+        requests_mock.post(f"https://{api_destination}/cloudlets/v3/policies/{policy_id}/clone",
+                           json={"id": new_policy_id}, status_code=status_code)
+
+
+def test_load_csv_requests(tmp_path):
+    mapping_file = tmp_path / "mapping.csv"
+    mapping_file.write_text("policy_id,new_name,group_id,additional_versions\n"
+                            "1001,first_shared,42,3;4\n"
+                            "1002,second_shared,42\n")
+    assert bulk_migration.load_migration_requests(str(mapping_file)) == [
+        MigrationRequest("1001", "first_shared", "42", [3, 4]),
+        MigrationRequest("1002", "second_shared", "42", []),
+    ]
+
+
+def test_load_json_requests(tmp_path):
+    mapping_file = tmp_path / "mapping.json"
+    mapping_file.write_text(json.dumps([{"policy_id": 1001, "new_name": "first_shared", "group_id": 42,
+                                         "additional_versions": [2]}]))
+    assert bulk_migration.load_migration_requests(str(mapping_file)) == [
+        MigrationRequest("1001", "first_shared", "42", [2])
+    ]
+
+
+def test_load_requests_without_group(tmp_path):
+    mapping_file = tmp_path / "mapping.csv"
+    mapping_file.write_text("1001,first_shared\n")
+    with pytest.raises(Exception, match="group id"):
+        bulk_migration.load_migration_requests(str(mapping_file))
+
+
+def test_migrate_policies_report(requests_mock, api_destination, name_index, tmp_path):
+    mock_clones(requests_mock, api_destination, {1001: (200, 6001), 1002: (200, 6002), 1003: (403, None)})
+    journal_file = str(tmp_path / "migration.journal")
+    migration_requests = [
+        ("1001", "first_shared", "42", [3]),
+        ("1002", "second_shared", "42", []),
+        ("1003", "forbidden_shared", "42", []),
+        ("1004", "already_shared", "42", []),
+    ]
+    results = list(bulk_migration.iter_migrations(migration_requests, journal_file, test_common.get_sample_edgerc(),
+                                                  max_workers=2, index=name_index))
+    by_policy = {result.request.policy_id: result for result in results}
+    assert by_policy["1001"].status == bulk_migration.MIGRATED
+    assert by_policy["1001"].new_policy_id == 6001
+    assert by_policy["1003"].status == bulk_migration.FAILED
+    assert by_policy["1004"].status == bulk_migration.EXISTING
+    assert by_policy["1004"].new_policy_id == 5001
+    assert all(result.duration >= 0 and not result.resumed for result in results)
+    assert requests_mock.call_count == 3
+    assert requests_mock.request_history[0].json()["additionalVersions"] in ([3], [])
+    entries = bulk_migration.load_journal(journal_file)
+    assert entries["1001"]["status"] == bulk_migration.MIGRATED
+    assert entries["1003"]["status"] == bulk_migration.FAILED
+
+
+def test_resumed_migration_does_not_clone_again(requests_mock, api_destination, tmp_path):
+    mock_clones(requests_mock, api_destination, {1001: (200, 6001), 1002: (500, None)})
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies", json={"content": [], "links": []})
+    journal_file = str(tmp_path / "migration.journal")
+    migration_requests = [("1001", "first_shared", "42", []), ("1002", "second_shared", "42", [])]
+    report = bulk_migration.migrate_policies(migration_requests, journal_file, test_common.get_sample_edgerc(),
+                                             max_workers=2)
+    assert report.summary()["failed"] == 1
+
+    mock_clones(requests_mock, api_destination, {1002: (200, 6002)})
+    requests_mock.reset_mock()
+    with open(journal_file, mode="a") as journal:
+        journal.write('{"policy_id": "1003", "stat')
+    report = bulk_migration.migrate_policies(migration_requests, journal_file, test_common.get_sample_edgerc(),
+                                             max_workers=2)
+    summary = report.summary()
+    assert (summary["migrated"], summary["failed"], summary["resumed"]) == (2, 0, 1)
+    clones = [request for request in requests_mock.request_history if request.method == "POST"]
+    assert [request.path for request in clones] == ["/cloudlets/v3/policies/1002/clone"]
+
+
+def test_interrupted_clone_is_found_by_name(requests_mock, api_destination, tmp_path):
+    journal_file = str(tmp_path / "migration.journal")
+    request = MigrationRequest("1001", "first_shared", "42", [])
+    with bulk_migration.MigrationJournal(journal_file) as journal:
+        journal.record(request, bulk_migration.STARTED)
+    index = PolicyNameIndex(lambda: [{"name": "first_shared", "id": 6001}])
+    results = list(bulk_migration.iter_migrations([request], journal_file, test_common.get_sample_edgerc(),
+                                                  index=index))
+    assert (results[0].status, results[0].new_policy_id) == (bulk_migration.MIGRATED, 6001)
+    assert requests_mock.call_count == 0
+
+
+def test_report_latencies():
+    report = bulk_migration.BulkMigrationReport()
+    request = MigrationRequest("1001", "first_shared", "42", [])
+    for duration in [0.1, 0.2, 0.3, 0.4]:
+        report.add(bulk_migration.MigrationResult(request, bulk_migration.MIGRATED, 6001, None, duration, False))
+    report.add(bulk_migration.MigrationResult(request, bulk_migration.MIGRATED, 6001, None, 0.0, True))
+    summary = report.summary()
+    assert summary["p50_latency"] == 0.25
+    assert summary["max_latency"] == 0.4
+    assert summary["resumed"] == 1
+
+
+def test_migrate_policies_command(requests_mock, api_destination, tmp_path):
+    mock_clones(requests_mock, api_destination, {1001: (200, 6001), 1002: (400, None)})
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies", json={"content": [], "links": []})
+    mapping_file = tmp_path / "mapping.csv"
+    mapping_file.write_text("1001,first_shared,42\n1002,second_shared,42\n")
+    result = CliRunner().invoke(migrations.migrate_policies,
+                                [str(mapping_file), "--edgerc-location", test_common.get_sample_edgerc(), "--ndjson"])
+    assert result.exit_code == 1
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    assert sorted((line["input"]["policy_id"], line["ok"]) for line in lines) == [("1001", True), ("1002", False)]
+    assert (tmp_path / "mapping.csv.journal").exists()
@@ -0,0 +1,117 @@
+import json
+import subprocess
+import sys
+
+import click
+from click.testing import CliRunner
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_akamai_host, get_sample_json
+from .test_pagination import policies_page
+from src.akamai_shared_cloudlets import shared
+import src.akamai_shared_cloudlets.__main__ as cli
+
+
+def test_help_does_not_import_the_commands():
+    script = "\n".join([
+        "import sys",
+        "from click.testing import CliRunner",
+        "import src.akamai_shared_cloudlets.__main__ as cli",
+        "result = CliRunner().invoke(cli.main, ['--help'])",
+        "assert result.exit_code == 0, result.output",
+        "print(','.join(sorted(name for name in sys.modules if name.split('.')[0] in ('requests', 'akamai')",
+        "                      or name.startswith('src.akamai_shared_cloudlets.'))))",
+    ])
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "src.akamai_shared_cloudlets.__main__"
+
+
+def test_help_lists_all_commands():
+    output = CliRunner().invoke(cli.main, ["--help"]).output
+    for command_name in cli.COMMANDS:
+        assert command_name in output
+
+
+def test_registered_help_matches_the_commands():
+    context = click.Context(cli.main)
+    for command_name, (_, _, help_text) in cli.COMMANDS.items():
+        assert cli.main.get_command(context, command_name).help.strip() == help_text
+
+
+def test_command_is_loaded_when_invoked(requests_mock):
+    api_destination = get_akamai_host(test_common.get_sample_edgerc())
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", json=get_sample_json("cloudlet_info"))
+    result = CliRunner().invoke(cli.main, ["list-cloudlets", "--edgerc-location", test_common.get_sample_edgerc()])
+    assert result.exit_code == 0, result.output
+    assert "EDGE_REDIRECTOR" in result.output
+
+
+def test_unknown_command():
+    result = CliRunner().invoke(cli.main, ["no-such-command"])
+    assert result.exit_code == 2
+
+
+def mock_policies(requests_mock, total_pages: int = 2):
+    url = f"https://{get_akamai_host(test_common.get_sample_edgerc())}/cloudlets/v3/policies"
+    for number in range(total_pages):
+        page = policies_page(number, total_pages)
+        page["content"][0]["currentActivations"] = {"staging": {"effective": {"policyVersion": number + 1}}}
+        requests_mock.get(f"{url}?page={number}&size=1000", json=page)
+
+
+def list_policies(*arguments):
+    return CliRunner().invoke(cli.main, ["list-policies", "--edgerc-location", test_common.get_sample_edgerc(),
+                                         *arguments])
+
+
+def test_list_policies_ndjson(requests_mock):
+    mock_policies(requests_mock)
+    result = list_policies("--response-format", "ndjson", "--fields", "id,name,currentActivations.staging.effective")
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {"id": 0, "name": "policy_0", "currentActivations.staging.effective": {"policyVersion": 1}},
+        {"id": 1, "name": "policy_1", "currentActivations.staging.effective": None},
+        {"id": 2, "name": "policy_2", "currentActivations.staging.effective": {"policyVersion": 2}},
+        {"id": 3, "name": "policy_3", "currentActivations.staging.effective": None},
+    ]
+
+
+def test_list_policies_compact(requests_mock):
+    mock_policies(requests_mock)
+    result = list_policies("--response-format", "compact", "--fields", "id")
+    assert result.exit_code == 0, result.output
+    assert result.stdout == '[{"id":0},{"id":1},{"id":2},{"id":3}]\n'
+
+
+def test_list_policies_tsv(requests_mock):
+    mock_policies(requests_mock, total_pages=1)
+    result = list_policies("--response-format", "tsv")
+    assert result.exit_code == 0, result.output
+    assert result.stdout == "id\tname\n0\tpolicy_0\n1\tpolicy_1\n"
+
+
+def test_list_policies_streaming_failure(requests_mock):
+    url = f"https://{get_akamai_host(test_common.get_sample_edgerc())}/cloudlets/v3/policies"
+    requests_mock.get(url, status_code=403)
+    result = list_policies("--response-format", "ndjson")
+    assert result.exit_code == 1
+    assert result.stdout == ""
+
+
+def test_formatted_output_is_lazy():
+    def policies():
+        yield {"id": 1, "name": "first"}
+        raise AssertionError("the first policy should be written before the next one is requested")
+
+    chunks = shared.iter_formatted_output(policies(), "compact")
+    assert next(chunks) == '[{"id":1,"name":"first"}'
+
+
+def test_empty_compact_output():
+    assert "".join(shared.iter_formatted_output([], "compact")) == "[]\n"
+
+
+def test_tsv_values_are_escaped():
+    assert shared.to_tsv_value("a\tb\nc") == "a\\tb\\nc"
+    assert shared.to_tsv_value({"a": [1]}) == '{"a":[1]}'
+    assert shared.to_tsv_value(None) == ""
@@ -0,0 +1,131 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_sample_json
+import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+from src.akamai_shared_cloudlets import instrumentation
+from src.akamai_shared_cloudlets.coalescing import RequestCoalescer
+from src.akamai_shared_cloudlets.http_requests import AkamaiClient
+
+WAITERS = 8
+
+
+@pytest.fixture()
+def coalescer():
+    return RequestCoalescer()
+
+
+def wait_for_collapsed(coalescer: RequestCoalescer, expected: int):
+    deadline = time.monotonic() + 5
+    while coalescer.stats()["collapsed"] < expected and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_identical_requests_share_one_response(coalescer):
+    calls = []
+
+    def send():
+        calls.append(1)
+        wait_for_collapsed(coalescer, WAITERS - 1)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=WAITERS) as executor:
+        results = list(executor.map(lambda _: coalescer.fetch("key", send), range(WAITERS)))
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert coalescer.stats() == {"sent": 1, "collapsed": WAITERS - 1, "in_flight": 0}
+
+
+def test_waiters_get_the_same_exception(coalescer):
+    def send():
+        wait_for_collapsed(coalescer, 1)
+        raise ValueError("Akamai is down")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(coalescer.fetch, "key", send) for _ in range(2)]
+    for future in futures:
+        with pytest.raises(ValueError, match="Akamai is down"):
+            future.result()
+    assert coalescer.fetch("key", lambda: "sent again") == "sent again"
+    assert coalescer.stats()["sent"] == 2
+
+
+def test_different_keys_are_not_collapsed(coalescer):
+    release = threading.Event()
+
+    def send():
+        release.wait(timeout=5)
+        return "response"
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(coalescer.fetch, key, send) for key in ("first", "second")]
+        release.set()
+    assert [future.result() for future in futures] == ["response", "response"]
+    assert coalescer.stats()["collapsed"] == 0
+
+
+def test_client_collapses_concurrent_gets(requests_mock, api_destination, coalescer):
+    def respond(request, context):
+        wait_for_collapsed(coalescer, WAITERS - 1)
+        return get_sample_json("get_a_policy")
+
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json=respond)
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1002", json=get_sample_json("get_a_policy"))
+    with AkamaiClient(test_common.get_sample_edgerc(), coalescer=coalescer) as client:
+        with ThreadPoolExecutor(max_workers=WAITERS) as executor:
+            policies = list(executor.map(lambda _: api.get_policy_by_id("1001", client=client), range(WAITERS)))
+        api.get_policy_by_id("1002", client=client)
+    assert requests_mock.call_count == 2
+    assert all(policy == policies[0] for policy in policies)
+    assert coalescer.stats()["collapsed"] == WAITERS - 1
+
+
+def test_waiters_get_their_own_copies(requests_mock, api_destination, coalescer):
+    def respond(request, context):
+        wait_for_collapsed(coalescer, 1)
+        return get_sample_json("get_a_policy")
+
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json=respond)
+    with AkamaiClient(test_common.get_sample_edgerc(), coalescer=coalescer) as client:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            responses = list(executor.map(lambda _: client.get("/cloudlets/v3/policies/1001"), range(2)))
+    first, second = [response.json() for response in responses]
+    first["name"] = "changed"
+    responses[0].headers["x-changed"] = "true"
+    assert second["name"] != "changed"
+    assert "x-changed" not in responses[1].headers
+    assert requests_mock.call_count == 1
+
+
+def test_waiters_record_how_long_they_waited(requests_mock, api_destination, coalescer):
+    events = []
+
+    def respond(request, context):
+        wait_for_collapsed(coalescer, 1)
+        time.sleep(0.05)
+        return get_sample_json("get_a_policy")
+
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json=respond)
+    instrumentation.add_listener(events.append)
+    try:
+        with AkamaiClient(test_common.get_sample_edgerc(), coalescer=coalescer) as client:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(lambda _: api.get_policy_by_id("1001", client=client), range(2)))
+    finally:
+        instrumentation.remove_listener(events.append)
+    wait_durations = sorted(event.wait_duration for event in events)
+    assert wait_durations[0] == 0.0
+    assert wait_durations[1] >= 0.04
+
+
+def test_client_does_not_collapse_writes(requests_mock, api_destination, coalescer):
+    requests_mock.delete(f"https://{api_destination}/cloudlets/v3/policies/1001", status_code=204)
+    with AkamaiClient(test_common.get_sample_edgerc(), coalescer=coalescer) as client:
+        api.delete_shared_policy("1001", client=client)
+        api.delete_shared_policy("1001", client=client)
+    assert requests_mock.call_count == 2
+    assert coalescer.stats()["sent"] == 0
@@ -0,0 +1,66 @@
+import os
+import shutil
+
+import pytest
+
+from . import common_test_func as test_common
+from src.akamai_shared_cloudlets import credentials
+from src.akamai_shared_cloudlets import exceptions
+
+
+@pytest.fixture()
+def edgerc_copy(tmp_path):
+    """
+    Provides a copy of the 'sample' edgerc file that the test is free to modify
+    @return: a String representing the location of the copied file
+    """
+    destination = tmp_path / "edgerc"
+    shutil.copy(test_common.get_sample_edgerc(), destination)
+    return str(destination)
+
+
+def test_credentials_are_parsed_once(edgerc_copy, mocker):
+    cache = credentials.CredentialCache()
+    parse = mocker.spy(credentials, "parse_credentials")
+    first = cache.get(edgerc_copy)
+    second = cache.get(edgerc_copy)
+    assert first is second
+    assert parse.call_count == 1
+    assert first.section == "default"
+    assert first.host == "dummy.luna.akamaiapis.net"
+    assert first.auth.ah.access_token == "akab-aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+
+
+def test_credentials_are_invalidated_when_file_changes(edgerc_copy):
+    cache = credentials.CredentialCache()
+    first = cache.get(edgerc_copy)
+    with open(edgerc_copy, mode="a") as edgerc_file:
+        edgerc_file.write("\n[cloudlets]\nclient_secret=x\nhost=cloudlets.akamaiapis.net\n"
+                          "access_token=akab-c\nclient_token=akab-d\n")
+    os.utime(edgerc_copy, ns=(0, os.stat(edgerc_copy).st_mtime_ns + 1))
+    second = cache.get(edgerc_copy)
+    assert second is not first
+    assert second.section == "cloudlets"
+    assert second.host == "cloudlets.akamaiapis.net"
+
+
+def test_requested_section_falls_back_to_default(edgerc_copy):
+    cache = credentials.CredentialCache()
+    assert cache.get(edgerc_copy, "cloudlets").section == "default"
+    assert len(cache) == 1
+
+
+def test_missing_file_raises(tmp_path):
+    cache = credentials.CredentialCache()
+    with pytest.raises(exceptions.EdgeRcFileMissing):
+        cache.get(str(tmp_path / "does-not-exist"))
+    with pytest.raises(exceptions.EdgeRcFileMissing):
+        cache.get(str(tmp_path))
+
+
+def test_symlinked_paths_share_the_entry(edgerc_copy, tmp_path):
+    cache = credentials.CredentialCache()
+    link = tmp_path / "edgerc-link"
+    link.symlink_to(edgerc_copy)
+    assert cache.get(str(link)) is cache.get(edgerc_copy)
+    assert len(cache) == 1
@@ -0,0 +1,78 @@
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_akamai_host, get_sample_json
+import src.akamai_shared_cloudlets.delta_sync as delta_sync
+import src.akamai_shared_cloudlets.snapshot as snapshot
+
+
+@pytest.fixture()
+def api_url():
+    return f"https://{get_akamai_host(test_common.get_sample_edgerc())}/cloudlets/v3/policies"
+
+
+def mock_account(requests_mock, api_url, policies: dict):
+    """
+    @param policies: dict of policy ids and tuples of the policy modifiedDate and dict of versions & their modifiedDate
+    """
+    requests_mock.get(api_url, json={
+        "content": [{"id": policy_id, "name": f"policy_{policy_id}", "modifiedDate": modified_date}
+                    for policy_id, (modified_date, _) in policies.items()],
+        "page": {"number": 0, "size": 1000, "totalElements": len(policies), "totalPages": 1}
+    })
+    for policy_id, (_, versions) in policies.items():
+        requests_mock.get(f"{api_url}/{policy_id}/versions", json={
+            "content": [{"policyId": policy_id, "version": version, "modifiedDate": modified_date}
+                        for version, modified_date in versions.items()],
+            "page": {"number": 0, "size": 1000, "totalElements": len(versions), "totalPages": 1}
+        })
+        for version in versions:
+            requests_mock.get(f"{api_url}/{policy_id}/versions/{version}", json=get_sample_json("get_policy_version"))
+
+
+def sync(tmp_path, name: str):
+    return delta_sync.sync_policies(str(tmp_path / "state.json"), str(tmp_path / name),
+                                    test_common.get_sample_edgerc())
+
+
+def test_first_sync_adds_everything(requests_mock, api_url, tmp_path):
+    mock_account(requests_mock, api_url, {1001: ("d1", {1: "v1", 2: "v2"}), 1002: ("d1", {1: "v1"})})
+    changes = sync(tmp_path, "first.jsonl")
+    assert sorted(change["policyId"] for change in changes["added"]) == [1001, 1002]
+    assert changes["versions_fetched"] == 3
+    assert len(list(snapshot.iter_snapshot(str(tmp_path / "first.jsonl")))) == 5
+
+
+def test_unchanged_account_needs_just_the_listing(requests_mock, api_url, tmp_path):
+    mock_account(requests_mock, api_url, {1001: ("d1", {1: "v1", 2: "v2"}), 1002: ("d1", {1: "v1"})})
+    sync(tmp_path, "first.jsonl")
+    requests_mock.reset_mock()
+    changes = sync(tmp_path, "second.jsonl")
+    assert changes["unchanged"] == 2
+    assert changes["added"] == changes["modified"] == changes["deleted"] == []
+    assert requests_mock.call_count == 1
+
+
+def test_changes_are_detected(requests_mock, api_url, tmp_path):
+    mock_account(requests_mock, api_url, {1001: ("d1", {1: "v1", 2: "v2"}), 1002: ("d1", {1: "v1"})})
+    sync(tmp_path, "first.jsonl")
+    requests_mock.reset_mock()
+    mock_account(requests_mock, api_url, {1001: ("d2", {3: "v3", 2: "v2b"})})
+    changes = sync(tmp_path, "second.jsonl")
+    assert changes["modified"] == [{"policyId": 1001, "name": "policy_1001", "new_versions": [3],
+                                    "modified_versions": [2], "deleted_versions": [1]}]
+    assert changes["deleted"] == [{"policyId": "1002", "name": "policy_1002"}]
+    assert changes["versions_fetched"] == 2
+    records = list(snapshot.iter_snapshot(str(tmp_path / "second.jsonl")))
+    assert [record["type"] for record in records].count("deleted") == 1
+
+
+def test_failed_policy_is_synced_again(requests_mock, api_url, tmp_path):
+    mock_account(requests_mock, api_url, {1001: ("d1", {1: "v1"})})
+    requests_mock.get(f"{api_url}/1001/versions/1", status_code=500)
+    changes = sync(tmp_path, "first.jsonl")
+    assert len(changes["errors"]) == 1
+    requests_mock.get(f"{api_url}/1001/versions/1", json=get_sample_json("get_policy_version"))
+    changes = sync(tmp_path, "second.jsonl")
+    assert [change["policyId"] for change in changes["added"]] == [1001]
+    assert changes["errors"] == []
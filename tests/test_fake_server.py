@@ -0,0 +1,67 @@
+import pytest
+import requests
+
+from . import common_test_func as test_common
+import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+import src.akamai_shared_cloudlets.http_requests as http_requests
+from src.akamai_shared_cloudlets.activation_tracker import ActivationTracker
+from src.akamai_shared_cloudlets.fake_server import FakeCloudletsServer, FakeDataset
+from src.akamai_shared_cloudlets.throttling import RetryPolicy
+
+
+@pytest.fixture()
+def server(requests_mock):
+    requests_mock.real_http = True
+    with FakeCloudletsServer(FakeDataset(policy_count=25, versions_per_policy=3, seed=1), seed=1) as fake_server:
+        yield fake_server
+
+
+@pytest.fixture()
+def client(server):
+    with http_requests.AkamaiClient(test_common.get_sample_edgerc(), base_url=server.url) as akamai_client:
+        yield akamai_client
+
+
+def test_listing_is_paginated(server, client):
+    policies = list(api.iter_shared_policies(page_size=10, client=client))
+    assert len(policies) == 25
+    assert len({policy["id"] for policy in policies}) == 25
+    assert server.request_count == 3
+
+
+def test_connections_are_reused(server, client):
+    for _ in range(5):
+        assert api.list_cloudlets(client=client) is not None
+    assert server.connection_count == 1
+
+
+def test_policy_lifecycle(client):
+    created = api.create_shared_policy("1000", "fake_policy", "test", "ER", client=client)
+    policy_id = created["policyId"]
+    assert api.get_shared_policy_by_name("fake_policy", client=client) == {"fake_policy": policy_id}
+    assert client.post(f"/cloudlets/v3/policies/{policy_id}/versions", {"matchRules": []}).status_code == 201
+    assert api.get_latest_policy_version(policy_id, client=client) == 1
+    assert api.activate_policy(policy_id, "staging", "activation", "1", client=client) is True
+    assert api.delete_shared_policy(policy_id, client=client) == "Policy was deleted successfully"
+    assert api.get_policy_by_id(policy_id, client=client) is None
+
+
+def test_activation_in_progress(server, client):
+    server.dataset.activation_delay = 0.05
+    activation = api.request_policy_activation("1001", "production", "activation", "1", client=client)
+    assert activation["status"] == "IN_PROGRESS"
+    with ActivationTracker(client=client, initial_interval=0.02) as tracker:
+        tracker.track_activation(activation)
+        assert [event.status for event in tracker.wait(timeout=5)] == ["SUCCESS"]
+
+
+def test_unsigned_request_is_refused(server):
+    assert requests.get(f"{server.url}/cloudlets/v3/policies").status_code == 401
+
+
+def test_injected_faults_are_retried(server, client):
+    server.throttle_rate = 0.5
+    server.retry_after = 0
+    client.retry_policy = RetryPolicy(max_retries=20, backoff_factor=0)
+    assert len(list(api.iter_shared_policies(page_size=10, client=client))) == 25
+    assert server.request_count > 3
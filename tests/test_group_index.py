@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_akamai_host, get_sample_json
+import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+from src.akamai_shared_cloudlets import group_index
+from src.akamai_shared_cloudlets.group_index import GroupIndex
+from src.akamai_shared_cloudlets.http_requests import AkamaiClient
+
+GROUPS = [
+    {"groupId": 1234, "groupName": "Master Group Name"},
+    {"groupId": 5678, "groupName": "Subgroup 1"},
+    {"groupId": 9012, "groupName": "Group Name"},
+]
+
+
+@pytest.fixture()
+def index():
+    return GroupIndex(lambda: GROUPS)
+
+
+@pytest.fixture()
+def group_info_url():
+    return f"https://{get_akamai_host(test_common.get_sample_edgerc())}/cloudlets/api/v2/group-info"
+
+
+@pytest.fixture()
+def restore_index_options():
+    yield
+    group_index.configure_group_indexes()
+
+
+def test_lookup_by_id(index):
+    assert index.get_name(1234) == "Master Group Name"
+    assert index.get_name("5678") == "Subgroup 1"
+    assert index.get_name(1) is None
+    assert 9012 in index
+    assert len(index) == 3
+    assert index.to_dict() == {1234: "Master Group Name", 5678: "Subgroup 1", 9012: "Group Name"}
+
+
+def test_lookup_by_name(index):
+    assert index.get_id("Subgroup 1") == 5678
+    assert index.get_id("subgroup 1") is None
+    assert index.get_id_case_insensitive("SUBGROUP 1") == 5678
+
+
+@pytest.mark.parametrize("group_name, expected", [
+    ("group name", 9012),
+    ("master", 1234),
+    ("GROUP", 1234),
+    ("missing", None),
+])
+def test_find_id_prefers_whole_name(index, group_name, expected):
+    assert index.find_id(group_name) == expected
+
+
+def test_index_is_loaded_once_and_refreshed_on_ttl():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return GROUPS
+
+    index = GroupIndex(loader, ttl=0)
+    index.get_name(1234)
+    index.get_name(1234)
+    assert len(calls) == 2
+    index = GroupIndex(loader)
+    index.get_name(1234)
+    index.find_id("sub")
+    assert len(calls) == 3
+    assert index.refresh()
+    assert len(calls) == 4
+
+
+def test_failed_listing_is_not_cached():
+    responses = [None, GROUPS]
+    index = GroupIndex(lambda: responses.pop(0))
+    assert index.to_dict() is None
+    assert index.find_id("sub") == 5678
+
+
+def test_index_is_persisted_between_runs(tmp_path):
+    cache_file = str(tmp_path / "groups.json")
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return get_sample_json("list_groups")
+
+    assert GroupIndex(loader, ttl=60, cache_file=cache_file).find_id("subgroup") == 5678
+    stored = json.loads((tmp_path / "groups.json").read_text())
+    assert set(stored["groups"][0]) == {"groupId", "groupName"}
+    assert GroupIndex(loader, ttl=60, cache_file=cache_file).get_name(1234) == "Master Group Name"
+    assert len(calls) == 1
+    stored["saved_at"] -= 120
+    (tmp_path / "groups.json").write_text(json.dumps(stored))
+    GroupIndex(loader, ttl=60, cache_file=cache_file).get_name(1234)
+    assert len(calls) == 2
+
+
+def test_library_functions_list_groups_once_per_client(requests_mock, group_info_url):
+    requests_mock.get(group_info_url, json=get_sample_json("list_groups"))
+    with AkamaiClient(test_common.get_sample_edgerc()) as client:
+        assert api.get_group_id_by_name("master group name", client=client) == 1234
+        assert api.get_group_id_by_name("group name", client=client) == 1234
+        assert api.get_group_id(client=client)[1234] == "Master Group Name"
+        assert api.get_group_index(client=client) is api.get_group_index(client=client)
+    assert requests_mock.call_count == 1
+    with AkamaiClient(test_common.get_sample_edgerc()) as client:
+        api.get_group_id(client=client)
+    assert requests_mock.call_count == 2
+
+
+def test_configured_cache_directory(requests_mock, group_info_url, tmp_path, restore_index_options):
+    requests_mock.get(group_info_url, json=get_sample_json("list_groups"))
+    group_index.configure_group_indexes(ttl=60, cache_directory=str(tmp_path))
+    for _ in range(2):
+        with AkamaiClient(test_common.get_sample_edgerc()) as client:
+            assert api.get_group_id_by_name("subgroup", client=client) == 5678
+    assert requests_mock.call_count == 1
+    assert len(list(tmp_path.glob("*.groups.json"))) == 1
@@ -0,0 +1,112 @@
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_sample_json
+import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+import src.akamai_shared_cloudlets.http_requests as http_requests
+import src.akamai_shared_cloudlets.instrumentation as instrumentation
+from src.akamai_shared_cloudlets.fake_server import FakeCloudletsServer, FakeDataset
+from src.akamai_shared_cloudlets.response_cache import ResponseCache
+from src.akamai_shared_cloudlets.throttling import RetryPolicy
+
+
+@pytest.fixture()
+def events():
+    recorded = []
+    instrumentation.add_listener(recorded.append)
+    yield recorded
+    instrumentation.remove_listener(recorded.append)
+
+
+@pytest.fixture()
+def aggregator():
+    metrics_aggregator = instrumentation.MetricsAggregator()
+    instrumentation.add_listener(metrics_aggregator)
+    yield metrics_aggregator
+    instrumentation.remove_listener(metrics_aggregator)
+
+
+def test_get_path_template():
+    assert instrumentation.get_path_template("/cloudlets/v3/policies/1001/versions/2?page=0") == \
+           "/cloudlets/v3/policies/{policyId}/versions/{version}"
+    assert instrumentation.get_path_template("/cloudlets/v3/policies/1001/activations/300001") == \
+           "/cloudlets/v3/policies/{policyId}/activations/{activationId}"
+    assert instrumentation.get_path_template("/cloudlets/v3/cloudlet-info") == "/cloudlets/v3/cloudlet-info"
+
+
+def test_request_event(requests_mock, api_destination, events):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001",
+                      json=get_sample_json("get_a_policy"))
+    policy = api.get_policy_by_id("1001", test_common.get_sample_edgerc())
+    assert policy["id"] == 1001
+    event = events[0]
+    assert event.method == "GET"
+    assert event.path_template == "/cloudlets/v3/policies/{policyId}"
+    assert event.status == 200
+    assert event.bytes_in > 0
+    assert event.bytes_out == 0
+    assert event.retries == 0
+    assert event.from_cache is False
+    assert 0 < event.sign_duration <= event.duration
+    assert event.decode_duration > 0
+
+
+def test_retries_are_counted(requests_mock, api_destination, events, monkeypatch):
+    monkeypatch.setattr(http_requests.time, "sleep", lambda seconds: None)
+    requests_mock.post(f"https://{api_destination}/cloudlets/v3/policies", status_code=201, json={"id": 1})
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info",
+                      [{"status_code": 503}, {"status_code": 200, "json": []}])
+    client = http_requests.AkamaiClient(test_common.get_sample_edgerc(), retry_policy=RetryPolicy())
+    client.get("/cloudlets/v3/cloudlet-info")
+    client.post("/cloudlets/v3/policies", {"name": "policy"})
+    assert [(event.method, event.status, event.retries) for event in events] == [("GET", 200, 1), ("POST", 201, 0)]
+    assert events[1].bytes_out == len(b'{"name":"policy"}')
+
+
+def test_cache_hit_is_reported(requests_mock, api_destination, events):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", json=get_sample_json("cloudlet_info"))
+    client = http_requests.AkamaiClient(test_common.get_sample_edgerc(), response_cache=ResponseCache())
+    api.list_cloudlets(client=client)
+    api.list_cloudlets(client=client)
+    assert [event.from_cache for event in events] == [False, True]
+
+
+def test_connect_duration(requests_mock, events):
+    requests_mock.real_http = True
+    with FakeCloudletsServer(FakeDataset(policy_count=1)) as server:
+        with http_requests.AkamaiClient(test_common.get_sample_edgerc(), base_url=server.url) as client:
+            client.get("/cloudlets/v3/cloudlet-info")
+            client.get("/cloudlets/v3/cloudlet-info")
+    assert events[0].connect_duration > 0
+    assert events[1].connect_duration == 0
+    assert events[0].ttfb > 0
+
+
+def test_aggregator(requests_mock, api_destination, aggregator):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json={})
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1002", status_code=404)
+    client = http_requests.AkamaiClient(test_common.get_sample_edgerc())
+    for policy_id in ("1001", "1001", "1002"):
+        api.get_policy_by_id(policy_id, client=client)
+    summary = aggregator.summary()
+    assert len(summary) == 1
+    assert summary[0]["count"] == 3
+    assert summary[0]["errors"] == 1
+    assert summary[0]["p50_ms"] <= summary[0]["p99_ms"]
+    metrics = aggregator.to_openmetrics()
+    assert 'akamai_cloudlets_requests_total{method="GET",path="/cloudlets/v3/policies/{policyId}",status="404"} 1' \
+           in metrics
+    assert metrics.endswith("# EOF\n")
+    assert "/cloudlets/v3/policies/{policyId}" in aggregator.format_table()
+
+
+def test_failing_listener_does_not_break_the_request(requests_mock, api_destination):
+    def failing_listener(event):
+        raise RuntimeError("broken listener")
+
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", json=[])
+    instrumentation.add_listener(failing_listener)
+    try:
+        assert api.list_cloudlets(test_common.get_sample_edgerc()) == []
+    finally:
+        instrumentation.remove_listener(failing_listener)
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_akamai_host
+from .test_pagination import policies_page
+import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+import src.akamai_shared_cloudlets.http_requests as http_requests
+from src.akamai_shared_cloudlets import exceptions
+from src.akamai_shared_cloudlets import json_codec
+
+DOCUMENT = {
+    "page": {"number": 0, "size": 3, "totalElements": 12345678901, "totalPages": 1},
+    "content": [
+        {"id": 1, "name": "first", "matchRules": [{"matchURL": "/a", "redirectURL": "/b", "statusCode": 301}]},
+        {"id": 2, "name": "druhá – žluťoučká", "description": None, "ratio": 0.25, "active": True},
+        {"id": 3, "name": "\"quoted\" \\ name", "nested": {"content": [1, 2, 3]}},
+    ],
+    "links": [{"href": "/cloudlets/v3/policies?page=0&size=3", "rel": "self"}]
+}
+
+
+@pytest.fixture()
+def restore_codec():
+    codec = json_codec.get_codec()
+    yield
+    json_codec.set_codec(codec)
+
+
+def to_chunks(document, chunk_size: int):
+    data = json.dumps(document, ensure_ascii=False, indent=1).encode("utf-8")
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def collect(chunks):
+    items = json_codec.iter_content_items(chunks)
+    collected = []
+    while True:
+        try:
+            collected.append(next(items))
+        except StopIteration as end:
+            return collected, end.value
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+def test_codecs_round_trip(codec, restore_codec):
+    if codec == "orjson":
+        pytest.importorskip("orjson")
+    json_codec.set_codec(codec)
+    assert json_codec.get_codec().name == codec
+    assert json_codec.loads(json_codec.dumps(DOCUMENT)) == DOCUMENT
+    assert json_codec.loads(json.dumps(DOCUMENT).encode("utf-16")) == DOCUMENT
+    assert json_codec.dumps({"big": 2 ** 70}) == b'{"big":1180591620717411303424}'
+
+
+def test_unknown_codec_raises():
+    with pytest.raises(exceptions.IncorrectInputParameter):
+        json_codec.set_codec("simdjson")
+
+
+def test_missing_orjson_raises(monkeypatch):
+    monkeypatch.setattr(json_codec, "orjson", None)
+    with pytest.raises(exceptions.MissingOptionalDependency):
+        json_codec.set_codec("orjson")
+    assert isinstance(json_codec.get_default_codec(), json_codec.StdlibCodec)
+
+
+def test_responses_are_decoded_with_selected_codec(requests_mock, restore_codec):
+    class CountingCodec(json_codec.StdlibCodec):
+        calls = 0
+
+        def loads(self, data):
+            CountingCodec.calls += 1
+            return super().loads(data)
+
+    json_codec.set_codec(CountingCodec())
+    requests_mock.get(f"https://{get_akamai_host(test_common.get_sample_edgerc())}/cloudlets/v3/cloudlet-info",
+                      json=[{"cloudletType": "ER"}])
+    with http_requests.AkamaiClient(test_common.get_sample_edgerc()) as client:
+        response = client.get("/cloudlets/v3/cloudlet-info")
+        assert response.json() == [{"cloudletType": "ER"}]
+        assert response.json() == [{"cloudletType": "ER"}]
+    assert CountingCodec.calls == 1
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 100000])
+def test_iter_content_items(chunk_size):
+    items, rest = collect(to_chunks(DOCUMENT, chunk_size))
+    assert items == DOCUMENT["content"]
+    assert rest == {**DOCUMENT, "content": []}
+
+
+def test_iter_content_items_of_text_chunks():
+    items, rest = collect(list(json.dumps(DOCUMENT)))
+    assert items == DOCUMENT["content"]
+    assert rest["page"] == DOCUMENT["page"]
+
+
+@pytest.mark.parametrize("document", [{}, {"content": []}, {"page": {"number": 0}}])
+def test_iter_content_items_without_items(document):
+    assert collect(to_chunks(document, 3)) == ([], document)
+
+
+def test_iter_content_items_is_lazy():
+    def chunks():
+        yield b'{"content": [{"id": 1}, '
+        raise AssertionError("the first item should be yielded before the rest of the document is read")
+
+    assert next(json_codec.iter_content_items(chunks())) == {"id": 1}
+
+
+@pytest.mark.parametrize("document", [b'[1, 2]', b'{"content": [1, 2}', b'{"content": [1, 2]', b'{1: 2}'])
+def test_iter_content_items_of_invalid_document(document):
+    with pytest.raises(ValueError):
+        collect([document])
+
+
+@pytest.mark.parametrize("with_links", [True, False])
+def test_incremental_listing(requests_mock, with_links):
+    url = f"https://{get_akamai_host(test_common.get_sample_edgerc())}/cloudlets/v3/policies"
+    for number in range(3):
+        requests_mock.get(f"{url}?page={number}&size=2", complete_qs=True,
+                          json=policies_page(number, 3, with_links=with_links))
+    with http_requests.AkamaiClient(test_common.get_sample_edgerc()) as client:
+        policies = list(api.iter_shared_policies(2, client=client, incremental=True))
+    assert [policy["id"] for policy in policies] == list(range(6))
+
+
+def test_incremental_listing_failure(requests_mock):
+    url = f"https://{get_akamai_host(test_common.get_sample_edgerc())}/cloudlets/v3/policies"
+    requests_mock.get(url, status_code=500)
+    with http_requests.AkamaiClient(test_common.get_sample_edgerc()) as client:
+        with pytest.raises(exceptions.ApiRequestFailed):
+            list(api.iter_shared_policies(2, client=client, incremental=True))
@@ -0,0 +1,82 @@
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_sample_json
+import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+from src.akamai_shared_cloudlets import exceptions
+from src.akamai_shared_cloudlets import pagination
+
+
+def policies_page(number: int, total_pages: int, size: int = 2, with_links: bool = False):
+    page = {
+        "page": {"number": number, "size": size, "totalElements": total_pages * size, "totalPages": total_pages},
+        "content": [{"id": number * size + i, "name": f"policy_{number * size + i}"} for i in range(size)],
+        "links": []
+    }
+    if with_links and number + 1 < total_pages:
+        page["links"].append({"href": f"/cloudlets/v3/policies?page={number + 1}&size={size}", "rel": "next"})
+    return page
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+@pytest.mark.parametrize("with_links", [True, False])
+def test_iter_shared_policies_walks_all_pages(requests_mock, api_destination, client, prefetch, with_links):
+    url = f"https://{api_destination}/cloudlets/v3/policies"
+    for number in range(3):
+        requests_mock.get(f"{url}?page={number}&size=2", complete_qs=True,
+                          json=policies_page(number, 3, with_links=with_links))
+    policies = list(api.iter_shared_policies(2, client=client, prefetch=prefetch))
+    assert [policy["id"] for policy in policies] == list(range(6))
+    assert requests_mock.call_count == 3
+    assert "page" not in requests_mock.request_history[0].headers
+
+
+def test_failed_page_raises(requests_mock, api_destination, client):
+    url = f"https://{api_destination}/cloudlets/v3/policies/1001/versions"
+    requests_mock.get(f"{url}?page=0&size=2", complete_qs=True, json=policies_page(0, 3))
+    requests_mock.get(f"{url}?page=1&size=2", complete_qs=True, status_code=500)
+    versions = []
+    with pytest.raises(exceptions.ApiRequestFailed) as error:
+        for version in api.iter_policy_versions("1001", 2, client=client):
+            versions.append(version)
+    assert error.value.status_code == 500
+    assert len(versions) == 2
+
+
+def test_non_advancing_pages_raise(requests_mock, api_destination, client):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies", json=get_sample_json("list_shared_policies"))
+    policies = []
+    with pytest.raises(exceptions.PaginationError):
+        for policy in api.iter_shared_policies(client=client):
+            policies.append(policy)
+    assert [policy["id"] for policy in policies] == [1001]
+    assert requests_mock.call_count == 2
+
+
+def test_repeated_next_link_raises(requests_mock, api_destination, client):
+    url = f"https://{api_destination}/cloudlets/v3/policies"
+    page = {"content": [{"id": 1}], "links": [{"href": "/cloudlets/v3/policies?page=0&size=2", "rel": "next"}]}
+    requests_mock.get(url, json=page)
+    with pytest.raises(exceptions.PaginationError):
+        list(api.iter_shared_policies(2, client=client, prefetch=False))
+    assert requests_mock.call_count == 1
+
+
+def test_iteration_stops_on_empty_page(requests_mock, api_destination, client):
+    url = f"https://{api_destination}/cloudlets/v3/policies/1001/properties"
+    requests_mock.get(url, json={"page": {"number": 0, "size": 2, "totalPages": 5}, "content": []})
+    assert list(api.iter_active_properties("1001", 2, client=client)) == []
+    assert requests_mock.call_count == 1
+
+
+def test_list_policy_versions_sends_query_string(requests_mock, api_destination):
+    url = f"https://{api_destination}/cloudlets/v3/policies/1001/versions?page=3&size=100"
+    requests_mock.get(url, complete_qs=True, json={"content": []})
+    response = api.list_policy_versions("1001", 3, 100, test_common.get_sample_edgerc())
+    assert response == {"content": []}
+
+
+def test_next_page_request():
+    assert pagination.get_next_page_request(policies_page(0, 1), "/path", 2) is None
+    assert pagination.get_next_page_request(policies_page(0, 2), "/path", 2) == ("/path", {"page": "1", "size": "2"})
+    assert pagination.get_next_page_request({"content": []}, "/path", 2) is None
@@ -0,0 +1,143 @@
+import copy
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_sample_json
+from src.akamai_shared_cloudlets import bulk_activation
+from src.akamai_shared_cloudlets import policy_diff
+from src.akamai_shared_cloudlets.commands import versions
+
+
+def rule(name: str, url: str = None, rule_id: int = 0, **fields) -> dict:
+    return {"type": "erMatchRule", "id": rule_id, "akaRuleId": f"aka{rule_id}", "name": name,
+            "matchURL": url or f"/{name}", "statusCode": 301, **fields}
+
+
+def mock_version(requests_mock, api_destination, version: int, rules: list, policy_id: int = 1001):
+    body = {**get_sample_json("get_policy_version"), "version": version, "matchRules": rules}
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/{policy_id}/versions/{version}", json=body)
+
+
+def test_identical_rules_ignore_assigned_fields():
+    old = [rule("a", rule_id=1), rule("b", rule_id=2)]
+    new = [rule("a", rule_id=7), rule("b", rule_id=8)]
+    diff = policy_diff.diff_match_rules(old, new)
+    assert diff.is_identical()
+    assert diff.summary() == {"identical": True, "added": 0, "removed": 0, "modified": 0, "reordered": 0,
+                              "unchanged": 2}
+
+
+def test_added_removed_and_modified_rules():
+    old = [rule("a"), rule("b"), rule("c")]
+    new = [rule("a"), rule("c", statusCode=302), rule("d")]
+    diff = policy_diff.diff_match_rules(old, new)
+    assert diff.added == [policy_diff.RuleChange("d", None, 2, [])]
+    assert diff.removed == [policy_diff.RuleChange("b", 1, None, [])]
+    assert diff.modified == [policy_diff.RuleChange("c", 2, 1, ["statusCode"])]
+    assert diff.reordered == []
+    assert diff.unchanged == 1
+
+
+def test_reordered_rules():
+    old = [rule("a"), rule("b"), rule("c"), rule("d")]
+    new = [rule("a"), rule("d"), rule("b"), rule("c")]
+    diff = policy_diff.diff_match_rules(old, new)
+    assert diff.reordered == [policy_diff.RuleChange("d", 3, 1, [])]
+    assert diff.unchanged == 3
+    assert not diff.is_identical()
+
+
+def test_duplicate_rules_are_paired_in_order():
+    old = [rule("a"), rule("a"), rule("b")]
+    new = [rule("a"), rule("b")]
+    diff = policy_diff.diff_match_rules(old, new)
+    assert diff.removed == [policy_diff.RuleChange("a", 1, None, [])]
+    assert diff.reordered == []
+
+
+def test_empty_rules():
+    assert policy_diff.diff_match_rules(None, []).is_identical()
+    assert len(policy_diff.diff_match_rules([], [rule("a")]).added) == 1
+
+
+def test_large_rule_sets():
+    old = [rule(f"rule {i}", rule_id=i) for i in range(5000)]
+    new = copy.deepcopy(old)
+    new[10]["statusCode"] = 302
+    new.insert(0, new.pop(4000))
+    diff = policy_diff.diff_match_rules(old, new)
+    assert [change.name for change in diff.modified] == ["rule 10"]
+    assert [change.name for change in diff.reordered] == ["rule 4000"]
+    assert diff.unchanged == 4998
+
+
+def test_format_text():
+    diff = policy_diff.diff_match_rules([rule("a"), rule("b")], [rule("b"), rule("c")])
+    assert diff.format_text().splitlines() == [
+        "- [0] a",
+        "+ [1] c",
+        "1 added, 1 removed, 0 modified, 0 reordered, 1 unchanged"
+    ]
+
+
+def test_diff_versions(requests_mock, api_destination):
+    mock_version(requests_mock, api_destination, 1, [rule("a"), rule("b")])
+    mock_version(requests_mock, api_destination, 2, [rule("a"), rule("b", "/changed")])
+    diff = policy_diff.diff_versions("1001", "1", "2", test_common.get_sample_edgerc())
+    assert diff.modified == [policy_diff.RuleChange("b", 1, 1, ["matchURL"])]
+
+
+def test_diff_version_with_file(requests_mock, api_destination, tmp_path):
+    mock_version(requests_mock, api_destination, 1, [rule("a")])
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps([rule("a", rule_id=5)]))
+    assert policy_diff.diff_version_with_file("1001", "1", str(rules_file), test_common.get_sample_edgerc()) \
+        .is_identical()
+
+
+@pytest.mark.parametrize("new_rules, activated", [([rule("a")], False), ([rule("a", "/new")], True)])
+def test_activate_if_changed(requests_mock, api_destination, new_rules, activated):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json=get_sample_json("get_a_policy"))
+    mock_version(requests_mock, api_destination, 1, [rule("a")])
+    mock_version(requests_mock, api_destination, 2, new_rules)
+    activation_url = f"https://{api_destination}/cloudlets/v3/policies/1001/activations"
+    requests_mock.post(activation_url, json=get_sample_json("activate_policy"), status_code=202)
+    activation = policy_diff.activate_if_changed("1001", "production", "2", test_common.get_sample_edgerc())
+    assert (activation is not None) == activated
+    assert any(request.url == activation_url for request in requests_mock.request_history) == activated
+
+
+def test_active_version_is_never_activated_again(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json=get_sample_json("get_a_policy"))
+    assert policy_diff.activate_if_changed("1001", "production", "1", test_common.get_sample_edgerc()) is None
+    assert requests_mock.call_count == 1
+
+
+def test_nothing_active_on_network(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json=get_sample_json("get_a_policy"))
+    assert policy_diff.get_equivalent_active_version("1001", "staging", "1", test_common.get_sample_edgerc()) is None
+
+
+def test_bulk_activation_skips_unchanged(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", json=get_sample_json("get_a_policy"))
+    report = bulk_activation.activate_policies([("1001", "1", "production", "activation")],
+                                               test_common.get_sample_edgerc(), skip_unchanged=True)
+    assert report.summary()["skipped"] == 1
+    assert report.succeeded == [] and report.failed == []
+
+
+def test_cli_diff_versions(requests_mock, api_destination):
+    mock_version(requests_mock, api_destination, 1, [rule("a")])
+    mock_version(requests_mock, api_destination, 2, [rule("a"), rule("b")])
+    arguments = ["--edgerc-location", test_common.get_sample_edgerc()]
+    result = CliRunner().invoke(versions.diff_versions, ["1001", "1", "2", "--json", *arguments])
+    assert result.exit_code == 1
+    assert json.loads(result.stdout)["added"] == 1
+    result = CliRunner().invoke(versions.diff_versions, ["1001", "1", "1", *arguments])
+    assert result.exit_code == 0
+    assert result.stdout.strip() == "identical match rules"
+    result = CliRunner().invoke(versions.diff_versions, ["1001", "1", *arguments])
+    assert result.exit_code == 2
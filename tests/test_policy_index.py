@@ -0,0 +1,98 @@
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_akamai_host, get_sample_json
+import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+from src.akamai_shared_cloudlets import exceptions
+from src.akamai_shared_cloudlets.policy_index import PolicyNameIndex
+
+POLICIES = [
+    {"name": "static_assets_redirector", "id": 1001},
+    {"name": "Static_Images", "id": 1002},
+    {"name": "api_gateway_prod", "id": 1003},
+    {"name": "API_gateway_stage", "id": 1004},
+]
+
+
+@pytest.fixture()
+def index():
+    return PolicyNameIndex(lambda: POLICIES)
+
+
+def test_exact_lookup(index):
+    assert index.get("Static_Images") == 1002
+    assert index.get("static_images") is None
+    assert "api_gateway_prod" in index
+    assert len(index) == 4
+
+
+def test_case_insensitive_lookup(index):
+    assert index.find_case_insensitive("STATIC_IMAGES") == {"Static_Images": 1002}
+    assert index.find_case_insensitive("nothing") == {}
+
+
+def test_prefix_lookup(index):
+    assert index.find_by_prefix("api_") == {"API_gateway_stage": 1004, "api_gateway_prod": 1003}
+    assert index.find_by_prefix("static_a") == {"static_assets_redirector": 1001}
+    assert index.find_by_prefix("zzz") == {}
+
+
+@pytest.mark.parametrize("needle, expected", [
+    ("GATEWAY", {"API_gateway_stage": 1004, "api_gateway_prod": 1003}),
+    ("images", {"Static_Images": 1002}),
+    ("ic", {"Static_Images": 1002, "static_assets_redirector": 1001}),
+    ("missing", {}),
+])
+def test_substring_lookup(index, needle, expected):
+    assert index.find_by_substring(needle) == expected
+
+
+def test_index_is_built_once_and_refreshed_on_ttl():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return POLICIES
+
+    index = PolicyNameIndex(loader, ttl=0)
+    index.get("api_gateway_prod")
+    index.get("api_gateway_prod")
+    assert len(calls) == 2
+    index = PolicyNameIndex(loader)
+    index.get("api_gateway_prod")
+    index.find_by_substring("gateway")
+    assert len(calls) == 3
+    index.refresh()
+    assert len(calls) == 4
+
+
+def test_library_functions_use_index(requests_mock):
+    test_edgerc_file = test_common.get_sample_edgerc()
+    api_destination = get_akamai_host(test_edgerc_file)
+    single_page = get_sample_json("list_shared_policies")
+    single_page["links"] = [link for link in single_page["links"] if link["rel"] != "next"]
+    single_page["page"]["totalPages"] = 1
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies?page=0&size=1000", complete_qs=True,
+                      json=single_page)
+    requests_mock.delete(f"https://{api_destination}/cloudlets/v3/policies/1001", status_code=204)
+    index = api.build_policy_name_index(test_edgerc_file)
+    assert api.get_shared_policy_by_name("static_assets_redirector", index=index) == {"static_assets_redirector": 1001}
+    assert api.get_shared_policies_by_approximate_name("ASSETS", index=index) == {"static_assets_redirector": 1001}
+    response = api.delete_shared_policy_by_name("static_assets_redirector", test_edgerc_file, index=index)
+    assert response == "Policy was deleted successfully"
+    assert requests_mock.call_count == 2
+
+
+def test_failed_listing_is_not_cached():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        if len(calls) == 1:
+            raise exceptions.ApiRequestFailed("Listing failed", 500)
+        return POLICIES
+
+    index = PolicyNameIndex(loader)
+    with pytest.raises(exceptions.ApiRequestFailed):
+        index.get("api_gateway_prod")
+    assert index.get("api_gateway_prod") == 1003
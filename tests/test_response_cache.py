@@ -0,0 +1,130 @@
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_sample_json
+import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+import src.akamai_shared_cloudlets.http_requests as http_requests
+from src.akamai_shared_cloudlets import response_cache
+from src.akamai_shared_cloudlets.response_cache import ResponseCache
+
+
+def get_client(cache: ResponseCache):
+    return http_requests.AkamaiClient(test_common.get_sample_edgerc(), response_cache=cache)
+
+
+def test_read_only_endpoint_is_cached(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", json=get_sample_json("cloudlet_info"))
+    cache = ResponseCache()
+    client = get_client(cache)
+    first = api.list_cloudlets(client=client)
+    second = api.list_cloudlets(client=client)
+    assert first == second
+    assert first is not second
+    assert requests_mock.call_count == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_listing_is_not_cached(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies", json=get_sample_json("list_shared_policies"))
+    client = get_client(ResponseCache())
+    api.list_shared_policies(client=client)
+    api.list_shared_policies(client=client)
+    assert requests_mock.call_count == 2
+
+
+def test_failed_response_is_not_cached(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001", status_code=500)
+    client = get_client(ResponseCache())
+    assert api.get_policy_by_id("1001", client=client) is None
+    assert api.get_policy_by_id("1001", client=client) is None
+    assert requests_mock.call_count == 2
+
+
+def test_expired_response_is_revalidated(requests_mock, api_destination):
+    url = f"https://{api_destination}/cloudlets/v3/policies/1001"
+    requests_mock.get(url, json=get_sample_json("get_a_policy"), headers={"ETag": '"v1"'})
+    cache = ResponseCache(ttls={r"^/cloudlets/v3/policies/\d+$": 0})
+    client = get_client(cache)
+    first = api.get_policy_by_id("1001", client=client)
+    requests_mock.get(url, status_code=304)
+    second = api.get_policy_by_id("1001", client=client)
+    assert first == second
+    assert requests_mock.last_request.headers["If-None-Match"] == '"v1"'
+    assert cache.stats()["revalidations"] == 1
+
+
+def test_immutable_version_never_expires(requests_mock, api_destination):
+    version = get_sample_json("get_policy_version")
+    version["immutable"] = True
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001/versions/1", json=version)
+    client = get_client(ResponseCache(ttls={r"/versions/\d+$": 0}))
+    api.get_policy_version("1001", "1", client=client)
+    api.get_policy_version("1001", "1", client=client)
+    assert requests_mock.call_count == 1
+
+
+def test_write_request_invalidates_policy(requests_mock, api_destination):
+    url = f"https://{api_destination}/cloudlets/v3/policies/1001"
+    requests_mock.get(url, json=get_sample_json("get_a_policy"))
+    requests_mock.delete(url, status_code=204)
+    client = get_client(ResponseCache())
+    api.get_policy_by_id("1001", client=client)
+    api.delete_shared_policy("1001", client=client)
+    api.get_policy_by_id("1001", client=client)
+    assert requests_mock.call_count == 3
+
+
+@pytest.mark.parametrize("disk", [False, True])
+def test_write_request_keeps_policies_with_longer_ids(requests_mock, api_destination, tmp_path, disk):
+    for policy_id in (1, 10, 1001):
+        requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/{policy_id}", json={"id": policy_id})
+    requests_mock.delete(f"https://{api_destination}/cloudlets/v3/policies/1", status_code=204)
+    client = get_client(ResponseCache(disk_directory=str(tmp_path) if disk else None))
+    for policy_id in ("1", "10", "1001"):
+        api.get_policy_by_id(policy_id, client=client)
+    api.delete_shared_policy("1", client=client)
+    if disk:
+        # 10 & 1001 have to be reloaded from the disk
+        client.response_cache.memory.clear()
+    for policy_id in ("1", "10", "1001"):
+        api.get_policy_by_id(policy_id, client=client)
+    assert requests_mock.call_count == 5
+
+
+def test_url_is_under_prefix():
+    assert response_cache.is_under("https://host/cloudlets/v3/policies/1", "https://host/cloudlets/v3/policies/1")
+    assert response_cache.is_under("https://host/cloudlets/v3/policies/1/versions?page=0",
+                                   "https://host/cloudlets/v3/policies/1")
+    assert response_cache.is_under("https://host/cloudlets/v3/policies/1?x=1", "https://host/cloudlets/v3/policies/1")
+    assert not response_cache.is_under("https://host/cloudlets/v3/policies/10", "https://host/cloudlets/v3/policies/1")
+
+
+def test_disk_store_survives_the_cache(requests_mock, api_destination, tmp_path):
+    requests_mock.get(f"https://{api_destination}/cloudlets/api/v2/group-info", json=get_sample_json("list_groups"))
+    api.list_groups(client=get_client(ResponseCache(disk_directory=str(tmp_path))))
+    groups = api.list_groups(client=get_client(ResponseCache(disk_directory=str(tmp_path))))
+    assert groups[0]["groupName"] == "Master Group Name"
+    assert requests_mock.call_count == 1
+
+
+def test_memory_store_evicts_least_recently_used(requests_mock, api_destination):
+    for policy_id in range(3):
+        requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/{policy_id}", json={"id": policy_id})
+    client = get_client(ResponseCache(max_entries=2))
+    for policy_id in [0, 1, 2, 0]:
+        api.get_policy_by_id(str(policy_id), client=client)
+    assert requests_mock.call_count == 4
+
+
+def test_latest_version_is_cached_until_new_version_is_created(requests_mock, api_destination):
+    url = f"https://{api_destination}/cloudlets/v3/policies/1001/versions"
+    requests_mock.get(url, json=get_sample_json("list_policy_versions"))
+    requests_mock.post(url, status_code=201, json={})
+    client = get_client(ResponseCache())
+    assert api.get_latest_policy_version("1001", client=client) == 1
+    assert api.get_latest_policy_version("1001", client=client) == 1
+    assert requests_mock.call_count == 1
+    client.post("/cloudlets/v3/policies/1001/versions", {})
+    api.get_latest_policy_version("1001", client=client)
+    assert requests_mock.call_count == 3
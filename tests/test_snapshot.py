@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from . import common_test_func as test_common
+import src.akamai_shared_cloudlets.snapshot as snapshot
+from src.akamai_shared_cloudlets import exceptions
+
+
+def test_export_snapshot(account, tmp_path):
+    output_file = str(tmp_path / "snapshot.jsonl.gz")
+    manifest = snapshot.export_snapshot(output_file, test_common.get_sample_edgerc(), max_workers=2)
+    records = list(snapshot.iter_snapshot(output_file))
+    assert manifest["compression"] == "gzip"
+    assert manifest["counts"]["policies"] == 2
+    assert manifest["counts"]["versions"] == 3
+    assert manifest["errors"] == []
+    assert sorted((record["policyId"], record["data"]["version"]) for record in records
+                  if record["type"] == "version") == [(1001, 1), (1001, 2), (1002, 1)]
+    assert all("matchRules" in record["data"] for record in records if record["type"] == "version")
+    with open(f"{output_file}.manifest.json") as manifest_file:
+        assert json.load(manifest_file) == manifest
+
+
+def test_export_snapshot_without_rules(account, requests_mock, tmp_path):
+    output_file = str(tmp_path / "snapshot.jsonl")
+    manifest = snapshot.export_snapshot(output_file, test_common.get_sample_edgerc(), include_rules=False)
+    assert manifest["counts"]["versions"] == 3
+    assert len(list(snapshot.iter_snapshot(output_file))) == 5
+    assert not any(request.path.endswith("/versions/1") for request in requests_mock.request_history)
+
+
+def test_failed_version_is_reported(account, requests_mock, tmp_path):
+    requests_mock.get(f"{account}/1001/versions/2", status_code=500)
+    output_file = str(tmp_path / "snapshot.jsonl")
+    manifest = snapshot.export_snapshot(output_file, test_common.get_sample_edgerc())
+    assert manifest["counts"]["versions"] == 2
+    assert manifest["errors"] == [{"task": "get_version", "policyId": 1001, "error": "Unable to get version 2"}]
+
+
+def test_zstd_needs_zstandard(monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshot, "zstandard", None)
+    with pytest.raises(exceptions.MissingOptionalDependency):
+        snapshot.open_output(str(tmp_path / "snapshot.jsonl.zst"), "zstd")
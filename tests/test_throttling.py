@@ -0,0 +1,110 @@
+import time
+
+import pytest
+import requests
+
+from . import common_test_func as test_common
+import src.akamai_shared_cloudlets.http_requests as http_requests
+import src.akamai_shared_cloudlets.throttling as throttling
+from src.akamai_shared_cloudlets.throttling import RetryPolicy, TokenBucket
+
+
+@pytest.fixture()
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(http_requests.time, "sleep", recorded.append)
+    return recorded
+
+
+def get_client(**client_options):
+    return http_requests.AkamaiClient(test_common.get_sample_edgerc(), **client_options)
+
+
+def test_transient_error_is_retried(requests_mock, api_destination, sleeps):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", [
+        {"status_code": 503},
+        {"status_code": 502},
+        {"status_code": 200, "json": []},
+    ])
+    client = get_client(retry_policy=RetryPolicy(backoff_factor=1, jitter=0))
+    response = client.get("/cloudlets/v3/cloudlet-info")
+    assert response.status_code == 200
+    assert sleeps == [1, 2]
+    signatures = {request.headers["Authorization"] for request in requests_mock.request_history}
+    assert len(signatures) == 3
+
+
+def test_retries_are_limited(requests_mock, api_destination, sleeps):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", status_code=500)
+    client = get_client(retry_policy=RetryPolicy(max_retries=2))
+    assert client.get("/cloudlets/v3/cloudlet-info").status_code == 500
+    assert requests_mock.call_count == 3
+
+
+def test_post_is_not_retried(requests_mock, api_destination, sleeps):
+    requests_mock.post(f"https://{api_destination}/cloudlets/v3/policies", status_code=503)
+    client = get_client(retry_policy=RetryPolicy())
+    assert client.post("/cloudlets/v3/policies", {}).status_code == 503
+    assert requests_mock.call_count == 1
+    assert sleeps == []
+
+
+def test_connection_error_is_retried(requests_mock, api_destination, sleeps):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", [
+        {"exc": requests.exceptions.ConnectionError},
+        {"status_code": 200, "json": []},
+    ])
+    client = get_client(retry_policy=RetryPolicy())
+    assert client.get("/cloudlets/v3/cloudlet-info").status_code == 200
+    assert len(sleeps) == 1
+
+
+def test_retry_after_is_honored(requests_mock, api_destination, sleeps):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", [
+        {"status_code": 429, "headers": {"Retry-After": "7"}},
+        {"status_code": 200, "json": []},
+    ])
+    client = get_client(retry_policy=RetryPolicy())
+    assert client.get("/cloudlets/v3/cloudlet-info").status_code == 200
+    assert sleeps == [7]
+
+
+def test_rate_limit_pauses_the_limiter(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", [
+        {"status_code": 429, "headers": {"Retry-After": "0.05"}},
+        {"status_code": 200, "json": []},
+    ])
+    client = get_client(retry_policy=RetryPolicy(), rate_limiter=TokenBucket(1000))
+    started_at = time.monotonic()
+    assert client.get("/cloudlets/v3/cloudlet-info").status_code == 200
+    assert 0.05 <= time.monotonic() - started_at < 1
+
+
+def test_no_retries_without_policy(requests_mock, api_destination, sleeps):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", status_code=429)
+    assert get_client().get("/cloudlets/v3/cloudlet-info").status_code == 429
+    assert requests_mock.call_count == 1
+
+
+def test_get_requested_delay():
+    assert throttling.get_requested_delay({"Retry-After": "3"}) == 3
+    assert throttling.get_requested_delay({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert throttling.get_requested_delay({"X-RateLimit-Remaining": "5", "X-RateLimit-Next": "2015-10-21T07:28:00Z"}) \
+        is None
+    assert throttling.get_requested_delay({"X-RateLimit-Remaining": "0", "X-RateLimit-Next": "2015-10-21T07:28:00Z"}) \
+        == 0
+    assert throttling.get_requested_delay({}) is None
+
+
+def test_shared_rate_limiter_is_used(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", json=[])
+    rate_limiter = throttling.configure_shared_rate_limiter(1000, capacity=1)
+    try:
+        client = get_client()
+        rate_limiter.pause(0.05)
+        started_at = time.monotonic()
+        client.get("/cloudlets/v3/cloudlet-info")
+        assert time.monotonic() - started_at >= 0.05
+    finally:
+        throttling.configure_shared_rate_limiter(None)
+    assert throttling.get_shared_rate_limiter() is None
@@ -0,0 +1,89 @@
+import contextlib
+import contextvars
+
+import pytest
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_sample_json
+import src.akamai_shared_cloudlets.akamai_api_requests_abstractions as api
+import src.akamai_shared_cloudlets.tracing as tracing
+
+current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class RecordedSpan:
+    def __init__(self, name: str, attributes: dict, parent):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class RecordingTracer:
+    def __init__(self):
+        self.spans = []
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name, attributes=None, **kwargs):
+        span = RecordedSpan(name, attributes, current_span.get())
+        self.spans.append(span)
+        token = current_span.set(span)
+        try:
+            yield span
+        finally:
+            current_span.reset(token)
+
+
+@pytest.fixture()
+def tracer():
+    recording_tracer = RecordingTracer()
+    tracing.set_tracer(recording_tracer)
+    yield recording_tracer
+    tracing.set_tracer(None)
+
+
+def test_nothing_is_traced_by_default(requests_mock, api_destination):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/cloudlet-info", json=[])
+    assert not tracing.is_enabled()
+    assert api.list_cloudlets(test_common.get_sample_edgerc()) == []
+
+
+def test_http_requests_are_children_of_the_function_span(requests_mock, api_destination, tracer):
+    requests_mock.get(f"https://{api_destination}/cloudlets/v3/policies/1001/versions",
+                      json=get_sample_json("list_policy_versions"))
+    assert api.get_latest_policy_version("1001", test_common.get_sample_edgerc()) == 1
+    names = [span.name for span in tracer.spans]
+    assert names == [
+        "akamai_shared_cloudlets.get_latest_policy_version",
+        "akamai_shared_cloudlets.get_latest_policy",
+        "akamai_shared_cloudlets.list_policy_versions",
+        "HTTP GET",
+    ]
+    root, latest, listing, http = tracer.spans
+    assert root.parent is None
+    assert http.parent is listing and listing.parent is latest and latest.parent is root
+    assert root.attributes == {"akamai.policy_id": "1001"}
+    assert listing.attributes == {"akamai.policy_id": "1001", "akamai.page": "0", "akamai.page_size": "10"}
+    assert http.attributes["akamai.endpoint"] == "/cloudlets/v3/policies/{policyId}/versions"
+    assert http.attributes["akamai.page"] == "0"
+    assert http.attributes["http.response.status_code"] == 200
+
+
+def test_activation_attributes(requests_mock, api_destination, tracer):
+    requests_mock.post(f"https://{api_destination}/cloudlets/v3/policies/1001/activations", status_code=202,
+                       json=get_sample_json("activate_policy"))
+    api.activate_policy("1001", "staging", "activation", "2", test_common.get_sample_edgerc())
+    assert tracer.spans[0].attributes == {
+        "akamai.policy_id": "1001",
+        "akamai.network": "staging",
+        "akamai.operation": "activation",
+        "akamai.policy_version": "2"
+    }
+    assert tracer.spans[-1].attributes["http.request.method"] == "POST"
+
+
+def test_building_the_name_index_is_not_traced(tracer):
+    api.build_policy_name_index(test_common.get_sample_edgerc())
+    assert tracer.spans == []
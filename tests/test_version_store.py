@@ -0,0 +1,134 @@
+import copy
+
+import pytest
+from click.testing import CliRunner
+
+from . import common_test_func as test_common
+from .test_api_abtractions import get_sample_json
+from src.akamai_shared_cloudlets import snapshot
+from src.akamai_shared_cloudlets import version_store
+from src.akamai_shared_cloudlets.commands import exports
+from src.akamai_shared_cloudlets.version_store import VersionStore
+
+
+def make_version(version: int, rule_count: int = 50, changed_rule: int = None, immutable: bool = True) -> dict:
+    policy_version = get_sample_json("get_policy_version")
+    template = policy_version["matchRules"][0]
+    rules = []
+    for position in range(rule_count):
+        rule = {**template, "id": position, "akaRuleId": f"rule{position}", "name": f"rule {position}",
+                "matchURL": f"/images/{position}/*"}
+        if position == changed_rule:
+            rule["statusCode"] = 301
+        rules.append(rule)
+    policy_version.update({"version": version, "id": 2000 + version, "immutable": immutable, "matchRules": rules})
+    return policy_version
+
+
+@pytest.fixture()
+def store(tmp_path):
+    with VersionStore(str(tmp_path / "versions.db")) as version_store_instance:
+        yield version_store_instance
+
+
+def test_versions_are_reconstructed(store):
+    versions = [make_version(1), make_version(2, changed_rule=3), make_version(3)]
+    for version in versions:
+        store.put_version(1001, copy.deepcopy(version))
+    for version in versions:
+        assert store.get_version(1001, version["version"]) == version
+    assert store.list_versions(1001) == [1, 2, 3]
+    assert store.list_policies() == ["1001"]
+    assert store.get_version(1001, 4) is None
+
+
+def test_rules_are_stored_once(store):
+    first = store.put_version(1001, make_version(1))
+    second = store.put_version(1001, make_version(2, changed_rule=3))
+    third = store.put_version(1002, make_version(1))
+    assert first == third != second
+    stats = store.stats()
+    assert stats["versions"] == 3
+    assert stats["rule_lists"] == 2
+    assert stats["rules"] == 51
+    assert stats["rule_references"] == 150
+
+
+def test_assigned_rule_fields_do_not_break_deduplication(store):
+    version = make_version(2)
+    for position, rule in enumerate(version["matchRules"]):
+        rule["id"] = position + 100
+    assert store.put_version(1001, make_version(1)) == store.put_version(1001, version)
+    assert store.get_version(1001, 2) == version
+
+
+def test_rules_are_reconstructed_lazily(store):
+    store.put_version(1001, make_version(1, rule_count=3))
+    rules = store.iter_match_rules(1001, 1)
+    assert next(rules)["name"] == "rule 0"
+    assert [rule["name"] for rule in rules] == ["rule 1", "rule 2"]
+    assert list(store.iter_match_rules(1001, 2)) == []
+
+
+def test_version_without_rules(store):
+    metadata = {"policyId": 1001, "version": 7, "description": "no rules"}
+    assert store.put_version(1001, metadata) is None
+    assert store.get_version(1001, 7) == metadata
+
+
+def test_version_without_rules_is_not_archived(store):
+    store.put_version(1001, {"policyId": 1001, "version": 7, "immutable": True})
+    assert store.has_version(1001, 7)
+    assert not store.has_version(1001, 7, immutable_only=True)
+    store.put_version(1001, make_version(7))
+    assert store.has_version(1001, 7, immutable_only=True)
+
+
+def test_returned_rules_do_not_share_the_cache(store):
+    version = make_version(1, rule_count=1)
+    version["matchRules"][0]["matches"] = [{"matchType": "path", "matchValue": "/images/*"}]
+    store.put_version(1001, copy.deepcopy(version))
+    next(store.iter_match_rules(1001, 1))["matches"].append({"matchType": "header"})
+    assert store.get_version(1001, 1) == version
+
+
+def test_store_is_persistent(tmp_path):
+    path = str(tmp_path / "versions.db")
+    with VersionStore(path) as store:
+        store.put_version(1001, make_version(1))
+    with VersionStore(path) as store:
+        assert store.get_version(1001, 1) == make_version(1)
+
+
+def test_archive_versions(account, requests_mock, tmp_path):
+    with VersionStore(str(tmp_path / "versions.db")) as store:
+        result = version_store.archive_versions(store, test_common.get_sample_edgerc(), max_workers=2)
+        assert (result["policies"], result["versions_fetched"], result["versions_skipped"]) == (2, 3, 0)
+        assert result["errors"] == []
+        assert store.stats()["rules"] == 1
+        assert store.get_version(1001, 2)["matchRules"] == get_sample_json("get_policy_version")["matchRules"]
+
+        # the sample versions are not immutable, so they are fetched again
+        assert version_store.archive_versions(store, test_common.get_sample_edgerc())["versions_fetched"] == 3
+        for policy_id, version in ((1001, 1), (1001, 2), (1002, 1)):
+            store.put_version(policy_id, {**store.get_version(policy_id, version), "immutable": True})
+        request_count = requests_mock.call_count
+        result = version_store.archive_versions(store, test_common.get_sample_edgerc())
+        assert (result["versions_fetched"], result["versions_skipped"]) == (0, 3)
+        assert requests_mock.call_count == request_count + 3
+
+
+def test_import_snapshot(account, tmp_path):
+    snapshot_file = str(tmp_path / "snapshot.jsonl.gz")
+    snapshot.export_snapshot(snapshot_file, test_common.get_sample_edgerc())
+    with VersionStore(str(tmp_path / "versions.db")) as store:
+        assert version_store.import_snapshot(store, snapshot_file) == 3
+        assert store.list_policies() == ["1001", "1002"]
+
+
+def test_cli_archive(account, tmp_path):
+    store_file = str(tmp_path / "versions.db")
+    result = CliRunner().invoke(exports.archive_versions, [store_file, "--edgerc-location",
+                                                           test_common.get_sample_edgerc()])
+    assert result.exit_code == 0, result.output
+    assert "holds 3 versions referencing 3 match rules, 1 of them distinct" in result.stdout